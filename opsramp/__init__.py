@@ -13,3 +13,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+
+import importlib
+
+
+def __getattr__(name):
+    # The submodules are imported on first use, so that for example
+    # "import opsramp.binding" does not load every API module but opsramp.rba
+    # can still be used afterwards without importing it explicitly.
+    if name.startswith("_"):
+        raise AttributeError(name)
+    try:
+        return importlib.import_module("%s.%s" % (__name__, name))
+    except ModuleNotFoundError as e:
+        if e.name != "%s.%s" % (__name__, name):
+            raise
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,732 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# aio.py
+# asyncio counterparts of the primary entry points in binding.py. The
+# object tree is the same one (tenant().resources().search() etc) but
+# every method that talks to OpsRamp returns an awaitable.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import collections
+import itertools
+import logging
+import time
+
+import aiohttp
+from opsramp.base import (
+    ApiObject,
+    call_limits,
+    Checkpoint,
+    Deadline,
+    DEFAULT_TIMEOUT,
+    Helpers,
+    memoized,
+)
+from opsramp.binding import Opsramp, token_request
+from opsramp.globalconfig import GlobalConfig
+from opsramp.hooks import RequestEvent
+import requests
+from simplejson.errors import JSONDecodeError
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    HTTPError,
+    MaxRetryError,
+    ProtocolError,
+    ReadTimeoutError,
+)
+from urllib3.response import HTTPResponse
+
+LOG = logging.getLogger(__name__)
+
+
+# The errors, other than a status, that a page may fail with once request()
+# has given up retrying it.
+PAGE_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    requests.exceptions.RetryError,
+)
+
+
+class AsyncApiObject(ApiObject):
+    """asyncio counterpart of ApiObject, using an aiohttp.ClientSession.
+
+    The HTTP methods work out their URL and headers when they are called
+    and return a coroutine that performs the request, so the usual
+    cd/pushd/popd sequences keep working. Requests are retried following
+    the same urllib3 Retry policy that the synchronous session uses.
+
+    aiohttp sessions can only be created inside a running event loop, so
+    if no session is given this object must be created inside one too.
+    """
+
+    __slots__ = ("retry", "tokens")
+
+    def __init__(
+        self,
+        url,
+        auth,
+        tracker=None,
+        session=None,
+        page_workers=1,
+        retry=None,
+        codec=None,
+        cache=None,
+        hooks=None,
+        timeout=None,
+        flights=None,
+        validators=None,
+        compressor=None,
+    ):
+        super(AsyncApiObject, self).__init__(
+            url,
+            auth,
+            tracker=tracker,
+            session=session or aiohttp.ClientSession(),
+            page_workers=page_workers,
+            codec=codec,
+            cache=cache,
+            hooks=hooks,
+            timeout=timeout,
+            flights=flights,
+            validators=validators,
+            compressor=compressor,
+        )
+        self.retry = retry or Helpers.default_retry_handler()
+        # The AsyncTokenManager that keeps the token valid, if there is one.
+        self.tokens = None
+
+    def clone(self):
+        new1 = AsyncApiObject(
+            self.baseurl,
+            self.auth,
+            self.tracker.clone(),
+            self.session,
+            page_workers=self.page_workers,
+            retry=self.retry,
+            codec=self.codec,
+            cache=self.cache,
+            hooks=self.hooks,
+            timeout=self.timeout,
+            flights=self.flights,
+            validators=self.validators,
+            compressor=self.compressor,
+        )
+        new1.tokens = self.tokens
+        return new1
+
+    @staticmethod
+    def form_data(data, files):
+        # aiohttp has no equivalent of the "files" argument of requests so
+        # build the multipart body ourselves. A FormData object can only be
+        # sent once so this is called afresh for every attempt.
+        form = aiohttp.FormData()
+        for name, value in (data or {}).items():
+            form.add_field(name, str(value))
+        for name, value in files.items():
+            if isinstance(value, (tuple, list)):
+                form.add_field(
+                    name,
+                    value[1],
+                    filename=value[0],
+                    content_type=value[2] if len(value) > 2 else None,
+                )
+            else:
+                form.add_field(name, value, filename=getattr(value, "name", name))
+        return form
+
+    @staticmethod
+    def client_timeout(timeout, deadline):
+        """Converts a requests timeout into an aiohttp one, which also limits
+        the total time taken by the request if there is a Deadline."""
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        total = None if deadline is None else max(deadline.remaining(), 0)
+        return aiohttp.ClientTimeout(total=total, sock_connect=connect, sock_read=read)
+
+    @staticmethod
+    async def pause(delay, deadline, method, url):
+        if deadline is not None and delay >= deadline.remaining():
+            # Give up now rather than sleep past the deadline.
+            raise deadline.exceeded(method, url)
+        await asyncio.sleep(delay)
+
+    async def request(self, method, url, headers, files=None, event=None, **kwargs):
+        """Perform one HTTP request, retrying it in the same circumstances
+        as the urllib3 retry handler on the synchronous session would.
+        Returns a tuple of (status, body bytes, headers). If a RequestEvent is given
+        then the hooks are told about any retries and the event is filled
+        in with the timings of the last attempt."""
+        retry = self.retry
+        deadline = Deadline.current()
+        reauthorized = False
+        while True:
+            if self.tokens is not None and "Authorization" in headers:
+                headers = await self.tokens.authorize(headers)
+            send_kwargs = kwargs
+            timeout = self.request_timeout(method, url)
+            if timeout is not None:
+                timeout = self.client_timeout(timeout, deadline)
+                send_kwargs = dict(send_kwargs, timeout=timeout)
+            if files:
+                send_kwargs = dict(
+                    send_kwargs, data=self.form_data(kwargs["data"], files)
+                )
+            if event is not None:
+                # Lets the trace callbacks of new_session() record the
+                # time taken to connect.
+                send_kwargs = dict(send_kwargs, trace_request_ctx=event)
+                event.connect = None
+                sent = time.perf_counter()
+                if event.sent is None:
+                    event.sent = sent
+                # The time from the first attempt to this one.
+                event.retrying = sent - event.sent
+            try:
+                async with self.session.request(
+                    method, url, headers=headers, **send_kwargs
+                ) as resp:
+                    if event is not None:
+                        event.ttfb = time.perf_counter() - sent
+                    body = await resp.read()
+                    if event is not None:
+                        # Only known to recent versions of aiohttp.
+                        event.response_wire_bytes = getattr(
+                            resp.content, "total_raw_bytes", None
+                        )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # The total time allowed by the deadline has run out.
+                if isinstance(e, asyncio.TimeoutError):
+                    if deadline is not None and deadline.remaining() <= 0:
+                        raise deadline.exceeded(method, url) from e
+                try:
+                    retry = retry.increment(method, url, error=self.retry_error(url, e))
+                except HTTPError:
+                    raise e
+                self.retried(event, error=e)
+                await self.pause(retry.get_backoff_time(), deadline, method, url)
+                continue
+
+            if event is not None:
+                event.download = time.perf_counter() - sent - event.ttfb
+            if resp.status == 401 and self.tokens is not None and not reauthorized:
+                # Get a new token and try once more.
+                reauthorized = True
+                await self.tokens.refresh(rejected=headers.get("Authorization"))
+                continue
+            has_retry_after = "Retry-After" in resp.headers
+            if not retry.is_retry(method, resp.status, has_retry_after):
+                return resp.status, body, resp.headers
+
+            # Give the retry policy a urllib3 view of the response so that
+            # it can count it and honour any Retry-After header.
+            response = HTTPResponse(headers=dict(resp.headers), status=resp.status)
+            try:
+                retry = retry.increment(method, url, response=response)
+            except MaxRetryError as e:
+                raise requests.exceptions.RetryError(e)
+            delay = None
+            if retry.respect_retry_after_header:
+                delay = retry.get_retry_after(response)
+            if not delay:
+                delay = retry.get_backoff_time()
+            LOG.debug("retrying %s %s in %ss", method, url, delay)
+            self.retried(event, status=resp.status)
+            await self.pause(delay, deadline, method, url)
+
+    @staticmethod
+    def retry_error(url, error):
+        """Returns the urllib3 exception that corresponds to an aiohttp one,
+        so that the retry policy treats it the way that it would on the
+        synchronous session: failing to connect can be retried whatever the
+        method, while errors once the request might have been sent are
+        read errors, which are only retried for idempotent methods."""
+        connect_timeout = getattr(aiohttp, "ConnectionTimeoutError", ())
+        if isinstance(error, (aiohttp.ClientConnectorError, connect_timeout)):
+            return ConnectTimeoutError(str(error))
+        if isinstance(error, asyncio.TimeoutError):
+            return ReadTimeoutError(None, url, str(error))
+        return ProtocolError(str(error), error)
+
+    def retried(self, event, status=None, error=None):
+        if event is not None:
+            event.retries += 1
+            retry_event = RequestEvent(event.method, event.url, page=event.page)
+            retry_event.status = status
+            retry_event.error = error
+            self.hooks.fire("on_retry", retry_event)
+
+    async def send(self, method, url, headers, page=None, **kwargs):
+        """Calls request(), telling any hooks about it. Returns a tuple of
+        (status, body bytes)."""
+        raw_size = None
+        if self.compressor is not None:
+            kwargs["headers"] = headers
+            raw_size = self.compress_body(kwargs)
+            headers = kwargs.pop("headers")
+        key = None
+        if self.validators is not None and method == "GET":
+            key = self.validators.key(url, headers)
+            headers = self.validators.conditions(key, headers)
+        if not self.hooks:
+            status, body, resp_headers = await self.request(
+                method, url, headers, **kwargs
+            )
+            if key is None:
+                return status, body
+            return self.validators.update(key, status, resp_headers, body)[:2]
+        event = RequestEvent(method, url, page=page)
+        data = kwargs.get("data")
+        if kwargs.get("json") is None and not kwargs.get("files"):
+            event.request_wire_bytes = event.body_size(data)
+            event.request_bytes = event.request_wire_bytes
+            if raw_size is not None:
+                event.request_bytes = raw_size
+        self.hooks.fire("before_request", event)
+        try:
+            status, body, resp_headers = await self.request(
+                method, url, headers, event=event, **kwargs
+            )
+        except Exception as e:
+            event.error = e
+            event.elapsed = time.perf_counter() - event.started
+            self.hooks.fire("after_response", event)
+            raise
+        event.elapsed = time.perf_counter() - event.started
+        event.status = status
+        event.response_bytes = len(body)
+        if key is not None:
+            status, body, event.unchanged = self.validators.update(
+                key, status, resp_headers, body
+            )
+        self.hooks.fire("after_response", event)
+        return status, body
+
+    async def fetch(self, method, url, headers, page=None, **kwargs):
+        """Perform a request and decode the result the same way that
+        ApiObject.process_result does, except for pagination."""
+        status, body = await self.send(method, url, headers, page=page, **kwargs)
+        if self.cache is not None and method != "GET":
+            self.cache.invalidate_collection(url)
+        return self.decode_result(method, url, status, body)
+
+    def decode_result(self, method, url, status, body):
+        if status < 200 or status >= 300:
+            msg = "<Response [%d]> %s %s %s" % (status, method, url, body)
+            LOG.debug(msg)
+            raise RuntimeError(msg)
+        try:
+            return self.codec.loads(body)
+        except JSONDecodeError:
+            return body.decode("utf-8", errors="replace")
+
+    async def fetch_page(self, url, headers, page_no):
+        # See ApiObject.fetch_page()
+        for attempt in itertools.count():
+            try:
+                status, body = await self.send(
+                    "GET",
+                    Helpers.set_query(url, pageNo=page_no),
+                    headers,
+                    page=page_no,
+                )
+            except PAGE_ERRORS as e:
+                if attempt >= self.PAGE_RETRIES:
+                    raise
+                LOG.debug("retrying page %d of %s: %s", page_no, url, e)
+            else:
+                if (
+                    status not in self.PAGE_RETRY_STATUSES
+                    or attempt >= self.PAGE_RETRIES
+                ):
+                    return self.decode_result("GET", url, status, body)
+                LOG.debug("retrying page %d of %s: %d", page_no, url, status)
+            await asyncio.sleep(self.page_backoff(attempt, url))
+
+    async def next_pages(self, url, headers, data):
+        """Async generator equivalent of ApiObject.next_pages"""
+        self.page_received(url, data)
+        page_numbers = None
+        if self.page_workers > 1 and data.get("nextPage"):
+            page_numbers = self.remaining_pages(data)
+        if page_numbers:
+            # Keep at most page_workers pages in flight, in page order.
+            workers = min(self.page_workers, len(page_numbers))
+            numbers = iter(page_numbers)
+            pending = collections.deque()
+            try:
+                for page_no in itertools.islice(numbers, workers):
+                    pending.append(
+                        asyncio.ensure_future(self.fetch_page(url, headers, page_no))
+                    )
+                while pending:
+                    page = await pending.popleft()
+                    self.page_received(url, page)
+                    for page_no in itertools.islice(numbers, 1):
+                        pending.append(
+                            asyncio.ensure_future(
+                                self.fetch_page(url, headers, page_no)
+                            )
+                        )
+                    yield page
+            finally:
+                for future in pending:
+                    future.cancel()
+        else:
+            while "nextPage" in data.keys() and data["nextPage"]:
+                data = await self.fetch_page(url, headers, int(data["pageNo"]) + 1)
+                self.page_received(url, data)
+                yield data
+
+    async def collate(self, url, headers, data, checkpoint=None):
+        # See ApiObject.collate_pages()
+        if checkpoint is None:
+            checkpoint = Checkpoint()
+        checkpoint.url = url
+        checkpoint.add(data)
+        try:
+            async for page in self.next_pages(url, headers, data):
+                checkpoint.add(page)
+        except (RuntimeError,) + PAGE_ERRORS as e:
+            raise self.partial_result(checkpoint, e) from e
+        return self.collated_result(url, checkpoint.results)
+
+    async def resume(self, url, headers, checkpoint):
+        # See ApiObject.resume_pages()
+        if checkpoint.url != url:
+            raise ValueError("checkpoint is for %s not %s" % (checkpoint.url, url))
+        try:
+            data = await self.fetch_page(url, headers, checkpoint.page_no + 1)
+        except (RuntimeError,) + PAGE_ERRORS as e:
+            raise self.partial_result(checkpoint, e) from e
+        return await self.collate(url, headers, data, checkpoint)
+
+    async def aget(self, url, headers, checkpoint=None):
+        if checkpoint is not None and checkpoint.page_no:
+            return await self.resume(url, headers, checkpoint)
+        # See ApiObject.shared_get()
+        generation = None
+        if self.cache is not None:
+            found, data, generation = self.cache.lookup(url, headers)
+            if found:
+                return data
+
+        async def fetch():
+            data = await self.fetch("GET", url, headers)
+            if isinstance(data, dict) and data.get("nextPage") and "results" in data:
+                data = await self.collate(url, headers, data, checkpoint)
+            if self.cache is not None:
+                self.cache.store(url, headers, data, generation)
+            return data
+
+        if self.flights is None or checkpoint is not None:
+            return await fetch()
+        return await self.flights.ado(url, headers, fetch)
+
+    async def aiter_pages(self, url, headers):
+        data = await self.fetch("GET", url, headers)
+        yield data
+        if isinstance(data, dict) and "results" in data.keys():
+            async for page in self.next_pages(url, headers, data):
+                yield page
+
+    async def aiter_results(self, pages):
+        async for page in pages:
+            if isinstance(page, dict) and "results" in page.keys():
+                page = page["results"]
+            if isinstance(page, list):
+                for record in page:
+                    yield record
+            elif page != "":
+                yield page
+
+    @staticmethod
+    def limited(coro, timeout, deadline):
+        """Returns "coro" wrapped so that it runs within call_limits()"""
+        if timeout is None and deadline is None:
+            return coro
+
+        async def wrapper():
+            with call_limits(timeout, deadline):
+                return await coro
+
+        return wrapper()
+
+    def get(
+        self,
+        suffix=None,
+        headers=None,
+        timeout=None,
+        deadline=None,
+        page_size=None,
+        checkpoint=None,
+    ):
+        url = self.paged_url(self.compute_url(suffix), page_size)
+        hdr = self.prep_headers(headers)
+        return self.limited(self.aget(url, hdr, checkpoint), timeout, deadline)
+
+    def iter_pages(self, suffix=None, headers=None, page_size=None):
+        url = self.paged_url(self.compute_url(suffix), page_size)
+        hdr = self.prep_headers(headers)
+        return self.aiter_pages(url, hdr)
+
+    def iter_results(self, suffix=None, headers=None, page_size=None):
+        pages = self.iter_pages(suffix, headers=headers, page_size=page_size)
+        return self.aiter_results(pages)
+
+    def post(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        files=None,
+        timeout=None,
+        deadline=None,
+    ):
+        url = self.compute_url(suffix)
+        hdr, data, json = self.encode_body(
+            self.prep_headers(headers), data, json, files
+        )
+        coro = self.fetch("POST", url, hdr, data=data, json=json, files=files)
+        return self.limited(coro, timeout, deadline)
+
+    def put(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        timeout=None,
+        deadline=None,
+    ):
+        url = self.compute_url(suffix)
+        hdr, data, json = self.encode_body(self.prep_headers(headers), data, json)
+        coro = self.fetch("PUT", url, hdr, data=data, json=json)
+        return self.limited(coro, timeout, deadline)
+
+    def delete(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        timeout=None,
+        deadline=None,
+    ):
+        url = self.compute_url(suffix)
+        hdr, data, json = self.encode_body(self.prep_headers(headers), data, json)
+        coro = self.fetch("DELETE", url, hdr, data=data, json=json)
+        return self.limited(coro, timeout, deadline)
+
+    def patch(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        timeout=None,
+        deadline=None,
+    ):
+        url = self.compute_url(suffix)
+        hdr, data, json = self.encode_body(self.prep_headers(headers), data, json)
+        coro = self.fetch("PATCH", url, hdr, data=data, json=json)
+        return self.limited(coro, timeout, deadline)
+
+
+class AsyncTokenManager(object):
+    """asyncio counterpart of opsramp.binding.TokenManager. It fetches a
+    new token "margin" seconds before the current one expires and, if
+    OpsRamp rejects a request with 401 anyway, fetches a new one and the
+    request is sent once more. Tokens are not shared through a TokenCache.
+    """
+
+    def __init__(self, url, key, secret, session, margin=60, timeout=None):
+        self.auth_url, self.auth_hdrs, self.body = token_request(url, key, secret)
+        self.session = session
+        self.margin = margin
+        self.timeout = timeout
+        self.clock = time.time
+        self.auth = {}
+        self.expires = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def bearer(self):
+        return self.auth.get("Authorization")
+
+    async def fetch(self):
+        """Gets a new token from OpsRamp and returns it."""
+        ao = AsyncApiObject(
+            self.auth_url, self.auth_hdrs, session=self.session, timeout=self.timeout
+        )
+        auth_resp = await ao.post(data=self.body)
+        lifetime = auth_resp.get("expires_in")
+        self.expires = None
+        if lifetime is not None:
+            self.expires = self.clock() + float(lifetime)
+        token = auth_resp["access_token"]
+        self.auth["Authorization"] = "Bearer " + token
+        return token
+
+    def attach(self, ormp):
+        """Starts managing the token of an AsyncOpsramp object tree."""
+        self.auth = ormp.auth
+        ormp.api.tokens = self
+
+    def expiring(self):
+        return self.expires is not None and self.clock() >= self.expires - self.margin
+
+    async def refresh(self, rejected=None):
+        """See TokenManager.refresh()"""
+        async with self.lock:
+            if rejected is not None and rejected != self.bearer:
+                # Another task has replaced it already.
+                pass
+            elif rejected is not None or self.expiring():
+                LOG.debug("refreshing the access token")
+                await self.fetch()
+            return self.bearer
+
+    async def authorize(self, headers):
+        """Returns "headers" with the current token, replacing it first if it
+        is about to expire."""
+        if self.expiring():
+            await self.refresh()
+        if headers["Authorization"] == self.bearer:
+            return headers
+        return dict(headers, Authorization=self.bearer)
+
+
+async def connect(
+    url,
+    key,
+    secret,
+    page_workers=1,
+    session=None,
+    pool_maxsize=None,
+    json_codec=None,
+    response_cache=None,
+    timeout=DEFAULT_TIMEOUT,
+    coalesce=None,
+    validator_cache=None,
+    compress_requests=None,
+    token_margin=60,
+):
+    """asyncio equivalent of opsramp.binding.connect(). The same aiohttp
+    session is used for authentication and for the returned object tree,
+    whose token is kept valid by an AsyncTokenManager."""
+    session = session or AsyncOpsramp.new_session(pool_maxsize=pool_maxsize)
+    tokens = AsyncTokenManager(
+        url, key, secret, session, margin=token_margin, timeout=timeout
+    )
+    token = await tokens.fetch()
+    ormp = AsyncOpsramp(
+        url,
+        token,
+        page_workers=page_workers,
+        session=session,
+        json_codec=json_codec,
+        response_cache=response_cache,
+        timeout=timeout,
+        coalesce=coalesce,
+        validator_cache=validator_cache,
+        compress_requests=compress_requests,
+    )
+    tokens.attach(ormp)
+    return ormp
+
+
+class AsyncGlobalConfig(GlobalConfig):
+    async def get_nocs(self):
+        # See GlobalConfig.get_nocs()
+        try:
+            retval = await self.api.get("/cfg/tenants/nocs")
+        except RuntimeError as e:
+            if '"code":"0005"' in str(e):
+                retval = []
+            else:
+                raise
+        return retval
+
+
+class AsyncOpsramp(Opsramp):
+    """asyncio counterpart of opsramp.binding.Opsramp. Use it as an async
+    context manager, or call close(), to release the aiohttp session."""
+
+    apiclass = AsyncApiObject
+
+    @staticmethod
+    def trace_config():
+        """Returns an aiohttp TraceConfig that records the time taken to
+        open each new connection in the RequestEvent of the request."""
+
+        async def start(session, ctx, params):
+            ctx.connect_started = time.perf_counter()
+
+        async def end(session, ctx, params):
+            event = ctx.trace_request_ctx
+            if isinstance(event, RequestEvent):
+                event.connect = time.perf_counter() - ctx.connect_started
+
+        config = aiohttp.TraceConfig()
+        config.on_connection_create_start.append(start)
+        config.on_connection_create_end.append(end)
+        return config
+
+    @staticmethod
+    def new_session(page_workers=1, pool_connections=None, pool_maxsize=None, **kw):
+        # aiohttp always waits for a free connection rather than opening
+        # extra ones, and by default allows up to 100 in total. pool_maxsize
+        # limits the number of connections to each host.
+        kwargs = {"trace_configs": [AsyncOpsramp.trace_config()]}
+        # aiohttp already asks for gzip and deflate.
+        accept_encoding = AsyncOpsramp.accept_encoding()
+        if accept_encoding != "gzip, deflate":
+            kwargs["headers"] = {"Accept-Encoding": accept_encoding}
+        if pool_maxsize:
+            kwargs["connector"] = aiohttp.TCPConnector(limit_per_host=pool_maxsize)
+        return aiohttp.ClientSession(**kwargs)
+
+    @staticmethod
+    def accept_encoding():
+        """The equivalent of Helpers.accept_encoding() for aiohttp, which
+        decodes br if brotli is installed and zstd if zstd support is."""
+        from aiohttp import compression_utils
+
+        encodings = ["gzip", "deflate"]
+        if getattr(compression_utils, "HAS_BROTLI", False):
+            encodings.append("br")
+        if getattr(compression_utils, "HAS_ZSTD", False):
+            encodings.append("zstd")
+        return ", ".join(encodings)
+
+    async def close(self):
+        await self.api.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @memoized
+    def config(self):
+        return AsyncGlobalConfig(self)
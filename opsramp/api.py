@@ -6,7 +6,7 @@
 # OpsRamp-specific variant of ApiWrapper base class as a container for
 # some methods and helpers that are common to multiple parts of that API.
 #
-# (c) Copyright 2020-2022 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2020-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -29,6 +29,8 @@ class ORapi(ApiWrapper):
     """OpsRamp-specific variant of ApiWrapper base class as a container for
     some methods and helpers that are common to multiple parts of that API."""
 
+    __slots__ = ()
+
     # Returns a string containing a base64 encoded version of the
     # content of the specified file. It was quite finicky to come
     # up with a method that works on both Python 2 and 3 so please
@@ -39,9 +41,28 @@ class ORapi(ApiWrapper):
             content = base64.b64encode(f.read())
         return content.decode()
 
-    def search(self, pattern="", headers=None, suffix="search"):
+    @staticmethod
+    def search_suffix(pattern, suffix):
         if pattern:
             if pattern[0] != "?":
                 pattern = "?" + pattern
             suffix += pattern
-        return super(ORapi, self).get(suffix, headers)
+        return suffix
+
+    def search(self, pattern="", headers=None, suffix="search", page_size=None):
+        suffix = self.search_suffix(pattern, suffix)
+        return super(ORapi, self).get(suffix, headers, page_size=page_size)
+
+    # Streaming variants of search() that yield each page, or each record,
+    # as soon as it has been received rather than collating all pages first.
+    def iter_search_pages(
+        self, pattern="", headers=None, suffix="search", page_size=None
+    ):
+        suffix = self.search_suffix(pattern, suffix)
+        return super(ORapi, self).iter_pages(suffix, headers, page_size=page_size)
+
+    def iter_search_results(
+        self, pattern="", headers=None, suffix="search", page_size=None
+    ):
+        suffix = self.search_suffix(pattern, suffix)
+        return super(ORapi, self).iter_results(suffix, headers, page_size=page_size)
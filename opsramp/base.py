@@ -20,15 +20,256 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import contextlib
+import contextvars
+import functools
+import importlib
+import itertools
 import logging
+import math
+import random
+import threading
+import time
+import types
 from urllib import parse as urlparse
 
+from opsramp.codec import get_codec
+from opsramp.hooks import Hooks, RequestEvent
 import requests
 from simplejson.errors import JSONDecodeError
 
 LOG = logging.getLogger(__name__)
 
 
+class RetryBudget(object):
+    """Limits the number of retries made by one client to a fraction of the
+    number of requests that it makes, so that when OpsRamp is having trouble
+    the retries do not multiply the load on it. Every response received
+    earns "ratio" of a retry, up to a balance of "maximum", and every retry
+    spends one. A new budget starts out full."""
+
+    def __init__(self, ratio=0.2, maximum=10):
+        assert ratio >= 0
+        assert maximum >= 1
+        self.ratio = ratio
+        self.maximum = maximum
+        self.balance = float(maximum)
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.balance = min(self.maximum, self.balance + self.ratio)
+
+    def withdraw(self):
+        """Spends one retry from the budget. Returns False if there is not
+        enough left."""
+        with self.lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+# The (connect, read) timeouts in seconds that connect() gives the object
+# tree unless it is told otherwise. The read timeout is the longest time to
+# wait for each chunk of the response, not for the whole of it.
+DEFAULT_TIMEOUT = (10, 120)
+
+# A timeout that overrides the one of the object tree, for the duration of
+# one call. See call_limits()
+CALL_TIMEOUT = contextvars.ContextVar("opsramp_call_timeout", default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when a call runs out of time allowed by a Deadline, whether
+    while waiting for a response, between retries or between pages."""
+
+
+class Deadline(object):
+    """Limits the total time taken by the calls made inside a "with" block,
+    including every retry and every page of paginated results, to "seconds".
+    Once it has passed no more requests are sent and DeadlineExceeded is
+    raised, and the timeout of each request is cut short to fit.
+
+    The limit applies to the current thread, or asyncio task, and to the
+    threads that fetch pages for it. Nested deadlines cannot extend the one
+    outside them.
+    """
+
+    current_var = contextvars.ContextVar("opsramp_deadline", default=None)
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.expires = clock() + seconds
+        self.tokens = []
+
+    @classmethod
+    def current(cls):
+        return cls.current_var.get()
+
+    def __enter__(self):
+        outer = self.current()
+        if outer is not None:
+            self.expires = min(self.expires, outer.expires)
+        self.tokens.append(self.current_var.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.current_var.reset(self.tokens.pop())
+
+    def remaining(self):
+        return self.expires - self.clock()
+
+    def exceeded(self, method, url):
+        return DeadlineExceeded(
+            "deadline of %ss exceeded by %s %s" % (self.seconds, method, url)
+        )
+
+    def cap(self, timeout, method, url):
+        """Returns a requests timeout (a number, a tuple of connect and read
+        timeouts or None for no timeout) that is no longer than the time
+        left. Raises DeadlineExceeded if there is none left."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.exceeded(method, url)
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+@contextlib.contextmanager
+def call_limits(timeout=None, deadline=None):
+    """Context manager that applies a request timeout, and a Deadline of
+    "deadline" seconds, to the requests made inside it. Either can be None
+    to leave it as it was."""
+    token = None
+    if timeout is not None:
+        token = CALL_TIMEOUT.set(timeout)
+    try:
+        if deadline is None:
+            yield
+        else:
+            with Deadline(deadline):
+                yield
+    finally:
+        if token is not None:
+            CALL_TIMEOUT.reset(token)
+
+
+class RetryPolicy(requests.packages.urllib3.util.Retry):
+    """A urllib3 Retry that decides whether to retry based on what kind of
+    failure each response represents:
+
+    - throttling (429) means that OpsRamp did not process the request, so it
+      is retried whatever the method, including POST.
+    - transient server errors such as 503 are retried only for idempotent
+      methods, because the request might have been processed.
+    - anything else, in particular a 400, is a permanent error that will
+      fail again so it is not retried at all.
+
+    Read errors are likewise only retried for idempotent methods. Backoff
+    delays use "full jitter" (a random delay between zero and the usual
+    exponential one) so that many workers that were throttled at the same
+    moment do not all retry at the same moment, and every retry is paid for
+    from an optional RetryBudget shared by the whole client.
+
+    urllib3 makes the retries itself, below the adapter, so an optional
+    opsramp.ratelimit.RateLimiter is also charged a token for each one and
+    told about each response that is retried.
+    """
+
+    THROTTLE_STATUSES = frozenset([429])
+    TRANSIENT_STATUSES = frozenset([502, 503, 504])
+    IDEMPOTENT_METHODS = frozenset(["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"])
+
+    def __init__(self, *args, budget=None, jitter=True, limiter=None, **kwargs):
+        self.budget = budget
+        self.jitter = jitter
+        self.limiter = limiter
+        super(RetryPolicy, self).__init__(*args, **kwargs)
+
+    def new(self, **kw):
+        # urllib3 calls this for every attempt; carry our settings, and the
+        # same shared budget and limiter, across to the new instance.
+        kw.setdefault("budget", self.budget)
+        kw.setdefault("jitter", self.jitter)
+        kw.setdefault("limiter", self.limiter)
+        return super(RetryPolicy, self).new(**kw)
+
+    def is_idempotent(self, method):
+        return bool(method) and method.upper() in self.IDEMPOTENT_METHODS
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        retval = super(RetryPolicy, self).is_retry(method, status_code, has_retry_after)
+        if retval and status_code not in self.THROTTLE_STATUSES:
+            retval = self.is_idempotent(method)
+        if self.budget is not None:
+            # urllib3 asks about every response that it receives, so this is
+            # also where the budget is topped up.
+            if retval and not self.budget.withdraw():
+                LOG.warning("retry budget exhausted, not retrying %s", method)
+                retval = False
+            self.budget.deposit()
+        return retval
+
+    def increment(self, method=None, url=None, response=None, error=None, **kw):
+        deadline = Deadline.current()
+        if deadline is not None and deadline.remaining() <= 0:
+            raise deadline.exceeded(method, url) from error
+        if error and self._is_read_error(error) and not self.is_idempotent(method):
+            # The server may have acted on the request before it failed.
+            raise error
+        new1 = super(RetryPolicy, self).increment(
+            method, url, response=response, error=error, **kw
+        )
+        # Retries of responses were paid for in is_retry()
+        if error and self.budget is not None and not self.budget.withdraw():
+            LOG.warning("retry budget exhausted, not retrying %s", method)
+            raise requests.packages.urllib3.exceptions.MaxRetryError(
+                kw.get("_pool"), url, error
+            )
+        return new1
+
+    def get_backoff_time(self):
+        backoff = super(RetryPolicy, self).get_backoff_time()
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        return backoff
+
+    def sleep(self, response=None):
+        # urllib3 calls this before every retry.
+        last = self.history[-1] if self.history else None
+        limiter = self.limiter if last else None
+        if limiter and response is not None:
+            limiter.observe(last.url, response.status, response.headers)
+        self.backoff(response)
+        started = time.perf_counter()
+        if limiter:
+            limiter.acquire(last.url)
+        event = RequestEvent.current()
+        if event is not None:
+            event.sent = time.perf_counter()
+            if limiter:
+                event.waited(event.sent - started)
+
+    def backoff(self, response=None):
+        deadline = Deadline.current()
+        if deadline is None:
+            return super(RetryPolicy, self).sleep(response)
+        # Give up now rather than sleep past the deadline.
+        delay = None
+        if self.respect_retry_after_header and response is not None:
+            delay = self.get_retry_after(response)
+        if delay is None:
+            delay = self.get_backoff_time()
+        if delay >= deadline.remaining():
+            last = self.history[-1] if self.history else None
+            raise deadline.exceeded(last and last.method, last and last.url)
+        time.sleep(delay)
+
+
 class Helpers(object):
     # (DW) Add support for retries of requests to the OpsRamp API in the event
     # of receiving a HTTP 429 (Too Many Requests) response from the API to
@@ -47,7 +288,7 @@ class Helpers(object):
     # Borrowed from:
     # https://www.peterbe.com/plog/best-practice-with-retries-with-requests
 
-    retryclass = requests.packages.urllib3.util.Retry
+    retryclass = RetryPolicy
 
     @staticmethod
     def default_retry_verbs() -> frozenset:
@@ -59,57 +300,180 @@ class Helpers(object):
         return retval
 
     @staticmethod
-    def session_add_retry_handler(session=None):
+    def default_retry_handler():
         # urllib3 does not retry on POST by default, but we want to iff the
         # return status is 429 rate limiting, on the assumption that this
         # means the POST did not happen and is therefore safe to retry.
+        # RetryPolicy takes care of only retrying the other statuses for
+        # idempotent methods. A 400 means the request itself is wrong, so
+        # there is no point retrying it.
         http_verbs = set(Helpers.default_retry_verbs())
         http_verbs.add("POST")
-        retry = Helpers.create_retry_handler(
+        return Helpers.create_retry_handler(
             retries=7,
             backoff_factor=0.5,
-            status_forcelist=(
-                400,
-                429,
-            ),
+            status_forcelist=(429, 502, 503, 504),
             allowed_methods=http_verbs,
+            budget=RetryBudget(),
         )
 
-        adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+    @staticmethod
+    def session_add_retry_handler(
+        session=None,
+        pool_connections=requests.adapters.DEFAULT_POOLSIZE,
+        pool_maxsize=requests.adapters.DEFAULT_POOLSIZE,
+        pool_block=requests.adapters.DEFAULT_POOLBLOCK,
+        limiter=None,
+    ):
+        # pool_connections is the number of hosts to keep pools for and
+        # pool_maxsize the number of connections kept open to each host. A
+        # multi-threaded caller needs pool_maxsize to be at least the number
+        # of threads, or set pool_block so that threads wait for a free
+        # connection instead of opening (and discarding) extra ones.
+        retry = Helpers.default_retry_handler()
+        adapter_args = {
+            "max_retries": retry,
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize,
+            "pool_block": pool_block,
+        }
+        # An optional client-side rate limiter (see opsramp.ratelimit)
+        # supplies its own adapter that throttles requests before they
+        # are sent.
+        if limiter:
+            adapter = limiter.adapter(**adapter_args)
+        else:
+            adapter = requests.adapters.HTTPAdapter(**adapter_args)
 
         session = session or requests.Session()
         session.mount(prefix="http://", adapter=adapter)
         session.mount(prefix="https://", adapter=adapter)
+        # requests already asks for gzip and deflate, which is all that
+        # urllib3 can decode without the "compress" extra.
+        accept_encoding = Helpers.accept_encoding()
+        if accept_encoding != requests.utils.default_headers()["Accept-Encoding"]:
+            session.headers["Accept-Encoding"] = accept_encoding
         return session
 
+    @staticmethod
+    def accept_encoding():
+        """Returns the Accept-Encoding header listing every content coding
+        that urllib3 can decode: gzip and deflate, plus br if brotli is
+        installed and zstd if zstd support is. See the "compress" extra."""
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        return ", ".join(ACCEPT_ENCODING.split(","))
+
+    @staticmethod
+    def set_query(url, **params):
+        """Returns "url" with the given query parameters set, replacing any
+        values that it already has for them. The rest of the query string is
+        kept exactly as it was, so that sorting and filtering parameters are
+        sent in the same form on every page."""
+        base, _, query = url.partition("?")
+        kept = [p for p in query.split("&") if p and p.split("=")[0] not in params]
+        kept.extend(
+            "%s=%s" % (name, urlparse.quote(str(value), safe=""))
+            for name, value in params.items()
+        )
+        return base + "?" + "&".join(kept)
+
+    @staticmethod
+    def endpoint_family(url):
+        """Splits an OpsRamp API URL into the tenant that it refers to (or
+        None for global ones) and the "family" of endpoints that it belongs
+        to, which is the first path component below the tenant or the API
+        version. For example .../api/v2/tenants/client_1/resources/search
+        returns ("client_1", "resources")."""
+        parts = [p for p in urlparse.urlsplit(url).path.split("/") if p]
+        if len(parts) >= 2 and parts[0] == "api":
+            parts = parts[2:]
+        tenant = None
+        if len(parts) >= 2 and parts[0] == "tenants":
+            tenant = parts[1]
+            parts = parts[2:]
+        family = parts[0] if parts else ""
+        return tenant, family
+
+    @staticmethod
+    def pool_stats(session):
+        """Returns a list of dicts describing the utilisation of each
+        connection pool of a requests session. "opened" counts every
+        connection the pool has ever made, so if it keeps growing beyond
+        "maxsize" then connections are not being reused."""
+        retval = []
+        adapters = getattr(session, "adapters", {})
+        # The same adapter is normally mounted for both http and https.
+        unique = {id(a): a for a in adapters.values()}
+        for adapter in unique.values():
+            poolmanager = getattr(adapter, "poolmanager", None)
+            if poolmanager is None:
+                continue
+            for key in list(poolmanager.pools.keys()):
+                pool = poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                queued = list(pool.pool.queue) if pool.pool else []
+                idle = len([conn for conn in queued if conn is not None])
+                retval.append(
+                    {
+                        "scheme": pool.scheme,
+                        "host": pool.host,
+                        "port": pool.port,
+                        "maxsize": pool.pool.maxsize if pool.pool else 0,
+                        "block": pool.block,
+                        "in_use": (pool.pool.maxsize - len(queued)) if pool.pool else 0,
+                        "idle": idle,
+                        "opened": pool.num_connections,
+                        "requests": pool.num_requests,
+                    }
+                )
+        return retval
+
     @staticmethod
     def create_retry_handler(
-        retries, backoff_factor, status_forcelist, allowed_methods
+        retries, backoff_factor, status_forcelist, allowed_methods, budget=None
     ):
         assert isinstance(retries, int)
         assert retries >= 0
         assert backoff_factor >= 0
         assert isinstance(status_forcelist, tuple)
 
+        # Older versions of urllib3 use a deprecated name for this.
+        if hasattr(Helpers.retryclass, "DEFAULT_ALLOWED_METHODS"):
+            methods = {"allowed_methods": frozenset(allowed_methods)}
+        else:
+            methods = {"method_whitelist": frozenset(allowed_methods)}
         return Helpers.retryclass(
             total=retries,
             read=retries,
             connect=retries,
             backoff_factor=backoff_factor,
             status_forcelist=status_forcelist,
+            budget=budget,
+            **methods
         )
 
 
 class PathTracker(object):
+    """The current path below the base URL of an ApiObject, which works like
+    the current directory of a shell. The prefix and stack are replaced by
+    cd(), pushd() and popd() rather than changed in place, so a clone shares
+    nothing that can change and a tracker that is only read, which is all
+    that the wrapper classes ever do after they have been built, is safe to
+    share between threads."""
+
+    __slots__ = ("prefix", "stack")
+
     def __init__(self):
         self.reset()
 
     def reset(self):
         self.prefix = ""
-        self.stack = []
+        self.stack = ()
 
     def __str__(self):
-        return '%s "%s" %s' % (str(type(self)), self.prefix, self.stack)
+        return '%s "%s" %s' % (str(type(self)), self.prefix, list(self.stack))
 
     def clone(self):
         new1 = PathTracker()
@@ -128,11 +492,11 @@ class PathTracker(object):
         return self.prefix
 
     def pushd(self, path=None):
-        self.stack.append(self.prefix)
+        self.stack = self.stack + (self.prefix,)
         return self.cd(path)
 
     def popd(self):
-        self.prefix = self.stack.pop()
+        self.prefix, self.stack = self.stack[-1], self.stack[:-1]
         return self.prefix
 
     def fullpath(self, suffix=None):
@@ -148,8 +512,106 @@ class PathTracker(object):
         return retval
 
 
+class Checkpoint(object):
+    """The progress of the crawl of a paginated GET: the URL of the query,
+    the number of the last page received and the records of every page up
+    to and including that one, in order. Pass one to get() and it is kept
+    up to date as the pages arrive; pass it again after a failure and the
+    crawl carries on after the last page received instead of starting over.
+    to_dict() and from_dict() convert it to and from something that can be
+    saved as JSON, so that another process can resume the crawl."""
+
+    def __init__(self, url=None, page_no=0, results=None):
+        self.url = url
+        self.page_no = page_no
+        self.results = [] if results is None else results
+
+    def __str__(self):
+        return '%s "%s" page %d, %d results' % (
+            str(type(self)),
+            self.url,
+            self.page_no,
+            len(self.results),
+        )
+
+    def add(self, page):
+        # Extend one list in place as each page arrives. Concatenating
+        # would copy everything collected so far on every page, which is
+        # quadratic in the number of pages and briefly doubles the memory
+        # used by the results.
+        self.results.extend(page["results"])
+        self.page_no = int(page.get("pageNo") or self.page_no + 1)
+
+    def to_dict(self):
+        return {"url": self.url, "page_no": self.page_no, "results": self.results}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["url"], data["page_no"], data["results"])
+
+
+class PartialResult(RuntimeError):
+    """Raised when a page after the first of a paginated GET cannot be
+    fetched, even after retrying it. "results" holds the records of the
+    pages that were received and "checkpoint" can be passed to get() to
+    fetch the rest. The original error is the __cause__ of this one."""
+
+    def __init__(self, msg, checkpoint):
+        super(PartialResult, self).__init__(msg)
+        self.checkpoint = checkpoint
+
+    @property
+    def results(self):
+        return self.checkpoint.results
+
+
 class ApiObject(object):
-    def __init__(self, url, auth, tracker=None, session=None):
+    # There is one of these for every wrapper object in the tree so keep
+    # them compact.
+    __slots__ = (
+        "auth",
+        "baseurl",
+        "cache",
+        "codec",
+        "compressor",
+        "flights",
+        "hooks",
+        "page_workers",
+        "session",
+        "timeout",
+        "tracker",
+        "validators",
+    )
+
+    # A page of a paginated result that still fails after the session has
+    # given up retrying it is fetched again this many times, after a delay
+    # of PAGE_BACKOFF seconds that doubles each time, before the crawl fails.
+    # Only that page is fetched again, not the pages before it.
+    PAGE_RETRIES = 2
+    PAGE_BACKOFF = 1.0
+    PAGE_RETRY_STATUSES = RetryPolicy.THROTTLE_STATUSES | RetryPolicy.TRANSIENT_STATUSES
+
+    # The largest pageSize that OpsRamp accepts, by endpoint family (see
+    # Helpers.endpoint_family) with None for the rest. This is what a
+    # page_size of "max" asks for. It is read-only, so that a subclass
+    # overrides it rather than changing it for every ApiObject.
+    MAX_PAGE_SIZES = types.MappingProxyType({None: 500})
+
+    def __init__(
+        self,
+        url,
+        auth,
+        tracker=None,
+        session=None,
+        page_workers=1,
+        codec=None,
+        cache=None,
+        hooks=None,
+        timeout=None,
+        flights=None,
+        validators=None,
+        compressor=None,
+    ):
         self.baseurl = url.rstrip("/")
         self.auth = auth
         if tracker:
@@ -160,6 +622,28 @@ class ApiObject(object):
             self.session = session
         else:
             self.session = Helpers.session_add_retry_handler()
+        # Maximum number of pages of a paginated GET to fetch concurrently.
+        # The default of 1 preserves the original strictly sequential crawl.
+        self.page_workers = page_workers
+        # How to decode responses and encode json= request bodies. See
+        # opsramp.codec.get_codec() for the possible values.
+        self.codec = get_codec(codec)
+        # An optional opsramp.cache.ResponseCache shared by the whole tree.
+        self.cache = cache
+        # Callbacks for every request made by the tree. See opsramp.hooks
+        self.hooks = Hooks() if hooks is None else hooks
+        # The timeout of each request, as for requests: seconds, a tuple of
+        # the connect and read timeouts, or None to wait forever.
+        self.timeout = timeout
+        # An optional opsramp.cache.SingleFlight that coalesces identical
+        # GETs made at the same time anywhere in the tree.
+        self.flights = flights
+        # An optional opsramp.cache.ValidatorCache used to make conditional
+        # GETs.
+        self.validators = validators
+        # An optional opsramp.compression.RequestCompressor for the bodies of
+        # large requests.
+        self.compressor = compressor
 
     def __str__(self):
         return '%s "%s" "%s"' % (
@@ -169,9 +653,25 @@ class ApiObject(object):
         )
 
     def clone(self):
-        new1 = ApiObject(self.baseurl, self.auth, self.tracker.clone(), self.session)
+        new1 = ApiObject(
+            self.baseurl,
+            self.auth,
+            self.tracker.clone(),
+            self.session,
+            page_workers=self.page_workers,
+            codec=self.codec,
+            cache=self.cache,
+            hooks=self.hooks,
+            timeout=self.timeout,
+            flights=self.flights,
+            validators=self.validators,
+            compressor=self.compressor,
+        )
         return new1
 
+    # cd(), pushd() and popd() change the URL that every user of this object
+    # sees, so clone() it first, or pass the whole suffix to each request as
+    # the wrapper classes do, if it is shared between threads.
     def cd(self, path=None):
         self.tracker.cd(path)
         return self.compute_url()
@@ -191,7 +691,120 @@ class ApiObject(object):
             self.tracker.reset()
         return self.compute_url()
 
-    def collate_pages(self, get_request, data):
+    def fetch_page(self, get_request, page_no):
+        """Fetch and decode one page of a paginated GET request, retrying it
+        as described for PAGE_RETRIES. Raises RuntimeError, or the error
+        raised by requests, if the page could not be retrieved."""
+        url = Helpers.set_query(get_request.url, pageNo=page_no)
+        for attempt in itertools.count():
+            try:
+                resp = self.send("GET", url, page=page_no, headers=get_request.headers)
+            except DeadlineExceeded:
+                raise
+            except requests.exceptions.RequestException as e:
+                if attempt >= self.PAGE_RETRIES:
+                    raise
+                LOG.debug("retrying page %d of %s: %s", page_no, get_request.url, e)
+            else:
+                if (
+                    resp.status_code not in self.PAGE_RETRY_STATUSES
+                    or attempt >= self.PAGE_RETRIES
+                ):
+                    break
+                LOG.debug("retrying page %d of %s: %s", page_no, get_request.url, resp)
+            self.page_pause(attempt, get_request.url)
+        self.check_result(get_request.url, resp)
+        return self.codec.decode(resp)
+
+    def page_backoff(self, attempt, url):
+        """Returns the delay before retrying a page for the "attempt"th time,
+        counting from zero. Raises DeadlineExceeded if that would take the
+        call past its Deadline."""
+        delay = self.PAGE_BACKOFF * (2**attempt)
+        deadline = Deadline.current()
+        if deadline is not None and delay >= deadline.remaining():
+            raise deadline.exceeded("GET", url)
+        return delay
+
+    def page_pause(self, attempt, url):
+        time.sleep(self.page_backoff(attempt, url))
+
+    def remaining_pages(self, data):
+        """Given the first page of a paginated result, return the list of
+        page numbers still to be fetched, or None if the page metadata is
+        not sufficient to work that out in advance."""
+        try:
+            page_no = int(data["pageNo"])
+            page_size = int(data["pageSize"])
+            total = int(data["totalResults"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if page_size <= 0:
+            return None
+        last_page = int(math.ceil(total / float(page_size)))
+        return list(range(page_no + 1, last_page + 1))
+
+    def prefetch_pages(self, get_request, page_numbers):
+        """Generator that fetches the given pages on a thread pool of at
+        most page_workers threads and yields them in page order. Only
+        page_workers pages are in flight or waiting to be consumed at any
+        one time so memory use stays bounded for slow consumers."""
+        workers = min(self.page_workers, len(page_numbers))
+        numbers = iter(page_numbers)
+        pending = collections.deque()
+        # Imported here because most programs never fetch pages concurrently.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                for page_no in itertools.islice(numbers, workers):
+                    pending.append(self.submit_page(pool, get_request, page_no))
+                while pending:
+                    page = pending.popleft().result()
+                    for page_no in itertools.islice(numbers, 1):
+                        pending.append(self.submit_page(pool, get_request, page_no))
+                    yield page
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def submit_page(self, pool, get_request, page_no):
+        # Run fetch_page() in a copy of the caller's context so that any
+        # Deadline or call timeout applies to it too.
+        context = contextvars.copy_context()
+        return pool.submit(context.run, self.fetch_page, get_request, page_no)
+
+    def next_pages(self, get_request, data):
+        """Generator that yields each page following the first page "data" of
+        a paginated GET request, as soon as it has been received.
+
+        If page_workers is greater than 1 and the first page says how many
+        results there are in total, the remaining pages are fetched
+        concurrently on a bounded thread pool sharing this object's session.
+        """
+        self.page_received(get_request.url, data)
+        page_numbers = None
+        if self.page_workers > 1 and data.get("nextPage"):
+            page_numbers = self.remaining_pages(data)
+        if page_numbers:
+            for page in self.prefetch_pages(get_request, page_numbers):
+                self.page_received(get_request.url, page)
+                yield page
+        else:
+            while "nextPage" in data.keys() and data["nextPage"]:
+                data = self.fetch_page(get_request, int(data["pageNo"]) + 1)
+                self.page_received(get_request.url, data)
+                yield data
+
+    def page_received(self, url, data):
+        if self.hooks and isinstance(data, dict):
+            event = RequestEvent("GET", url, page=data.get("pageNo"))
+            results = data.get("results")
+            if isinstance(results, list):
+                event.results = len(results)
+            self.hooks.fire("on_page", event)
+
+    def collate_pages(self, get_request, data, checkpoint=None):
         """Given a GET request whose results span across multiple pages, crawl
         each page and collate the results.
 
@@ -199,6 +812,9 @@ class ApiObject(object):
         :type first_page_data: dict
         :param request: Request used to get first page
         :type request: requests.PreparedRequest
+        :param checkpoint: progress so far, updated as each page arrives
+        :type checkpoint: Checkpoint
+        :raises PartialResult: if a page after the first cannot be fetched
         """
         # First, sanity check that all is good. Only process GET requests:
         if get_request.method.upper().strip() != "GET":
@@ -207,48 +823,83 @@ class ApiObject(object):
         # Only attempt to pull subsequent pages if we can verify that there are
         # subsequent pages "to be pulled"...
         if isinstance(data, dict) and "results" in data.keys():
-            collated_data = data["results"]
-            while "nextPage" in data.keys() and data["nextPage"]:
-                # Get the next page full of data.
-                next_page = self.session.get(
-                    get_request.url,
-                    params={"pageNo": int(data["pageNo"]) + 1},
-                    headers=get_request.headers,
-                )
+            if checkpoint is None:
+                checkpoint = Checkpoint()
+            checkpoint.url = get_request.url
+            checkpoint.add(data)
+            try:
+                for page in self.next_pages(get_request, data):
+                    checkpoint.add(page)
+            except (RuntimeError, requests.exceptions.RequestException) as e:
+                if isinstance(e, DeadlineExceeded):
+                    raise
+                raise self.partial_result(checkpoint, e) from e
 
-                if not next_page.ok:
-                    # Return an empty result.
-                    collated_data = []
-                    break
+            return self.collated_result(get_request.url, checkpoint.results)
+        else:
+            return data
 
-                data = next_page.json()
-                collated_data = collated_data + data["results"]
-                del next_page
+    def partial_result(self, checkpoint, error):
+        msg = "%s: got %d results from pages up to %d, then: %s" % (
+            checkpoint.url,
+            len(checkpoint.results),
+            checkpoint.page_no,
+            error,
+        )
+        LOG.debug(msg)
+        return PartialResult(msg, checkpoint)
 
-            # Dismantle the URL to see if data was requested in descending
-            # order...
-            query_params = dict(
-                urlparse.parse_qsl(urlparse.urlsplit(get_request.url).query)
-            )
-            descending_order = (
-                "isDescendingOrder" in query_params.keys()
-                and query_params["isDescendingOrder"]
+    def resume_pages(self, url, headers, checkpoint):
+        """Carries on the crawl of a paginated GET after the last page in
+        "checkpoint" and returns the collated result of all of them."""
+        get_request = requests.Request("GET", url, headers=headers).prepare()
+        if checkpoint.url != get_request.url:
+            raise ValueError(
+                "checkpoint is for %s not %s" % (checkpoint.url, get_request.url)
             )
+        try:
+            data = self.fetch_page(get_request, checkpoint.page_no + 1)
+        except DeadlineExceeded:
+            raise
+        except (RuntimeError, requests.exceptions.RequestException) as e:
+            raise self.partial_result(checkpoint, e) from e
+        return self.collate_pages(get_request, data, checkpoint)
 
-            # Re-create the final data set as if it were a single page
-            # containing all records to ensure that existing stuff that expects
-            # this data structure doesn't fall over.
-            return {
-                "results": collated_data,
-                "totalResults": len(collated_data),
-                "pageNo": 1,
-                "pageSize": len(collated_data),
-                "nextPage": False,
-                "previousPageNo": 0,
-                "descendingOrder": descending_order,
-            }
-        else:
-            return data
+    def collated_result(self, url, collated_data):
+        # Dismantle the URL to see if data was requested in descending
+        # order...
+        query_params = dict(urlparse.parse_qsl(urlparse.urlsplit(url).query))
+        descending_order = (
+            "isDescendingOrder" in query_params.keys()
+            and query_params["isDescendingOrder"]
+        )
+
+        # Re-create the final data set as if it were a single page
+        # containing all records to ensure that existing stuff that expects
+        # this data structure doesn't fall over.
+        return {
+            "results": collated_data,
+            "totalResults": len(collated_data),
+            "pageNo": 1,
+            "pageSize": len(collated_data),
+            "nextPage": False,
+            "previousPageNo": 0,
+            "descendingOrder": descending_order,
+        }
+
+    def max_page_size(self, url):
+        _, family = Helpers.endpoint_family(url)
+        return self.MAX_PAGE_SIZES.get(family, self.MAX_PAGE_SIZES[None])
+
+    def paged_url(self, url, page_size):
+        """Returns "url" asking for pages of "page_size" results, which may
+        be "max" for the largest that the endpoint accepts, or None to leave
+        that to OpsRamp."""
+        if page_size is None:
+            return url
+        if page_size == "max":
+            page_size = self.max_page_size(url)
+        return Helpers.set_query(url, pageSize=int(page_size))
 
     def compute_url(self, suffix=""):
         retval = self.baseurl
@@ -267,7 +918,7 @@ class ApiObject(object):
         hdr.update(headers)
         return hdr
 
-    def process_result(self, url, resp):
+    def check_result(self, url, resp):
         hstatus = int(resp.status_code)
         if hstatus < 200 or hstatus >= 300:
             msg = "%s %s %s %s" % (
@@ -278,8 +929,141 @@ class ApiObject(object):
             )
             LOG.debug(msg)
             raise RuntimeError(msg)
+
+    def request_timeout(self, method, url):
+        """Returns the timeout for a request, which is the one for the call
+        if there is one or else this object's, cut short to fit any
+        Deadline."""
+        timeout = CALL_TIMEOUT.get()
+        if timeout is None:
+            timeout = self.timeout
+        deadline = Deadline.current()
+        if deadline is not None:
+            timeout = deadline.cap(timeout, method, url)
+        return timeout
+
+    def session_send(self, method, url, **kwargs):
+        timeout = self.request_timeout(method, url)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        sender = getattr(self.session, method.lower())
+        try:
+            return sender(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            # requests wraps errors raised by the retry policy, including
+            # DeadlineExceeded, in a ConnectionError.
+            if e.args and isinstance(e.args[0], DeadlineExceeded):
+                raise e.args[0] from e
+            # A timeout cut short by the deadline is reported as such.
+            deadline = Deadline.current()
+            if isinstance(e, DeadlineExceeded) or deadline is None:
+                raise
+            if deadline.remaining() > 0:
+                raise
+            raise deadline.exceeded(method, url) from e
+
+    def send(self, method, url, page=None, **kwargs):
+        """Sends one request on the session, telling any hooks about it."""
+        raw_size = None
+        if self.compressor is not None:
+            raw_size = self.compress_body(kwargs)
+        key = None
+        if self.validators is not None and method == "GET":
+            key = self.validators.key(url, kwargs.get("headers"))
+            kwargs["headers"] = self.validators.conditions(key, kwargs.get("headers"))
+        if not self.hooks:
+            resp = self.session_send(method, url, **kwargs)
+            if key is not None:
+                self.revalidate(key, resp)
+            return resp
+        event = RequestEvent(method, url, page=page)
+        self.hooks.fire("before_request", event)
+        token = RequestEvent.current_var.set(event)
+        try:
+            called = event.sent = time.perf_counter()
+            resp = self.session_send(method, url, **kwargs)
+        except Exception as e:
+            event.error = e
+            event.elapsed = time.perf_counter() - event.started
+            self.hooks.fire("after_response", event)
+            raise
+        finally:
+            RequestEvent.current_var.reset(token)
+        event.elapsed = time.perf_counter() - event.started
+        # resp.elapsed runs from the call until the headers arrived, which
+        # includes any rate limiting and retries. Those are reported apart
+        # so that "ttfb" is only the time that the last attempt took.
+        headers = called + resp.elapsed.total_seconds()
+        event.ttfb = max(0.0, headers - event.sent)
+        event.retrying = max(0.0, event.sent - called - (event.queued or 0.0))
+        event.download = max(0.0, event.started + event.elapsed - headers)
+        event.status = resp.status_code
+        event.request_wire_bytes = event.body_size(resp.request.body)
+        event.request_bytes = event.request_wire_bytes
+        if raw_size is not None:
+            event.request_bytes = raw_size
+        event.response_bytes = len(resp.content)
+        # The number of bytes read by urllib3, before any decompression.
+        tell = getattr(resp.raw, "tell", None)
+        event.response_wire_bytes = tell() if tell is not None else None
+        # Any retries were made by urllib3 and are only visible now.
+        retries = getattr(resp.raw, "retries", None)
+        for attempt in getattr(retries, "history", None) or ():
+            event.retries += 1
+            retry_event = RequestEvent(method, url, page=page)
+            retry_event.status = attempt.status
+            retry_event.error = attempt.error
+            self.hooks.fire("on_retry", retry_event)
+        if key is not None:
+            event.unchanged = self.revalidate(key, resp)
+        self.hooks.fire("after_response", event)
+        return resp
+
+    def compress_body(self, kwargs):
+        """Compresses the body in "kwargs", the keyword arguments for
+        requests, if it is big enough for the compressor. json= bodies are
+        encoded by the codec first, and sent as that data whether or not
+        they are compressed so that they are only encoded once. Returns the
+        size in bytes of the body before it was compressed, or None if it
+        was left alone."""
+        if kwargs.get("files"):
+            return None
+        headers = kwargs.get("headers") or {}
+        data = kwargs.get("data")
+        if kwargs.get("json") is not None and data is None:
+            data = self.codec.dumps(kwargs["json"])
+            headers = dict(headers)
+            headers.setdefault("Content-Type", "application/json")
+            kwargs["headers"], kwargs["data"], kwargs["json"] = headers, data, None
+        elif isinstance(data, str):
+            # The compressor goes by the size in bytes.
+            data = data.encode("utf-8")
+        if not self.compressor.wanted(headers, data):
+            return None
+        kwargs["headers"], kwargs["data"] = self.compressor.compress(headers, data)
+        kwargs["json"] = None
+        return len(data)
+
+    def revalidate(self, key, resp):
+        """Records the response to a GET in the ValidatorCache, turning a 304
+        into the 200 that it stands for. Returns whether the body is the same
+        as last time."""
+        status, body, unchanged = self.validators.update(
+            key, resp.status_code, resp.headers, resp.content
+        )
+        if status != resp.status_code:
+            resp.status_code = status
+            resp.reason = "OK"
+            resp._content = body
+        return unchanged
+
+    def process_result(self, url, resp, checkpoint=None):
+        if self.cache is not None and resp.request.method != "GET":
+            # Even a failed request might have changed something.
+            self.cache.invalidate_collection(url)
+        self.check_result(url, resp)
         try:
-            data = resp.json()
+            data = self.codec.decode(resp)
             # Some GET requests return paginated output. If all the data fits
             # in one page, return just the contents of the "results" list,
             # otherwise, we need to do an assembly job to collate the entire
@@ -289,48 +1073,222 @@ class ApiObject(object):
                 and isinstance(data, dict)
                 and data.get("nextPage", None)
             ):
-                return self.collate_pages(resp.request, data=data)
+                return self.collate_pages(resp.request, data, checkpoint)
             else:
                 return data
         except JSONDecodeError:
             return resp.text
 
-    def get(self, suffix=None, headers=None):
-        url = self.compute_url(suffix)
+    def iter_pages(self, suffix=None, headers=None, page_size=None):
+        """Generator that performs a GET and yields each page of the result
+        as soon as it has been received, instead of collating all of them
+        first. A response that is not paginated is yielded as a single page.
+        """
+        url = self.paged_url(self.compute_url(suffix), page_size)
         hdr = self.prep_headers(headers)
-        resp = self.session.get(url, headers=hdr)
-        return self.process_result(url, resp)
+        resp = self.send("GET", url, headers=hdr)
+        self.check_result(url, resp)
+        try:
+            data = self.codec.decode(resp)
+        except JSONDecodeError:
+            yield resp.text
+            return
+        yield data
+        if isinstance(data, dict) and "results" in data.keys():
+            for page in self.next_pages(resp.request, data):
+                yield page
 
-    def post(self, suffix=None, headers=None, data=None, json=None, files=None):
-        url = self.compute_url(suffix)
+    def iter_results(self, suffix=None, headers=None, page_size=None):
+        """Generator that performs a GET and yields each individual record
+        from the "results" of each page as soon as that page arrives. Plain
+        lists are treated as a single page of results and any other non-empty
+        response is yielded as-is."""
+        for page in self.iter_pages(suffix, headers=headers, page_size=page_size):
+            if isinstance(page, dict) and "results" in page.keys():
+                page = page["results"]
+            if isinstance(page, list):
+                for record in page:
+                    yield record
+            elif page != "":
+                yield page
+
+    def encode_body(self, hdr, data, json, files=None):
+        """Returns the headers, data and json arguments to pass to requests,
+        giving the codec the chance to encode any json= body itself."""
+        if json is None or data is not None or files:
+            # requests ignores json= in these cases.
+            return hdr, data, json
+        return self.codec.prepare(hdr, json)
+
+    def invalidate_cache(self, suffix=None):
+        """Forgets any cached GET results for this URL and those below it."""
+        if self.cache is not None:
+            self.cache.invalidate(self.compute_url(suffix))
+
+    # The HTTP methods take an optional timeout, which overrides the one of
+    # this object for every request of the call, and an optional deadline in
+    # seconds for the whole call. See Deadline. get() also takes the size of
+    # the pages to ask for, as for paged_url(), and a Checkpoint that
+    # records, or resumes, the crawl of a paginated result.
+    def get(
+        self,
+        suffix=None,
+        headers=None,
+        timeout=None,
+        deadline=None,
+        page_size=None,
+        checkpoint=None,
+    ):
+        url = self.paged_url(self.compute_url(suffix), page_size)
         hdr = self.prep_headers(headers)
-        resp = self.session.post(url, headers=hdr, data=data, json=json, files=files)
-        return self.process_result(url, resp)
+        with call_limits(timeout, deadline):
+            if checkpoint is not None and checkpoint.page_no:
+                return self.resume_pages(url, hdr, checkpoint)
+            if self.cache is None and self.flights is None:
+                resp = self.send("GET", url, headers=hdr)
+                return self.process_result(url, resp, checkpoint)
+            return self.shared_get(url, hdr, checkpoint)
+
+    def shared_get(self, url, hdr, checkpoint=None):
+        """A GET that may be answered from the cache or by an identical GET
+        that is already in flight."""
+        generation = None
+        if self.cache is not None:
+            found, retval, generation = self.cache.lookup(url, hdr)
+            if found:
+                return retval
+
+        def fetch():
+            resp = self.send("GET", url, headers=hdr)
+            retval = self.process_result(url, resp, checkpoint)
+            if self.cache is not None:
+                self.cache.store(url, hdr, retval, generation)
+            return retval
 
-    def put(self, suffix=None, headers=None, data=None, json=None):
+        # A caller with a checkpoint wants to see every page arrive.
+        if self.flights is None or checkpoint is not None:
+            return fetch()
+        return self.flights.do(url, hdr, fetch)
+
+    def post(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        files=None,
+        timeout=None,
+        deadline=None,
+    ):
         url = self.compute_url(suffix)
-        hdr = self.prep_headers(headers)
-        resp = self.session.put(url, headers=hdr, data=data, json=json)
-        return self.process_result(url, resp)
+        hdr, data, json = self.encode_body(
+            self.prep_headers(headers), data, json, files
+        )
+        with call_limits(timeout, deadline):
+            resp = self.send(
+                "POST", url, headers=hdr, data=data, json=json, files=files
+            )
+            return self.process_result(url, resp)
 
-    def delete(self, suffix=None, headers=None, data=None, json=None):
+    def put(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        timeout=None,
+        deadline=None,
+    ):
         url = self.compute_url(suffix)
-        hdr = self.prep_headers(headers)
-        resp = self.session.delete(url, headers=hdr, data=data, json=json)
-        return self.process_result(url, resp)
+        hdr, data, json = self.encode_body(self.prep_headers(headers), data, json)
+        with call_limits(timeout, deadline):
+            resp = self.send("PUT", url, headers=hdr, data=data, json=json)
+            return self.process_result(url, resp)
 
-    def patch(self, suffix=None, headers=None, data=None, json=None):
+    def delete(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        timeout=None,
+        deadline=None,
+    ):
         url = self.compute_url(suffix)
-        hdr = self.prep_headers(headers)
-        resp = self.session.patch(url, headers=hdr, data=data, json=json)
-        return self.process_result(url, resp)
+        hdr, data, json = self.encode_body(self.prep_headers(headers), data, json)
+        with call_limits(timeout, deadline):
+            resp = self.send("DELETE", url, headers=hdr, data=data, json=json)
+            return self.process_result(url, resp)
+
+    def patch(
+        self,
+        suffix=None,
+        headers=None,
+        data=None,
+        json=None,
+        timeout=None,
+        deadline=None,
+    ):
+        url = self.compute_url(suffix)
+        hdr, data, json = self.encode_body(self.prep_headers(headers), data, json)
+        with call_limits(timeout, deadline):
+            resp = self.send("PATCH", url, headers=hdr, data=data, json=json)
+            return self.process_result(url, resp)
+
+
+# The classes loaded by api_class().
+API_CLASSES = {}
+
+
+def api_class(module, name):
+    """Returns the class "name" from "module", importing the module the
+    first time. Accessors that import their API module lazily use this
+    because it is quicker than a "from ... import" every time."""
+    try:
+        return API_CLASSES[module, name]
+    except KeyError:
+        cls = getattr(importlib.import_module(module), name)
+        return API_CLASSES.setdefault((module, name), cls)
+
+
+def memoized(method):
+    """Decorator for the accessor methods of ApiWrapper subclasses that
+    return another wrapper object, such as Tenant.resources(). The wrapper
+    is built the first time that the accessor is called with a particular
+    set of arguments and the same object is returned after that.
+
+    The wrapper gets a clone of the parent's ApiObject, so later changes to
+    the parent's settings, such as page_workers, timeout or codec, do not
+    reach wrappers that were already built. Setting the session of the
+    parent forgets them so that they are built again."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (name, args)
+        if kwargs:
+            key += (tuple(sorted(kwargs.items())),)
+        retval = self.subapis.get(key)
+        if retval is None:
+            # Concurrent first calls might both build one, but they will
+            # all get the same one back.
+            retval = self.subapis.setdefault(key, method(self, *args, **kwargs))
+        return retval
+
+    return wrapper
 
 
 class ApiWrapper(object):
+    # Subclasses that do not declare __slots__ of their own still get a
+    # __dict__ for any other attributes that they need.
+    __slots__ = ("api", "subapis")
+
     def __init__(self, apiobject, suffix=None):
         self.api = apiobject.clone()
         if suffix:
             self.api.chroot(suffix)
+        # The wrappers returned by memoized accessors.
+        self.subapis = {}
 
     def __str__(self):
         return "%s %s" % (str(type(self)), self.api)
@@ -343,18 +1301,33 @@ class ApiWrapper(object):
     def session(self, value):
         LOG.debug(value)
         self.api.session = value
+        # Wrappers built from now on will use the new session.
+        self.subapis.clear()
+
+    # The keyword arguments are those of the ApiObject methods, such as the
+    # timeout and deadline.
+    def get(self, suffix=None, headers=None, **kw):
+        return self.api.get(suffix, headers=headers, **kw)
+
+    def invalidate_cache(self, suffix=None):
+        return self.api.invalidate_cache(suffix)
 
-    def get(self, suffix=None, headers=None):
-        return self.api.get(suffix, headers=headers)
+    def iter_pages(self, suffix=None, headers=None, **kw):
+        return self.api.iter_pages(suffix, headers=headers, **kw)
 
-    def post(self, suffix=None, headers=None, data=None, json=None, files=None):
-        return self.api.post(suffix, headers=headers, data=data, json=json, files=files)
+    def iter_results(self, suffix=None, headers=None, **kw):
+        return self.api.iter_results(suffix, headers=headers, **kw)
+
+    def post(self, suffix=None, headers=None, data=None, json=None, files=None, **kw):
+        return self.api.post(
+            suffix, headers=headers, data=data, json=json, files=files, **kw
+        )
 
-    def put(self, suffix=None, headers=None, data=None, json=None):
-        return self.api.put(suffix, headers=headers, data=data, json=json)
+    def put(self, suffix=None, headers=None, data=None, json=None, **kw):
+        return self.api.put(suffix, headers=headers, data=data, json=json, **kw)
 
-    def delete(self, suffix=None, headers=None, data=None, json=None):
-        return self.api.delete(suffix, headers=headers, data=data, json=json)
+    def delete(self, suffix=None, headers=None, data=None, json=None, **kw):
+        return self.api.delete(suffix, headers=headers, data=data, json=json, **kw)
 
-    def patch(self, suffix=None, headers=None, data=None, json=None):
-        return self.api.patch(suffix, headers=headers, data=data, json=json)
+    def patch(self, suffix=None, headers=None, data=None, json=None, **kw):
+        return self.api.patch(suffix, headers=headers, data=data, json=json, **kw)
@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# benchmark.py
+# Benchmarks of the hot paths of the binding, run against in-process fake
+# transports, with stored baselines so that performance regressions can be
+# caught before they are released. Run it with
+#   python -m opsramp.benchmark --help
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import collections
+import contextlib
+import datetime
+import fnmatch
+import json
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from urllib import parse as urlparse
+
+import opsramp.binding
+from opsramp.fakeserver import Dataset, FakeOpsramp
+from opsramp.resources import list2ormp
+from opsramp.tenant import Tenant
+import requests
+from requests.structures import CaseInsensitiveDict
+
+BASE_URL = "http://api.example.com"
+TENANT = "client_1"
+
+# Python keeps freed objects for reuse, so an operation allocates less once
+# it has run a few times. The allocation is only measured after running it
+# this many times, or for this many seconds, so that it does not depend on
+# how long the throughput was measured for.
+WARMUP_OPS = 100
+WARMUP_TIME = 0.05
+
+# Each benchmark is a context manager that sets up its fixtures and yields
+# the operation to be measured, which takes no arguments.
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS[name] = contextlib.contextmanager(func)
+        return func
+
+    return decorator
+
+
+class MemoryAdapter(requests.adapters.BaseAdapter):
+    """A requests transport adapter that answers every GET from memory with
+    a page of "records", paginated in the same way as OpsRamp, so that the
+    whole client side of a request can be measured without any I/O. The
+    pages are encoded up front so that building them is not measured."""
+
+    def __init__(self, records, page_size):
+        super(MemoryAdapter, self).__init__()
+        total = len(records)
+        pages = max(1, (total + page_size - 1) // page_size)
+        self.pages = {}
+        for page_no in range(1, pages + 1):
+            first = (page_no - 1) * page_size
+            self.pages[page_no] = json.dumps(
+                {
+                    "results": records[first : first + page_size],
+                    "totalResults": total,
+                    "pageNo": page_no,
+                    "pageSize": page_size,
+                    "totalPages": pages,
+                    "nextPage": page_no < pages,
+                }
+            ).encode("utf-8")
+        self.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+
+    def send(self, request, **kwargs):
+        query = dict(urlparse.parse_qsl(urlparse.urlsplit(request.url).query))
+        resp = requests.models.Response()
+        resp.status_code = 200
+        resp.headers = self.headers
+        resp._content = self.pages[int(query.get("pageNo", 1))]
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp.elapsed = datetime.timedelta(0)
+        return resp
+
+    def close(self):
+        pass
+
+
+def memory_tree(records, page_size, page_workers=1):
+    session = requests.Session()
+    session.mount("http://", MemoryAdapter(records, page_size))
+    return opsramp.binding.Opsramp(
+        BASE_URL, "fake-token", session=session, page_workers=page_workers
+    )
+
+
+def minimal_records(count):
+    return [{"id": "%08d" % i, "name": "host-%d" % i} for i in range(count)]
+
+
+def collate_benchmark(pages, page_size=10):
+    def bench():
+        ormp = memory_tree(minimal_records(pages * page_size), page_size)
+        resources = ormp.tenant(TENANT).resources()
+
+        def op():
+            found = resources.search()
+            assert len(found["results"]) == pages * page_size
+
+        yield op
+
+    return bench
+
+
+for _pages in (1, 10, 100, 1000):
+    benchmark("collate_pages_%d" % _pages)(collate_benchmark(_pages))
+
+
+@benchmark("path_tracker_churn")
+def path_tracker_churn():
+    api = opsramp.binding.Opsramp(BASE_URL, "fake-token").api
+
+    def op():
+        for i in range(100):
+            api.pushd("tenants/%s" % TENANT)
+            api.pushd("resources")
+            api.compute_url("search")
+            api.compute_url(i)
+            api.popd()
+            api.clone().compute_url("rba/categories")
+            api.popd()
+
+    yield op
+
+
+def build_tree(tenant):
+    tenant.resources()
+    tenant.rba().categories()
+    tenant.monitoring().templates()
+    tenant.integrations().instances()
+    tenant.policies()
+    tenant.sites()
+    tenant.escalations()
+    tenant.roles()
+
+
+@benchmark("object_construction")
+def object_construction():
+    ormp = opsramp.binding.Opsramp(BASE_URL, "fake-token")
+
+    # A new Tenant each time, because its accessors only build their
+    # objects on the first call.
+    def op():
+        build_tree(Tenant(ormp, TENANT))
+
+    yield op
+
+
+@benchmark("object_reuse")
+def object_reuse():
+    ormp = opsramp.binding.Opsramp(BASE_URL, "fake-token")
+
+    def op():
+        build_tree(ormp.tenant(TENANT))
+
+    yield op
+
+
+@benchmark("decode_large_page")
+def decode_large_page():
+    records = Dataset(clients=1, resources=1000).resources[TENANT]
+    ormp = memory_tree(records, page_size=1000)
+    resources = ormp.tenant(TENANT).resources()
+
+    def op():
+        found = resources.search()
+        assert len(found["results"]) == 1000
+
+    yield op
+
+
+@benchmark("retry_path")
+def retry_path():
+    with FakeOpsramp(clients=1, resources=0, categories=10) as fake:
+        ormp = opsramp.binding.connect(fake.url, "key", "secret")
+        categories = ormp.tenant(TENANT).rba().categories()
+
+        # One request in five is retried, which the default RetryBudget
+        # can sustain indefinitely.
+        def op():
+            fake.fail_next(1, status=503, family="rba")
+            for _ in range(5):
+                assert len(categories.get()) == 10
+
+        yield op
+
+
+@benchmark("list2ormp")
+def list2ormp_wrapping():
+    records = minimal_records(1000)
+
+    def op():
+        for _ in range(10):
+            list2ormp(list(records))
+
+    yield op
+
+
+@benchmark("import_binding")
+def import_binding():
+    # Includes starting the interpreter, which is what a short-lived
+    # process pays anyway.
+    command = [sys.executable, "-c", "import opsramp.binding"]
+
+    def op():
+        subprocess.run(command, check=True)
+
+    yield op
+
+
+def import_times(module="opsramp.binding"):
+    """Imports "module" in a new interpreter with "python -X importtime" and
+    returns a dict mapping the name of every module that it imported to
+    the cumulative time that took in microseconds."""
+    command = [sys.executable, "-X", "importtime", "-c", "import " + module]
+    proc = subprocess.run(command, check=True, stderr=subprocess.PIPE, text=True)
+    retval = collections.OrderedDict()
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            retval[fields[2].strip()] = int(fields[1])
+    return retval
+
+
+def measure(op, min_time=0.2, repeat=3):
+    """Returns a dict of the best throughput in operations per second and the
+    peak memory allocated by one operation, in KB."""
+    op()
+    timer = timeit.Timer(op)
+    if min_time:
+        number, _ = timer.autorange()
+        number = max(1, int(number * min_time / 0.2))
+    else:
+        number = 1
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    warm_until = timeit.default_timer() + WARMUP_TIME
+    for _ in range(WARMUP_OPS):
+        if timeit.default_timer() > warm_until:
+            break
+        op()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        op()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "ops_per_sec": round(1.0 / best, 2) if best else float("inf"),
+        "peak_kb": round((peak - before) / 1024.0, 1),
+    }
+
+
+def run(pattern="*", min_time=0.2, repeat=3, report=None):
+    results = collections.OrderedDict()
+    for name, bench in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        with bench() as op:
+            results[name] = measure(op, min_time=min_time, repeat=repeat)
+        if report:
+            report(name, results[name])
+    return results
+
+
+def compare(results, baseline, time_threshold=0.25, alloc_threshold=0.10):
+    """Returns a list of descriptions of the results that are worse than the
+    baseline by more than the thresholds, which are fractions. Benchmarks
+    that are not in both are ignored."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        slowest = base["ops_per_sec"] * (1 - time_threshold)
+        if result["ops_per_sec"] < slowest:
+            regressions.append(
+                "%s: %.1f ops/s, baseline %.1f"
+                % (name, result["ops_per_sec"], base["ops_per_sec"])
+            )
+        # Ignore differences of less than a KB, which are just noise.
+        largest = max(base["peak_kb"] * (1 + alloc_threshold), base["peak_kb"] + 1)
+        if result["peak_kb"] > largest:
+            regressions.append(
+                "%s: peak %.1fKB allocated, baseline %.1fKB"
+                % (name, result["peak_kb"], base["peak_kb"])
+            )
+    return regressions
+
+
+def same_python(baseline):
+    """Returns whether a baseline was saved by the same version of Python as
+    this one. Allocations are stable from one machine to another, but not
+    from one Python version to another."""
+    version = baseline.get("python", "").split(".")[:2]
+    return version == list(platform.python_version_tuple()[:2])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark python-opsramp")
+    parser.add_argument("-k", dest="pattern", default="*", help="glob of names")
+    parser.add_argument("--baseline", help="JSON file of baseline results")
+    parser.add_argument(
+        "--save", action="store_true", help="save the results as the baseline"
+    )
+    parser.add_argument("--time-threshold", type=float, default=0.25)
+    parser.add_argument("--alloc-threshold", type=float, default=0.10)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--import-time",
+        metavar="MODULE",
+        help="show the slowest imports made by importing MODULE and exit",
+    )
+    args = parser.parse_args(argv)
+
+    if args.import_time:
+        times = import_times(args.import_time)
+        for name, usec in sorted(times.items(), key=lambda x: -x[1])[:20]:
+            print("%-40s %8.1fms" % (name, usec / 1000.0))
+        return 0
+
+    def report(name, result):
+        print("%-22s %12.1f ops/s %10.1fKB" % (name, *result.values()))
+
+    results = run(args.pattern, args.min_time, args.repeat, report)
+    if not args.baseline:
+        return 0
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    alloc_threshold = args.alloc_threshold
+    if not same_python(baseline):
+        print("Not comparing allocations with Python %s" % baseline.get("python"))
+        alloc_threshold = float("inf")
+    regressions = compare(
+        results, baseline["results"], args.time_threshold, alloc_threshold
+    )
+    for line in regressions:
+        print("REGRESSION " + line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
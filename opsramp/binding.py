@@ -5,7 +5,7 @@
 # binding.py
 # Defines the primary entry points for callers of this library.
 #
-# (c) Copyright 2019-2025 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2019-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -19,14 +19,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import os
+import stat
+import threading
+import time
+
 from opsramp.api import ORapi
-from opsramp.base import ApiObject
-from opsramp.globalconfig import GlobalConfig
-from opsramp.metrics import MetricsApi
+from opsramp.base import api_class, ApiObject, DEFAULT_TIMEOUT, Helpers, memoized
+from opsramp.ratelimit import FileBackend
 from opsramp.tenant import Tenant
+import requests
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
+
+LOG = logging.getLogger(__name__)
 
 
-def connect(url, key, secret):
+def token_request(url, key, secret):
+    """Returns the URL, headers and body of the OAuth2 request that exchanges
+    a key and secret for an access token."""
     auth_url = url + "/tenancy/auth/oauth/token"
     auth_hdrs = {
         "Content-Type": "application/x-www-form-urlencoded",
@@ -37,21 +48,315 @@ def connect(url, key, secret):
         "client_id=%s&"
         "client_secret=%s" % (key, secret)
     )
-    ao = ApiObject(auth_url, auth_hdrs)
-    auth_resp = ao.post(data=body)
-    token = auth_resp["access_token"]
-    return Opsramp(url, token)
+    return auth_url, auth_hdrs, body
+
+
+class TokenCache(FileBackend):
+    """Keeps access tokens in a file, readable only by its owner, so that
+    a short-lived program can reuse the token that an earlier run fetched
+    instead of fetching a new one. Tokens are kept separately for each
+    combination of URL and key. The file is locked while a new token is
+    fetched so that when many processes find that the token needs
+    replacing at the same time only one of them fetches it."""
+
+    def open(self):
+        fd = super(TokenCache, self).open()
+        if os.fstat(fd).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            os.fchmod(fd, stat.S_IRUSR | stat.S_IWUSR)
+        return fd
+
+
+class TokenManager(requests.auth.AuthBase):
+    """Keeps the access token of an Opsramp object tree valid for as long
+    as the program runs. It remembers the key and secret, fetches a new
+    token "margin" seconds before the current one expires and, if OpsRamp
+    rejects a request with 401 anyway, fetches a new one and resends the
+    request once.
+
+    It is installed as the "auth" of the shared requests session, so it
+    sees every request that the tree makes, and it stores each new token
+    in the shared auth dict that every ApiObject in the tree refers to.
+    When several threads find that the token needs replacing at the same
+    time only one of them fetches it and the rest wait for that one. Give
+    it a TokenCache to share tokens with other processes too.
+    """
+
+    def __init__(
+        self,
+        url,
+        key,
+        secret,
+        session,
+        margin=60,
+        cache=None,
+        clock=time.time,
+        timeout=None,
+    ):
+        self.auth_url, self.auth_hdrs, self.body = token_request(url, key, secret)
+        self.cache = cache
+        self.cache_key = "%s %s" % (url, key)
+        self.session = session
+        self.margin = margin
+        self.clock = clock
+        self.timeout = timeout
+        self.auth = {}
+        self.expires = None
+        self.lock = threading.Lock()
+
+    @property
+    def bearer(self):
+        return self.auth.get("Authorization")
+
+    def request_token(self):
+        """Gets a new token from OpsRamp. Returns a tuple of the token and
+        the time when it expires, or None if that is not known."""
+        ao = ApiObject(
+            self.auth_url, self.auth_hdrs, session=self.session, timeout=self.timeout
+        )
+        auth_resp = ao.post(data=self.body)
+        lifetime = auth_resp.get("expires_in")
+        expires = None
+        if lifetime is not None:
+            expires = self.clock() + float(lifetime)
+        return auth_resp["access_token"], expires
+
+    def fetch(self, rejected=None):
+        """Gets a new token, or a usable one from the cache, and returns it.
+        A cached token is not used if it is the "rejected" one."""
+        if self.cache is None:
+            token, self.expires = self.request_token()
+        else:
+
+            def reuse(entry):
+                token = entry.get("token")
+                expires = entry.get("expires")
+                usable = (
+                    token
+                    and "Bearer " + token != rejected
+                    and (expires is None or self.clock() < expires - self.margin)
+                )
+                if not usable:
+                    token, expires = self.request_token()
+                    entry.update({"token": token, "expires": expires})
+                return token, expires
+
+            token, self.expires = self.cache.update(self.cache_key, reuse)
+        self.auth["Authorization"] = "Bearer " + token
+        return token
+
+    def attach(self, ormp):
+        """Starts managing the token of an Opsramp object tree."""
+        self.auth = ormp.auth
+        ormp.session.auth = self
+
+    def expiring(self):
+        return self.expires is not None and self.clock() >= self.expires - self.margin
+
+    def refresh(self, rejected=None):
+        """Replaces the token if it is about to expire or, when "rejected"
+        is given, if it is still the one that OpsRamp rejected. Returns the
+        Authorization header to use."""
+        with self.lock:
+            if rejected is not None and rejected != self.bearer:
+                # Another thread has replaced it already.
+                pass
+            elif rejected is not None or self.expiring():
+                LOG.debug("refreshing the access token")
+                self.fetch(rejected=rejected)
+            return self.bearer
+
+    def __call__(self, request):
+        # Never interfere with the token requests themselves.
+        if request.url == self.auth_url or "Authorization" not in request.headers:
+            return request
+        if self.expiring():
+            request.headers["Authorization"] = self.refresh()
+        request.register_hook("response", self.handle_401)
+        return request
+
+    def handle_401(self, resp, **kwargs):
+        if resp.status_code != 401:
+            return resp
+        rejected = resp.request.headers.get("Authorization")
+        bearer = self.refresh(rejected=rejected)
+        # Read the rest of the body, which drains the connection so that it
+        # can be released and reused.
+        _ = resp.content
+        resp.close()
+        retry = resp.request.copy()
+        retry.headers["Authorization"] = bearer
+        new_resp = resp.connection.send(retry, **kwargs)
+        new_resp.history.append(resp)
+        new_resp.request = retry
+        return new_resp
+
+
+def connect(
+    url,
+    key,
+    secret,
+    page_workers=1,
+    pool_connections=DEFAULT_POOLSIZE,
+    pool_maxsize=None,
+    pool_block=DEFAULT_POOLBLOCK,
+    rate_limiter=None,
+    json_codec=None,
+    response_cache=None,
+    token_margin=60,
+    token_cache=None,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    coalesce=None,
+    validator_cache=None,
+    compress_requests=None,
+):
+    # Authenticate on the same session that the returned object tree will
+    # use so that the connection made for the token request is reused.
+    if session is None:
+        session = Opsramp.new_session(
+            page_workers, pool_connections, pool_maxsize, pool_block, rate_limiter
+        )
+    if token_cache is not None and not isinstance(token_cache, TokenCache):
+        token_cache = TokenCache(token_cache)
+    tokens = TokenManager(
+        url,
+        key,
+        secret,
+        session,
+        margin=token_margin,
+        cache=token_cache,
+        timeout=timeout,
+    )
+    token = tokens.fetch()
+    ormp = Opsramp(
+        url,
+        token,
+        page_workers=page_workers,
+        session=session,
+        json_codec=json_codec,
+        response_cache=response_cache,
+        timeout=timeout,
+        coalesce=coalesce,
+        validator_cache=validator_cache,
+        compress_requests=compress_requests,
+    )
+    tokens.attach(ormp)
+    return ormp
 
 
 class Opsramp(ORapi):
-    def __init__(self, url: str, token: str):
+    # The class used for the root of the API object tree. The asyncio
+    # variant of this class substitutes its own.
+    apiclass = ApiObject
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        page_workers: int = 1,
+        session=None,
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = None,
+        pool_block: bool = DEFAULT_POOLBLOCK,
+        rate_limiter=None,
+        json_codec=None,
+        response_cache=None,
+        timeout=DEFAULT_TIMEOUT,
+        coalesce=None,
+        validator_cache=None,
+        compress_requests=None,
+    ):
         self.auth = {
             "Authorization": "Bearer " + token,
             "Accept": "application/json,application/xml",
         }
-        apiobject = ApiObject(url + "/api/v2", self.auth)
+        if session is None:
+            # Every Tenant and sub-API object shares this one session, and
+            # therefore one connection pool.
+            # By keyword, because the asyncio variant of new_session() takes
+            # fewer arguments.
+            session = self.new_session(
+                page_workers=page_workers,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                rate_limiter=rate_limiter,
+            )
+        if coalesce is True:
+            from opsramp.cache import SingleFlight
+
+            coalesce = SingleFlight(json_codec)
+        if validator_cache is True:
+            from opsramp.cache import ValidatorCache
+
+            validator_cache = ValidatorCache()
+        if compress_requests:
+            from opsramp.compression import get_compressor
+
+            compress_requests = get_compressor(compress_requests)
+        apiobject = self.apiclass(
+            url + "/api/v2",
+            self.auth,
+            session=session,
+            page_workers=page_workers,
+            codec=json_codec,
+            cache=response_cache,
+            timeout=timeout,
+            flights=coalesce or None,
+            validators=validator_cache,
+            compressor=compress_requests or None,
+        )
         super(Opsramp, self).__init__(apiobject)
 
+    @staticmethod
+    def new_session(
+        page_workers=1,
+        pool_connections=DEFAULT_POOLSIZE,
+        pool_maxsize=None,
+        pool_block=DEFAULT_POOLBLOCK,
+        rate_limiter=None,
+    ):
+        # By default make sure that the pool is big enough for the
+        # concurrent page fetches.
+        pool_maxsize = pool_maxsize or max(DEFAULT_POOLSIZE, page_workers)
+        return Helpers.session_add_retry_handler(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            limiter=rate_limiter,
+        )
+
+    def pool_stats(self):
+        """Returns the utilisation of the connection pools shared by this
+        object tree. See Helpers.pool_stats()"""
+        return Helpers.pool_stats(self.session)
+
+    @property
+    def hooks(self):
+        """The opsramp.hooks.Hooks called for every request of this tree."""
+        return self.api.hooks
+
+    @property
+    def cache(self):
+        """The ResponseCache used by this object tree, or None."""
+        return self.api.cache
+
+    @property
+    def flights(self):
+        """The SingleFlight that coalesces the GETs of this tree, or None."""
+        return self.api.flights
+
+    @property
+    def compressor(self):
+        """The RequestCompressor used for the bodies of this tree, or None."""
+        return self.api.compressor
+
+    @property
+    def validators(self):
+        """The ValidatorCache used to revalidate the GETs of this tree, or
+        None."""
+        return self.api.validators
+
     def __str__(self):
         return "%s %s" % (str(type(self)), self.api)
 
@@ -65,11 +370,14 @@ class Opsramp(ORapi):
         self.auth.update({"Authorization": f"Bearer {newtok}"})
         return newtok
 
+    @memoized
     def config(self):
-        return GlobalConfig(self)
+        return api_class("opsramp.globalconfig", "GlobalConfig")(self)
 
+    @memoized
     def tenant(self, name):
         return Tenant(self, name)
 
+    @memoized
     def metrics(self):
-        return MetricsApi(self)
+        return api_class("opsramp.metrics", "MetricsApi")(self)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# cache.py
+# An optional in-memory cache of GET responses, for callers that fetch
+# the same slowly changing data over and over again, the revalidation of
+# GET responses with ETag and Last-Modified, and the coalescing of identical
+# GETs that are in flight at the same time.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import fnmatch
+import hashlib
+import logging
+import threading
+import time
+from urllib import parse as urlparse
+
+from opsramp.base import Deadline, Helpers
+from opsramp.codec import get_codec
+
+LOG = logging.getLogger(__name__)
+
+
+def url_below(url, prefix):
+    """Returns whether "url" is "prefix" itself, or below it, or it with a
+    query string. So .../sites covers .../sites/1 and .../sites?pageNo=2 but
+    not .../sites2 or .../sitesSummary."""
+    if not url.startswith(prefix):
+        return False
+    rest = url[len(prefix) :]
+    return not rest or rest[0] in "/?" or prefix.endswith(("/", "?"))
+
+
+class ResponseCache(object):
+    """A least-recently-used cache of the results of GET requests, holding
+    at most "maxsize" of them. Each result is kept for "ttl" seconds unless
+    configure() sets a different time for the endpoints that it came from.
+    A ttl of None or 0 means that results are not cached at all.
+
+    Any POST, PUT, PATCH or DELETE made through an object tree that uses
+    the cache throws away the cached results for the same collection, that
+    is the same tenant and endpoint family (see Helpers.endpoint_family),
+    so for example updating a site forgets every cached list of sites of
+    that tenant. Use invalidate() to throw results away explicitly.
+
+    Results are kept encoded, using the JSON codec given, so every caller
+    gets its own copy that it is free to modify.
+    """
+
+    def __init__(self, ttl=60, maxsize=256, codec=None, clock=time.monotonic):
+        assert maxsize >= 1
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.codec = get_codec(codec)
+        self.clock = clock
+        self.rules = []
+        self.entries = collections.OrderedDict()
+        # Bumped by every invalidation so that a GET that was already in
+        # flight does not store a result from before the change.
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, pattern, ttl):
+        """Sets the ttl for the endpoints whose path below the API version
+        matches the glob "pattern", for example "cfg/*" for the global
+        reference data or "tenants/*/sites*" for every tenant's sites. The
+        first matching pattern in the order configured wins."""
+        self.rules.append((pattern, ttl))
+
+    @staticmethod
+    def endpoint(url):
+        parts = [p for p in urlparse.urlsplit(url).path.split("/") if p]
+        if len(parts) >= 2 and parts[0] == "api":
+            parts = parts[2:]
+        return "/".join(parts)
+
+    def ttl_for(self, url):
+        endpoint = self.endpoint(url)
+        for pattern, ttl in self.rules:
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return ttl
+        return self.ttl
+
+    @staticmethod
+    def key(url, headers):
+        # The headers are part of the key because they include the token
+        # and the content type that was asked for.
+        return (url, tuple(sorted((headers or {}).items())))
+
+    def lookup(self, url, headers):
+        """Returns a tuple of (found, value, generation). Pass the
+        generation to store() once the value has been fetched."""
+        key = self.key(url, headers)
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                found, content = True, entry[2]
+            else:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                found, content = False, None
+            generation = self.generation
+        if not found:
+            return False, None, generation
+        LOG.debug("cache hit %s", url)
+        if isinstance(content, bytes):
+            return True, self.codec.loads(content), generation
+        return True, content, generation
+
+    def store(self, url, headers, value, generation):
+        ttl = self.ttl_for(url)
+        if not ttl:
+            return
+        # Non-JSON responses come back as strings, which are immutable.
+        content = value if isinstance(value, str) else self.codec.dumps(value)
+        key = self.key(url, headers)
+        collection = Helpers.endpoint_family(url)
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (self.clock() + ttl, collection, content)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, url=None):
+        """Forgets the cached results for "url" and every URL below it (see
+        url_below()), or every cached result if it is None."""
+        with self.lock:
+            self.generation += 1
+            if url is None:
+                self.entries.clear()
+                return
+            for key in [k for k in self.entries if url_below(k[0], url)]:
+                del self.entries[key]
+
+    def invalidate_collection(self, url):
+        """Forgets the cached results for the collection that "url" is in.
+        Called for every request that might change something."""
+        collection = Helpers.endpoint_family(url)
+        with self.lock:
+            self.generation += 1
+            stale = [k for k, v in self.entries.items() if v[1] == collection]
+            for key in stale:
+                del self.entries[key]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ValidatorCache(object):
+    """Remembers the validators (ETag and Last-Modified headers) and bodies
+    of the responses to GET requests, for at most "maxsize" URLs, so that
+    the next GET of the same URL, or page of a paginated URL, can ask OpsRamp
+    to reply "304 Not Modified" instead of sending the same body again. The
+    remembered body is then used as if it had been sent.
+
+    When a response has no validators only a hash of its body is kept, so
+    that it is still known whether the body has changed since last time.
+    That is reported to the hooks as the "unchanged" attribute of the
+    RequestEvent, which is also set for a 304. The number of 304 responses
+    and of unchanged bodies without validators are counted in
+    "not_modified" and "unchanged".
+    """
+
+    CONDITIONS = frozenset(["if-none-match", "if-modified-since"])
+
+    def __init__(self, maxsize=256):
+        assert maxsize >= 1
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.not_modified = 0
+        self.unchanged = 0
+
+    def without_conditions(self, headers):
+        # The headers of the first page of a paginated GET, which are reused
+        # for the rest, carry the conditions for the first page.
+        return {
+            k: v for k, v in (headers or {}).items() if k.lower() not in self.CONDITIONS
+        }
+
+    def key(self, url, headers):
+        return ResponseCache.key(url, self.without_conditions(headers))
+
+    def conditions(self, key, headers):
+        """Returns the headers to send for the GET identified by "key",
+        which are "headers" plus any conditions that apply."""
+        retval = self.without_conditions(headers)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None:
+            etag, modified = entry[0], entry[1]
+            if etag:
+                retval["If-None-Match"] = etag
+            if modified:
+                retval["If-Modified-Since"] = modified
+        return retval
+
+    def update(self, key, status, headers, body):
+        """Records the response to the GET identified by "key". Returns the
+        status and body to use in its place, which for a 304 are the 200 and
+        body that it stands for, and whether the body is unchanged."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if status == 304 and entry is not None and entry[2] is not None:
+                self.entries.move_to_end(key)
+                self.not_modified += 1
+                return 200, entry[2], True
+            if status != 200:
+                self.entries.pop(key, None)
+                return status, body, False
+        digest = hashlib.sha1(body).digest()
+        unchanged = entry is not None and entry[3] == digest
+        etag = headers.get("ETag")
+        modified = headers.get("Last-Modified")
+        # Without validators the body can never be reused.
+        kept = body if etag or modified else None
+        with self.lock:
+            if unchanged and kept is None:
+                self.unchanged += 1
+            self.entries[key] = (etag, modified, kept, digest)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return status, body, unchanged
+
+    def invalidate(self, url=None):
+        """Forgets the validators for "url" and every URL below it (see
+        url_below()), or all of them if it is None."""
+        with self.lock:
+            if url is None:
+                self.entries.clear()
+                return
+            for key in [k for k in self.entries if url_below(k[0], url)]:
+                del self.entries[key]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class Flight(object):
+    """One GET that is in flight, with the callers that are waiting for it.
+    For threads "done" is set when it has finished, and for asyncio
+    "future" is the task that is fetching it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.future = None
+        self.waiters = 0
+        self.result = None
+        self.content = None
+        self.error = None
+
+    def failure(self):
+        """Returns a copy of the exception that the flight failed with, to
+        raise in one of the callers that waited for it. Raising the same
+        exception in several threads at once would tangle their tracebacks
+        together."""
+        error = self.error
+        try:
+            copy = type(error).__new__(type(error), *error.args)
+            copy.args = error.args
+            copy.__dict__.update(vars(error))
+        except Exception:
+            return error
+        # Such as the error that a PartialResult was raised for, or else
+        # the exception that the first caller got.
+        copy.__cause__ = error.__cause__ or error
+        return copy
+
+
+class SingleFlight(object):
+    """Coalesces identical GETs, that is ones for the same URL with the same
+    headers and so the same token, that are made while one of them is still
+    in flight. Only the first is sent to OpsRamp and the rest wait for its
+    result, including every page of a paginated one, or its exception. This
+    works for threads and, separately, for the tasks of each event loop.
+
+    The first caller gets the result itself and the others get copies, made
+    with the JSON codec given, that they are free to modify. The callers
+    that were spared a request are counted in "shared".
+    """
+
+    def __init__(self, codec=None):
+        self.codec = get_codec(codec)
+        self.flights = {}
+        self.lock = threading.Lock()
+        self.shared = 0
+
+    def copy(self, flight):
+        if flight.content is None:
+            return flight.result
+        return self.codec.loads(flight.content)
+
+    def join(self, key):
+        """Returns a tuple of the Flight for "key" and whether the caller is
+        the one that must make the request."""
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.shared += 1
+                return flight, False
+            flight = self.flights[key] = Flight()
+            return flight, True
+
+    def land(self, key, flight):
+        with self.lock:
+            del self.flights[key]
+        # Nobody can join the flight now, so encode the result once for all
+        # of the callers waiting for it.
+        if flight.error is None and flight.waiters:
+            if not isinstance(flight.result, str):
+                flight.content = self.codec.dumps(flight.result)
+
+    def do(self, url, headers, fetch):
+        """Returns the result of fetch(), which performs the GET of "url"
+        with "headers", or of the identical call that is already in flight.
+        A caller that waits for another's call still keeps to its own
+        Deadline, and raises DeadlineExceeded if that runs out first.
+        """
+        key = ResponseCache.key(url, headers)
+        flight, leader = self.join(key)
+        if not leader:
+            LOG.debug("waiting for GET %s in flight", url)
+            deadline = Deadline.current()
+            timeout = None if deadline is None else max(0.0, deadline.remaining())
+            if not flight.done.wait(timeout):
+                raise deadline.exceeded("GET", url)
+            if flight.error is not None:
+                raise flight.failure()
+            return self.copy(flight)
+        try:
+            flight.result = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self.land(key, flight)
+            flight.done.set()
+        return flight.result
+
+    async def ado(self, url, headers, fetch):
+        """asyncio equivalent of do(), where fetch() returns an awaitable. The
+        request runs as a task of its own so that cancelling any of the
+        callers, including the first, does not cancel it for the rest."""
+        # Imported here so that threaded programs do not pay for it.
+        import asyncio
+
+        key = (asyncio.get_running_loop(), ResponseCache.key(url, headers))
+        flight, leader = self.join(key)
+        if leader:
+            flight.future = asyncio.ensure_future(fetch())
+
+            def landed(future):
+                if future.cancelled():
+                    flight.error = asyncio.CancelledError()
+                else:
+                    flight.error = future.exception()
+                    flight.result = None if flight.error else future.result()
+                self.land(key, flight)
+
+            # Added before anyone awaits the task, so that this runs before
+            # any of the callers gets the result and can change it.
+            flight.future.add_done_callback(landed)
+            return await asyncio.shield(flight.future)
+        LOG.debug("waiting for GET %s in flight", url)
+        deadline = Deadline.current()
+        timeout = None if deadline is None else max(0.0, deadline.remaining())
+        done, _ = await asyncio.wait([flight.future], timeout=timeout)
+        if not done:
+            raise deadline.exceeded("GET", url)
+        if flight.error is not None:
+            raise flight.failure()
+        return self.copy(flight)
@@ -28,10 +28,14 @@ OPSRAMP_URL = os.environ["OPSRAMP_URL"]
 OPSRAMP_KEY = os.environ["OPSRAMP_KEY"]
 OPSRAMP_SECRET = os.environ["OPSRAMP_SECRET"]
 OPSRAMP_TENANT_ID = os.environ["OPSRAMP_TENANT_ID"]
+# Optional file in which to keep the access token between runs.
+OPSRAMP_TOKEN_CACHE = os.environ.get("OPSRAMP_TOKEN_CACHE")
 
 
 def do_auth():
-    return opsramp.binding.connect(OPSRAMP_URL, OPSRAMP_KEY, OPSRAMP_SECRET)
+    return opsramp.binding.connect(
+        OPSRAMP_URL, OPSRAMP_KEY, OPSRAMP_SECRET, token_cache=OPSRAMP_TOKEN_CACHE
+    )
 
 
 # Ideas for the cli syntax:
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# client_metrics.py
+# Counters and histograms describing the requests that this library makes,
+# which programs that embed it can expose in the Prometheus text format.
+# Not to be confused with metrics.py, which covers the OpsRamp metrics API.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import threading
+
+from opsramp.base import Helpers
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter(object):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, labels, value
+
+    def as_dict(self):
+        return [
+            dict(zip(self.labelnames, labels), value=value)
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Histogram(object):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.values = {}
+
+    def observe(self, labels, value):
+        counts, total = self.values.get(labels, ([0] * len(self.buckets), 0.0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        self.values[labels] = (counts, total + value)
+
+    def samples(self):
+        for labels, (counts, total) in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, counts):
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                yield self.name + "_bucket", labels + (("le", le),), count
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, counts[-1]
+
+    def as_dict(self):
+        retval = []
+        for labels, (counts, total) in sorted(self.values.items()):
+            buckets = {
+                "+Inf" if math.isinf(b) else b: c for b, c in zip(self.buckets, counts)
+            }
+            retval.append(
+                dict(
+                    zip(self.labelnames, labels),
+                    buckets=buckets,
+                    sum=total,
+                    count=counts[-1],
+                )
+            )
+        return retval
+
+
+class ClientMetrics(object):
+    """Keeps counts of the requests made by one or more Opsramp object
+    trees, broken down by endpoint family (see Helpers.endpoint_family)
+    rather than by tenant so that the number of series stays small.
+
+    Call attach() with an Opsramp object to start counting its requests,
+    which is done with the hooks described in opsramp.hooks, then use
+    render() to get the metrics in the Prometheus text format or as_dict()
+    to get them as plain Python data.
+    """
+
+    def __init__(self, prefix="opsramp_client", buckets=DEFAULT_BUCKETS):
+        self.lock = threading.Lock()
+        self.requests = Counter(
+            prefix + "_requests_total",
+            "Requests completed, by status or 'error' if there was no response.",
+            ("family", "method", "status"),
+        )
+        self.latency = Histogram(
+            prefix + "_request_duration_seconds",
+            "Time taken by each request, including any retries.",
+            ("family", "method"),
+            buckets=buckets,
+        )
+        self.retries = Counter(
+            prefix + "_retries_total",
+            "Attempts that were retried.",
+            ("family", "status"),
+        )
+        self.throttled = Counter(
+            prefix + "_throttled_total",
+            "429 (Too Many Requests) responses, whether retried or not.",
+            ("family",),
+        )
+        self.pages = Counter(
+            prefix + "_pages_total",
+            "Pages of paginated GET requests received.",
+            ("family",),
+        )
+        self.response_bytes = Counter(
+            prefix + "_response_bytes_total",
+            "Bytes of response bodies received for decoding.",
+            ("family",),
+        )
+        self.request_bytes = Counter(
+            prefix + "_request_bytes_total",
+            "Bytes of request bodies sent, where the size is known.",
+            ("family",),
+        )
+        self.response_wire_bytes = Counter(
+            prefix + "_response_wire_bytes_total",
+            "Bytes of response bodies received, before any decompression.",
+            ("family",),
+        )
+        self.request_wire_bytes = Counter(
+            prefix + "_request_wire_bytes_total",
+            "Bytes of request bodies sent, after any compression.",
+            ("family",),
+        )
+        self.collectors = [
+            self.requests,
+            self.latency,
+            self.retries,
+            self.throttled,
+            self.pages,
+            self.response_bytes,
+            self.request_bytes,
+            self.response_wire_bytes,
+            self.request_wire_bytes,
+        ]
+
+    def attach(self, ormp):
+        """Starts counting the requests made by an Opsramp object tree. The
+        same ClientMetrics can be attached to several trees."""
+        hooks = ormp.hooks
+        hooks.add("after_response", self.after_response)
+        hooks.add("on_retry", self.on_retry)
+        hooks.add("on_page", self.on_page)
+        return self
+
+    @staticmethod
+    def family(event):
+        return Helpers.endpoint_family(event.url)[1]
+
+    def after_response(self, event):
+        family = self.family(event)
+        status = "error" if event.status is None else str(event.status)
+        with self.lock:
+            self.requests.inc((family, event.method, status))
+            if event.elapsed is not None:
+                self.latency.observe((family, event.method), event.elapsed)
+            if event.status == 429:
+                self.throttled.inc((family,))
+            if event.response_bytes:
+                self.response_bytes.inc((family,), event.response_bytes)
+            if event.request_bytes:
+                self.request_bytes.inc((family,), event.request_bytes)
+            if event.response_wire_bytes:
+                self.response_wire_bytes.inc((family,), event.response_wire_bytes)
+            if event.request_wire_bytes:
+                self.request_wire_bytes.inc((family,), event.request_wire_bytes)
+
+    def on_retry(self, event):
+        family = self.family(event)
+        status = "error" if event.status is None else str(event.status)
+        with self.lock:
+            self.retries.inc((family, status))
+            if event.status == 429:
+                self.throttled.inc((family,))
+
+    def on_page(self, event):
+        with self.lock:
+            self.pages.inc((self.family(event),))
+
+    def as_dict(self):
+        """Returns every metric as a dict mapping its name to a list of
+        dicts, one for each combination of labels that has been seen."""
+        with self.lock:
+            return {c.name: c.as_dict() for c in self.collectors}
+
+    @staticmethod
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for collector in self.collectors:
+                lines.append("# HELP %s %s" % (collector.name, collector.documentation))
+                lines.append("# TYPE %s %s" % (collector.name, collector.kind))
+                for name, labels, value in collector.samples():
+                    pairs = list(zip(collector.labelnames, labels))
+                    # Histogram buckets carry an extra "le" label.
+                    pairs += labels[len(collector.labelnames) :]
+                    text = ",".join('%s="%s"' % (k, self.escape(v)) for k, v in pairs)
+                    lines.append("%s{%s} %s" % (name, text, value))
+        return "\n".join(lines) + "\n"
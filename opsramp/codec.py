@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# codec.py
+# Pluggable JSON encoding and decoding, so that callers who move a lot of
+# data can use a faster JSON library than the one built into requests.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+
+import simplejson
+from simplejson.errors import JSONDecodeError
+
+
+class JsonCodec(object):
+    """The default codec, which leaves decoding responses and encoding
+    json= request bodies to requests, which uses simplejson if it is
+    installed. Decoding errors raise simplejson's JSONDecodeError."""
+
+    name = "simplejson"
+
+    def loads(self, content):
+        return simplejson.loads(content)
+
+    def dumps(self, obj):
+        return simplejson.dumps(obj).encode("utf-8")
+
+    def decode(self, resp):
+        return resp.json()
+
+    def prepare(self, headers, obj):
+        """Returns the (headers, data, json) arguments to pass to requests
+        in order to send obj as a JSON request body."""
+        return headers, None, obj
+
+
+class FastJsonCodec(JsonCodec):
+    """Base class for codecs that use a faster third party JSON library.
+    These decode straight from the raw bytes of the response, without
+    requests guessing the character set first, and encode request bodies
+    themselves. Decoding errors are converted to JSONDecodeError so that
+    callers see the same exception whichever codec is in use."""
+
+    module = None
+
+    def __init__(self):
+        # Raises ImportError if the library is not installed.
+        self.lib = importlib.import_module(self.module)
+
+    def decode(self, resp):
+        return self.loads(resp.content)
+
+    def prepare(self, headers, obj):
+        hdr = dict(headers)
+        hdr.setdefault("Content-Type", "application/json")
+        return hdr, self.dumps(obj), None
+
+
+class OrjsonCodec(FastJsonCodec):
+    name = "orjson"
+    module = "orjson"
+
+    def loads(self, content):
+        try:
+            return self.lib.loads(content)
+        except self.lib.JSONDecodeError as e:
+            raise JSONDecodeError(str(e), "", 0)
+
+    def dumps(self, obj):
+        return self.lib.dumps(obj)
+
+
+class MsgspecCodec(FastJsonCodec):
+    name = "msgspec"
+    module = "msgspec"
+
+    def __init__(self):
+        super(MsgspecCodec, self).__init__()
+        # Reusing these is quicker than the module level functions.
+        self.decoder = self.lib.json.Decoder()
+        self.encoder = self.lib.json.Encoder()
+
+    def loads(self, content):
+        try:
+            return self.decoder.decode(content)
+        except self.lib.DecodeError as e:
+            raise JSONDecodeError(str(e), "", 0)
+
+    def dumps(self, obj):
+        return self.encoder.encode(obj)
+
+
+# In order of preference for "auto".
+CODECS = [OrjsonCodec, MsgspecCodec, JsonCodec]
+DEFAULT_CODEC = JsonCodec()
+
+
+def get_codec(codec=None):
+    """Returns a codec object given one of:
+    - None for the default, which uses the JSON support in requests.
+    - the name of a codec: "simplejson", "orjson" or "msgspec".
+    - "auto" for the fastest one that is installed.
+    - a codec object, which is returned as-is.
+    """
+    if codec is None:
+        return DEFAULT_CODEC
+    if not isinstance(codec, str):
+        return codec
+    for codecclass in CODECS:
+        if codec in ("auto", codecclass.name):
+            try:
+                return codecclass()
+            except ImportError:
+                if codec != "auto":
+                    raise
+    raise ValueError("unknown JSON codec %s" % codec)
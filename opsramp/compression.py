@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# compression.py
+# Optional gzip compression of large request bodies, such as RBA scripts
+# with attachments, for callers whose bulk uploads are limited by the
+# bandwidth to OpsRamp.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+
+
+class RequestCompressor(object):
+    """Compresses request bodies of at least "min_size" bytes with gzip at
+    the given compression level, and sets their Content-Encoding header.
+    Smaller bodies are sent as they are, because compressing them saves
+    less time than it takes. Bodies that already have a Content-Encoding
+    are left alone, as are form fields and file uploads."""
+
+    encoding = "gzip"
+
+    def __init__(self, min_size=16384, level=6):
+        assert min_size >= 0
+        assert 0 <= level <= 9
+        self.min_size = min_size
+        self.level = level
+
+    def wanted(self, headers, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if not isinstance(body, bytes) or len(body) < self.min_size:
+            return False
+        return not any(k.lower() == "content-encoding" for k in headers)
+
+    def compress(self, headers, body):
+        """Returns the headers and body to send in place of "headers" and
+        "body", which must be wanted()."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        hdr = dict(headers)
+        hdr["Content-Encoding"] = self.encoding
+        # A fixed mtime makes the output repeatable.
+        return hdr, gzip.compress(body, compresslevel=self.level, mtime=0)
+
+
+def get_compressor(compressor=None):
+    """Returns a RequestCompressor, or None, given one of:
+    - None or False to send every request body as it is.
+    - True for a RequestCompressor with the default settings.
+    - a number of bytes, to compress the bodies of at least that size.
+    - a compressor object, which is returned as-is.
+    """
+    if compressor is None or compressor is False:
+        return None
+    if compressor is True:
+        return RequestCompressor()
+    if isinstance(compressor, int):
+        return RequestCompressor(min_size=compressor)
+    return compressor
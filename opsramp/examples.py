@@ -21,6 +21,7 @@ import os
 import opsramp.binding
 import opsramp.msp
 import opsramp.rba
+import opsramp.replay
 import yaml
 
 CATEGORY_NAME = "python-opsramp test category"
@@ -32,8 +33,24 @@ def main():
     KEY = os.environ["OPSRAMP_KEY"]
     SECRET = os.environ["OPSRAMP_SECRET"]
 
-    ormp = opsramp.binding.connect(OPSRAMP_URL, KEY, SECRET)
+    # Set OPSRAMP_RECORD to the name of a file to record this run in it,
+    # or OPSRAMP_REPLAY to replay a recorded run without the network.
+    recorder = None
+    session = None
+    if os.environ.get("OPSRAMP_REPLAY"):
+        session = opsramp.replay.replay_session(os.environ["OPSRAMP_REPLAY"])
+    elif os.environ.get("OPSRAMP_RECORD"):
+        session = opsramp.binding.Opsramp.new_session()
+        recorder = opsramp.replay.record(session, os.environ["OPSRAMP_RECORD"])
+    try:
+        ormp = opsramp.binding.connect(OPSRAMP_URL, KEY, SECRET, session=session)
+        run_examples(ormp, TENANT_ID)
+    finally:
+        if recorder:
+            recorder.close()
 
+
+def run_examples(ormp, TENANT_ID):
     # Print some random global "stuff" just to show that we can.
     cfg = ormp.config()
     print("alert types", cfg.get_alert_types())
@@ -0,0 +1,461 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# fakeserver.py
+# A local stand-in for a small part of the OpsRamp REST API, with synthetic
+# data, for load testing the binding and exercising its pagination, rate
+# limiting and retry behaviour without a real OpsRamp instance. Run it with
+#   python -m opsramp.fakeserver --help
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import collections
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import threading
+import time
+from urllib import parse as urlparse
+import uuid
+
+from opsramp.base import Helpers
+
+MSP_ID = "msp_1"
+TOKEN_PATH = "/tenancy/auth/oauth/token"
+# OpsRamp quietly gives you pages of this size if you ask for bigger ones.
+MAX_PAGE_SIZE = 500
+
+
+class Dataset(object):
+    """The synthetic objects that the server serves: one partner (MSP)
+    tenant with "clients" client tenants, each of which has "resources"
+    resources and "categories" RBA categories. The ids are derived from a
+    seed so that every run sees the same data."""
+
+    def __init__(self, clients=3, resources=100, categories=5, seed=0):
+        rng = random.Random(seed)
+
+        def new_id():
+            return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+        self.lock = threading.Lock()
+        self.new_id = new_id
+        self.clients = collections.OrderedDict()
+        self.resources = {}
+        self.categories = {}
+        for c in range(1, clients + 1):
+            client_id = "client_%d" % c
+            self.clients[client_id] = {
+                "uniqueId": client_id,
+                "name": "Client %d" % c,
+                "partnerUniqueId": MSP_ID,
+                "state": "ACTIVE",
+                "timeZone": "UTC",
+                "country": "Ireland",
+            }
+            self.resources[client_id] = [
+                {
+                    "id": new_id(),
+                    "name": "host-%d-%d" % (c, r),
+                    "hostName": "host-%d-%d.example.com" % (c, r),
+                    "ipAddress": "10.%d.%d.%d" % (c % 256, r // 256 % 256, r % 256),
+                    "resourceType": "DEVICE",
+                    "state": "active",
+                    "client": {"uniqueId": client_id},
+                    "tags": [{"name": "env", "value": "load-test"}],
+                }
+                for r in range(resources)
+            ]
+            self.categories[client_id] = [
+                {"id": n, "name": "Category %d" % n} for n in range(1, categories + 1)
+            ]
+
+    @staticmethod
+    def minimal(resource):
+        return {k: resource[k] for k in ("id", "name", "ipAddress")}
+
+
+class TokenBucket(object):
+    """Server-side rate limit. Unlike the client-side RateLimiter a request
+    that finds the bucket empty is rejected rather than queued."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+
+    def take(self):
+        """Returns 0 if the request is allowed, otherwise the number of
+        seconds until it would be."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class FakeOpsrampHandler(BaseHTTPRequestHandler):
+    # Keep connections open, as OpsRamp does, so that connection reuse by
+    # the client can be measured.
+    protocol_version = "HTTP/1.1"
+    # The headers and body are written separately, so without this each
+    # response can wait for a delayed ACK from the client.
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        try:
+            BaseHTTPRequestHandler.handle(self)
+        except ConnectionError:
+            # The client gave up waiting, for example because it timed out.
+            pass
+
+    def log_message(self, *args):
+        if self.server.fake.verbose:
+            BaseHTTPRequestHandler.log_message(self, *args)
+
+    def reply(self, code, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        if self.command == "GET" and code == 200:
+            etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+            headers = dict(headers or {}, ETag=etag)
+            if self.headers.get("If-None-Match") == etag:
+                code, payload = 304, b""
+        min_size = self.server.fake.gzip_min_size
+        accepted = self.headers.get("Accept-Encoding") or ""
+        if min_size is not None and len(payload) >= min_size and "gzip" in accepted:
+            payload = gzip.compress(payload)
+            headers = dict(headers or {})
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        # Counted first, so the stats are up to date once the client has
+        # the response.
+        self.server.fake.count(self.command, self.path, code)
+        self.wfile.write(payload)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if body and self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def handle_request(self):
+        fake = self.server.fake
+        body = self.read_body()
+        url = urlparse.urlsplit(self.path)
+        if url.path == TOKEN_PATH and self.command == "POST":
+            return self.reply(*fake.token(body))
+        if self.headers.get("Authorization") not in fake.tokens:
+            return self.reply(401, {"error": "invalid_token"})
+        tenant, family = Helpers.endpoint_family(url.path)
+        fault = fake.fault(family)
+        if fault == "reset":
+            self.close_connection = True
+            self.server.fake.count(self.command, self.path, "reset")
+            return
+        if fault:
+            return self.reply(fault, {"code": "fault", "message": "injected fault"})
+        wait = fake.throttle(tenant, family)
+        if wait:
+            retry_after = str(int(math.ceil(wait)))
+            return self.reply(
+                429, {"error": "rate limited"}, {"Retry-After": retry_after}
+            )
+        delay = fake.latency_for(family)
+        if delay:
+            time.sleep(delay)
+        query = dict(urlparse.parse_qsl(url.query))
+        self.reply(*fake.route(self.command, url.path, query, body))
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+
+class FakeOpsramp(object):
+    """A local HTTP server that behaves like enough of the OpsRamp API to
+    load test the binding:
+
+    - the token endpoint, after which requests need a valid token.
+    - tenants/{msp}/clients/minimal and clients/search.
+    - tenants/{client}, the details of one client.
+    - tenants/{client}/resources/search, resources/minimal and
+      resources/{id}.
+    - tenants/{client}/rba/categories, which can also be created and
+      deleted.
+
+    Searches are paginated in the same way as OpsRamp, honouring the
+    pageNo and pageSize query parameters up to a pageSize of MAX_PAGE_SIZE.
+    Successful GETs have an ETag, and get a 304 if it matches the
+    If-None-Match header of the request. Request bodies may be gzipped, and
+    if "gzip_min_size" is given then response bodies of at least that many
+    bytes are gzipped for clients that accept it.
+
+    "latency" is a number of seconds to delay every response by, or a dict
+    mapping endpoint families (see Helpers.endpoint_family) to delays with
+    an optional "*" default. If "rate" is given then each tenant and family
+    has a token bucket allowing "rate" requests per second with bursts of
+    "burst", and requests that exceed it get a 429 with a Retry-After
+    header. "error_rate" is the fraction of requests that fail at random
+    with "error_status", which can be "reset" to close the connection
+    without replying. fail_next() queues up specific failures.
+    """
+
+    def __init__(
+        self,
+        clients=3,
+        resources=100,
+        categories=5,
+        page_size=100,
+        latency=0,
+        rate=None,
+        burst=None,
+        error_rate=0.0,
+        error_status=503,
+        token_lifetime=3600,
+        seed=0,
+        host="127.0.0.1",
+        port=0,
+        verbose=False,
+        gzip_min_size=None,
+    ):
+        self.data = Dataset(clients, resources, categories, seed=seed)
+        self.page_size = page_size
+        self.latency = latency
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.buckets = {}
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.faults = collections.deque()
+        self.random = random.Random(seed)
+        self.token_lifetime = token_lifetime
+        self.tokens = set()
+        self.stats = collections.Counter()
+        self.verbose = verbose
+        self.gzip_min_size = gzip_min_size
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), FakeOpsrampHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self):
+        """Starts serving on a background thread. Returns the base URL to
+        pass to opsramp.binding.connect()."""
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}
+        )
+        self.thread.daemon = True
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        if self.thread:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def count(self, method, path, status):
+        family = Helpers.endpoint_family(urlparse.urlsplit(path).path)[1]
+        with self.lock:
+            self.stats[(method, family, status)] += 1
+
+    def fail_next(self, count=1, status=503, family=None):
+        """Makes the next "count" requests to "family" (or to anything if
+        it is None) fail with "status", which can also be "reset"."""
+        with self.lock:
+            for _ in range(count):
+                self.faults.append((family, status))
+
+    def fault(self, family):
+        with self.lock:
+            for i, (fault_family, status) in enumerate(self.faults):
+                if fault_family is None or fault_family == family:
+                    del self.faults[i]
+                    return status
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    def throttle(self, tenant, family):
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            key = (tenant, family)
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(self.rate, self.burst)
+            return self.buckets[key].take()
+
+    def latency_for(self, family):
+        if isinstance(self.latency, dict):
+            return self.latency.get(family, self.latency.get("*", 0))
+        return self.latency
+
+    def token(self, body):
+        fields = dict(urlparse.parse_qsl(body.decode("utf-8")))
+        if fields.get("grant_type") != "client_credentials" or not fields.get(
+            "client_secret"
+        ):
+            return 400, {"error": "invalid_request"}
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens.add("Bearer " + token)
+        return 200, {
+            "access_token": token,
+            "token_type": "bearer",
+            "expires_in": self.token_lifetime,
+            "scope": "global:manage",
+        }
+
+    def paginate(self, items, query):
+        try:
+            page_no = max(1, int(query.get("pageNo", 1)))
+            page_size = int(query.get("pageSize", self.page_size))
+            page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+        except ValueError:
+            return 400, {"code": "0001", "message": "invalid page"}
+        total = len(items)
+        first = (page_no - 1) * page_size
+        return 200, {
+            "results": items[first : first + page_size],
+            "totalResults": total,
+            "orderBy": "id",
+            "pageNo": page_no,
+            "pageSize": page_size,
+            "totalPages": int(math.ceil(total / float(page_size))),
+            "nextPage": first + page_size < total,
+            "previousPageNo": page_no - 1,
+            "descendingOrder": query.get("isDescendingOrder") == "true",
+        }
+
+    def route(self, method, path, query, body):
+        """Returns the (status, body) of the reply to an API request."""
+        parts = [p for p in path.split("/") if p]
+        if parts[:3] != ["api", "v2", "tenants"] or len(parts) < 4:
+            return 404, {"code": "0404", "message": "not found"}
+        tenant, rest = parts[3], parts[4:]
+        data = self.data
+        if tenant == MSP_ID:
+            clients = list(data.clients.values())
+            if method == "GET" and rest == ["clients", "minimal"]:
+                return 200, [
+                    {"uniqueId": c["uniqueId"], "name": c["name"]} for c in clients
+                ]
+            if method == "GET" and rest == ["clients", "search"]:
+                return self.paginate(clients, query)
+            return 404, {"code": "0404", "message": "not found"}
+        if tenant not in data.clients:
+            return 404, {"code": "0404", "message": "no such tenant"}
+        if not rest and method == "GET":
+            return 200, data.clients[tenant]
+        if rest[:1] == ["resources"] and method == "GET":
+            resources = data.resources[tenant]
+            if rest == ["resources", "search"]:
+                return self.paginate(resources, query)
+            if rest == ["resources", "minimal"]:
+                return 200, [data.minimal(r) for r in resources]
+            for r in resources:
+                if rest == ["resources", r["id"]]:
+                    return 200, r
+        if rest[:2] == ["rba", "categories"]:
+            return self.categories(method, tenant, rest[2:], body)
+        return 404, {"code": "0404", "message": "not found"}
+
+    def categories(self, method, tenant, rest, body):
+        with self.data.lock:
+            categories = self.data.categories[tenant]
+            if method == "GET" and not rest:
+                return 200, list(categories)
+            if method == "POST" and not rest:
+                try:
+                    definition = json.loads(body or b"{}")
+                except ValueError:
+                    return 400, {"code": "0400", "message": "invalid JSON"}
+                new_id = max([c["id"] for c in categories] or [0]) + 1
+                category = dict(definition, id=new_id)
+                categories.append(category)
+                return 200, category
+            if method == "DELETE" and len(rest) == 1:
+                for c in categories:
+                    if str(c["id"]) == rest[0]:
+                        categories.remove(c)
+                        return 200, None
+        return 404, {"code": "0404", "message": "not found"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for OpsRamp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--resources", type=int, default=100)
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0, help="seconds")
+    parser.add_argument("--rate", type=float, help="requests per second")
+    parser.add_argument("--burst", type=int)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--gzip-min-size", type=int, help="bytes")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    fake = FakeOpsramp(
+        clients=args.clients,
+        resources=args.resources,
+        categories=args.categories,
+        page_size=args.page_size,
+        latency=args.latency,
+        rate=args.rate,
+        burst=args.burst,
+        error_rate=args.error_rate,
+        host=args.host,
+        port=args.port,
+        verbose=args.verbose,
+        gzip_min_size=args.gzip_min_size,
+    )
+    print("serving a fake OpsRamp on %s, any key and secret will do" % fake.url)
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    fake.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
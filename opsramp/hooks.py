@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# hooks.py
+# Callbacks that let callers observe every request that the binding makes,
+# for example to feed their own metrics or to find slow endpoints.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextvars
+import logging
+import re
+import time
+from urllib import parse as urlparse
+
+LOG = logging.getLogger(__name__)
+
+UUID_RE = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+
+def url_template(url):
+    """Returns the path of a URL with the parts that identify a particular
+    object replaced by placeholders, so that all the requests to the same
+    endpoint can be grouped together. For example
+    .../tenants/client_1/resources/0a1b...ef returns
+    /api/v2/tenants/{tenant}/resources/{uuid}"""
+    parts = urlparse.urlsplit(url).path.split("/")
+    for i, part in enumerate(parts):
+        if i > 0 and parts[i - 1] == "tenants":
+            parts[i] = "{tenant}"
+        elif UUID_RE.match(part):
+            parts[i] = "{uuid}"
+        elif part.isdigit():
+            parts[i] = "{id}"
+    return "/".join(parts)
+
+
+class RequestEvent(object):
+    """Describes one request, or one page of a paginated GET, to the hook
+    callbacks. Attributes that are not known yet, or do not apply, are None.
+
+    - method, url and template: see url_template()
+    - page: the page number, for pages of a paginated GET.
+    - results: for on_page, the number of results in the page.
+    - status: the HTTP status, or for on_retry that of the attempt that
+      is being retried.
+    - error: the exception, if the request failed without a response.
+    - retries: the number of times that the request was retried.
+    - request_bytes and response_bytes: the size of the bodies.
+    - request_wire_bytes and response_wire_bytes: the size of the bodies as
+      they were sent over the network, which is smaller if they were
+      compressed, when that is known.
+    - unchanged: for a GET made with a ValidatorCache, whether the body was
+      the same as last time, including when the status was 304.
+    - elapsed: the total time taken, in seconds. It is made up of "queued",
+      the time spent waiting for a client-side RateLimiter (None if there
+      is none), "retrying", the time spent on the attempts that were
+      retried and the delays between them, and then for the last attempt
+      "ttfb" until the response headers arrived and "download" for the
+      body. "connect" is the part of "ttfb" spent opening a new connection,
+      which only the asyncio binding measures.
+    """
+
+    # The event of the request being sent, so that the rate limiter and the
+    # retry policy below the session can record their part of the time.
+    current_var = contextvars.ContextVar("opsramp_request_event", default=None)
+
+    def __init__(self, method, url, page=None):
+        self.method = method.upper()
+        self.url = url
+        self.template = url_template(url)
+        self.page = page
+        self.results = None
+        self.status = None
+        self.error = None
+        self.retries = 0
+        self.request_bytes = None
+        self.response_bytes = None
+        self.request_wire_bytes = None
+        self.response_wire_bytes = None
+        self.unchanged = None
+        self.queued = None
+        self.retrying = None
+        self.connect = None
+        self.ttfb = None
+        self.download = None
+        self.elapsed = None
+        self.started = time.perf_counter()
+        # When the last attempt was sent, once it has been.
+        self.sent = None
+
+    @classmethod
+    def current(cls):
+        return cls.current_var.get()
+
+    def waited(self, seconds):
+        """Adds time spent waiting for a client-side rate limiter."""
+        self.queued = (self.queued or 0.0) + seconds
+
+    def __repr__(self):
+        return "<RequestEvent %s %s %s>" % (self.method, self.template, self.status)
+
+    @staticmethod
+    def body_size(body):
+        if body is None:
+            return 0
+        if isinstance(body, (bytes, str)):
+            return len(body)
+        return None
+
+    def as_dict(self):
+        retval = dict(vars(self))
+        del retval["started"]
+        del retval["sent"]
+        return retval
+
+
+class Hooks(object):
+    """The callbacks for the requests made by an object tree. Each one is
+    called with a RequestEvent:
+
+    - before_request: just before a request is sent.
+    - after_response: once the whole response has been received, or the
+      request has failed.
+    - on_retry: for each attempt that was retried. The synchronous binding
+      only finds out about these once the request has finished.
+    - on_page: for each page of a paginated GET.
+
+    Exceptions raised by the callbacks are logged and otherwise ignored.
+    """
+
+    EVENTS = ("before_request", "after_response", "on_retry", "on_page")
+
+    def __init__(self):
+        self.callbacks = {name: [] for name in self.EVENTS}
+
+    def add(self, name, func):
+        """Registers func as a callback. Returns func, so that this can be
+        used as a decorator."""
+        if name not in self.callbacks:
+            raise ValueError("unknown hook %s" % name)
+        self.callbacks[name].append(func)
+        return func
+
+    def remove(self, name, func):
+        self.callbacks[name].remove(func)
+
+    def __bool__(self):
+        return any(self.callbacks.values())
+
+    def fire(self, name, event):
+        for func in self.callbacks[name]:
+            try:
+                func(event)
+            except Exception:
+                LOG.exception("%s hook failed", name)
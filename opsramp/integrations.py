@@ -22,6 +22,7 @@
 import os
 
 from opsramp.api import ORapi
+from opsramp.base import memoized
 
 """
 POST install/{intgld} e.g. CUSTOM
@@ -47,9 +48,11 @@ class Integrations(ORapi):
     def __init__(self, parent):
         super(Integrations, self).__init__(parent.api, "integrations")
 
+    @memoized
     def itypes(self):
         return Types(self)
 
+    @memoized
     def instances(self):
         return Instances(self)
 
@@ -21,18 +21,22 @@
 # limitations under the License.
 
 from opsramp.api import ORapi
+from opsramp.base import memoized
 
 
 class KnowledgeBase(ORapi):
     def __init__(self, parent):
         super(KnowledgeBase, self).__init__(parent.api, "kb")
 
+    @memoized
     def categories(self):
         return KBcategories(self)
 
+    @memoized
     def articles(self):
         return KBarticles(self)
 
+    @memoized
     def templates(self):
         return KBtemplates(self)
 
@@ -20,12 +20,14 @@
 # limitations under the License.
 
 from opsramp.api import ORapi
+from opsramp.base import memoized
 
 
 class Monitoring(ORapi):
     def __init__(self, parent):
         super(Monitoring, self).__init__(parent.api, "monitoring")
 
+    @memoized
     def templates(self):
         return Templates(self)
 
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# ratelimit.py
+# Client-side rate limiting, so that callers slow down before OpsRamp
+# starts rejecting requests instead of only reacting to 429 responses.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from email.utils import parsedate_to_datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from opsramp.base import Helpers, RetryPolicy
+from opsramp.hooks import RequestEvent
+import requests
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where FileBackend cannot be used.
+    fcntl = None
+
+LOG = logging.getLogger(__name__)
+
+
+class MemoryBackend(object):
+    """Keeps the state of every bucket in memory, shared by all the threads
+    of one process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def update(self, key, func):
+        with self.lock:
+            return func(self.buckets.setdefault(key, {}))
+
+
+class FileBackend(object):
+    """Keeps the state of every bucket in a small JSON file so that all the
+    worker processes on one machine that use the same file share the same
+    buckets. Updates are serialised using POSIX advisory file locking."""
+
+    def __init__(self, path):
+        assert fcntl, "FileBackend requires POSIX file locking"
+        self.path = path
+        self.lock = threading.Lock()
+
+    def open(self):
+        return os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def update(self, key, func):
+        with self.lock:
+            fd = self.open()
+            with os.fdopen(fd, "r+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    content = f.read()
+                    buckets = json.loads(content) if content else {}
+                    retval = func(buckets.setdefault(key, {}))
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(buckets, f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return retval
+
+
+class RateLimitedAdapter(requests.adapters.HTTPAdapter):
+    """An HTTPAdapter that asks a RateLimiter for permission before sending
+    each request and tells it about the rate limiting information in each
+    response.
+
+    urllib3 makes the retries below the adapter, so the limiter is handed
+    to the RetryPolicy too, which takes a token for each retry and tells
+    the limiter about each response that it retries."""
+
+    def __init__(self, limiter, **kwargs):
+        self.limiter = limiter
+        super(RateLimitedAdapter, self).__init__(**kwargs)
+        if isinstance(self.max_retries, RetryPolicy):
+            self.max_retries = self.max_retries.new(limiter=limiter)
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        self.limiter.acquire(request.url)
+        event = RequestEvent.current()
+        if event is not None:
+            event.sent = time.perf_counter()
+            event.waited(event.sent - started)
+        resp = super(RateLimitedAdapter, self).send(request, **kwargs)
+        self.limiter.observe(request.url, resp.status_code, resp.headers)
+        return resp
+
+
+class RateLimiter(object):
+    """A token bucket rate limiter with one bucket for each combination of
+    tenant and endpoint family (see Helpers.endpoint_family) so that, for
+    example, a burst of resource searches on one client does not hold up
+    alert updates on another.
+
+    "rate" is the number of requests per second that each bucket allows
+    and "burst" is how many requests can be made back-to-back after a quiet
+    period. Use configure() to set different limits for particular tenants
+    or endpoint families. A rate of None means no limit.
+
+    The limiter learns from the responses it sees. A 429 response empties
+    the bucket, blocks it until the time given in any Retry-After header and,
+    if "adaptive" is set, halves the rate of that bucket. The rate then
+    creeps back up towards the configured rate with each successful request.
+    X-RateLimit-Remaining and X-RateLimit-Reset headers are honoured too.
+
+    Pass a FileBackend to share the buckets between worker processes.
+    """
+
+    RECOVERY_STEP = 0.05
+    MIN_RATE_FRACTION = 0.1
+
+    def __init__(
+        self,
+        rate=None,
+        burst=None,
+        backend=None,
+        adaptive=True,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.rules = {}
+        self.configure(rate, burst)
+        self.backend = backend or MemoryBackend()
+        self.adaptive = adaptive
+        self.clock = clock
+        self.sleep = sleep
+
+    def configure(self, rate, burst=None, tenant=None, family=None):
+        if rate is not None:
+            assert rate > 0
+            burst = burst or max(1, int(rate))
+        self.rules[(tenant, family)] = (rate, burst)
+
+    def rule(self, tenant, family):
+        # The most specific rule wins.
+        for key in ((tenant, family), (tenant, None), (None, family)):
+            if key in self.rules:
+                return self.rules[key]
+        return self.rules[(None, None)]
+
+    def adapter(self, **kwargs):
+        """Returns an HTTPAdapter that applies this limiter. Used by
+        Helpers.session_add_retry_handler()"""
+        return RateLimitedAdapter(self, **kwargs)
+
+    @staticmethod
+    def refill(bucket, rate, burst, now):
+        rate = min(bucket.get("rate", rate), rate)
+        tokens = bucket.get("tokens", float(burst))
+        elapsed = max(0.0, now - bucket.get("stamp", now))
+        bucket["tokens"] = min(float(burst), tokens + elapsed * rate)
+        bucket["stamp"] = now
+        bucket["rate"] = rate
+        return bucket
+
+    def reserve(self, url):
+        """Takes a token from the bucket for this URL and returns the number
+        of seconds that the caller must wait before using it."""
+        tenant, family = Helpers.endpoint_family(url)
+        rate, burst = self.rule(tenant, family)
+        if not rate:
+            return 0.0
+        now = self.clock()
+
+        def take(bucket):
+            self.refill(bucket, rate, burst, now)
+            # Tokens can go negative, which queues the callers up behind
+            # each other in the order that they arrived.
+            bucket["tokens"] -= 1
+            wait = -bucket["tokens"] / bucket["rate"]
+            return max(0.0, wait, bucket.get("blocked", 0.0) - now)
+
+        return self.backend.update("%s/%s" % (tenant, family), take)
+
+    def acquire(self, url):
+        """Blocks until a request to this URL is allowed."""
+        delay = self.reserve(url)
+        if delay > 0:
+            LOG.debug("rate limiting %s for %.3fs", url, delay)
+            self.sleep(delay)
+        return delay
+
+    @staticmethod
+    def parse_delay(value, now):
+        """Converts a Retry-After or X-RateLimit-Reset value, which can be a
+        number of seconds, an epoch timestamp or an HTTP date, into a number
+        of seconds from now."""
+        if value is None:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - now
+            except (TypeError, ValueError):
+                return None
+        else:
+            # Big numbers are timestamps rather than durations. OpsRamp
+            # uses milliseconds in some places.
+            if delay > 1e12:
+                delay = delay / 1000.0 - now
+            elif delay > 1e9:
+                delay = delay - now
+        return max(0.0, delay)
+
+    def observe(self, url, status, headers):
+        """Updates the bucket for this URL from a response."""
+        tenant, family = Helpers.endpoint_family(url)
+        rate, burst = self.rule(tenant, family)
+        if not rate:
+            return
+        now = self.clock()
+        throttled = int(status) == 429
+        retry_after = self.parse_delay(headers.get("Retry-After"), now)
+        reset = self.parse_delay(headers.get("X-RateLimit-Reset"), now)
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining"))
+        except (TypeError, ValueError):
+            remaining = None
+
+        def learn(bucket):
+            self.refill(bucket, rate, burst, now)
+            blocked = bucket.get("blocked", 0.0)
+            if throttled:
+                bucket["tokens"] = min(bucket["tokens"], 0.0)
+                if retry_after is not None:
+                    blocked = max(blocked, now + retry_after)
+                if self.adaptive:
+                    floor = rate * self.MIN_RATE_FRACTION
+                    bucket["rate"] = max(floor, bucket["rate"] / 2.0)
+            elif self.adaptive:
+                step = rate * self.RECOVERY_STEP
+                bucket["rate"] = min(rate, bucket["rate"] + step)
+            if remaining is not None:
+                bucket["tokens"] = min(bucket["tokens"], float(remaining))
+                if remaining <= 0 and reset is not None:
+                    blocked = max(blocked, now + reset)
+            bucket["blocked"] = blocked
+
+        self.backend.update("%s/%s" % (tenant, family), learn)
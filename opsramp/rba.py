@@ -20,12 +20,14 @@
 # limitations under the License.
 
 from opsramp.api import ORapi
+from opsramp.base import memoized
 
 
 class Rba(ORapi):
     def __init__(self, parent):
         super(Rba, self).__init__(parent.api, "rba")
 
+    @memoized
     def categories(self):
         return Categories(self)
 
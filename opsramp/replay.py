@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+#
+# A minimal Python language binding for the OpsRamp REST API.
+#
+# replay.py
+# Record the requests that a program makes to OpsRamp and replay them later
+# without a network connection, for repeatable benchmarks and profiling.
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import collections
+import datetime
+import gzip
+import json
+import threading
+import time
+from urllib import parse as urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+REDACTED = "REDACTED"
+
+# Keys of JSON objects, and form fields, whose values are secrets.
+SECRET_KEYS = frozenset(
+    [
+        "access_token",
+        "refresh_token",
+        "client_secret",
+        "token",
+        "secret",
+        "password",
+        "apiKeyPairs",
+    ]
+)
+
+# Response headers that describe the encoding on the wire rather than the
+# (already decoded) body that is recorded.
+SKIPPED_HEADERS = frozenset(
+    ["content-encoding", "content-length", "transfer-encoding", "set-cookie"]
+)
+
+
+def scrub(data):
+    """Returns a copy of decoded JSON data with the values of SECRET_KEYS
+    replaced, in the same way as Instances.redact_response() does for
+    integration instances."""
+    if isinstance(data, dict):
+        return {k: REDACTED if k in SECRET_KEYS else scrub(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [scrub(v) for v in data]
+    return data
+
+
+def scrub_body(body):
+    """Scrubs a request or response body, which may be JSON, a form or
+    something else entirely. Returns a tuple of (text, is_base64)."""
+    if body is None:
+        return None, False
+    if isinstance(body, bytes):
+        try:
+            body = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return base64.b64encode(body).decode("ascii"), True
+    try:
+        return json.dumps(scrub(json.loads(body)), separators=(",", ":")), False
+    except ValueError:
+        pass
+    if "=" in body and " " not in body:
+        fields = urlparse.parse_qsl(body, keep_blank_values=True)
+        if fields:
+            fields = [(k, REDACTED if k in SECRET_KEYS else v) for k, v in fields]
+            return urlparse.urlencode(fields), False
+    return body, False
+
+
+def request_body(request):
+    """Returns the body of a prepared request as it was before any gzip
+    Content-Encoding was applied, see opsramp.compression, so that it can
+    be scrubbed."""
+    body = request.body
+    if body and request.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return body
+
+
+class RecordingAdapter(requests.adapters.BaseAdapter):
+    """Passes each request on to the adapter that was mounted before, and
+    writes the request and its response to a Recorder."""
+
+    def __init__(self, inner, recorder):
+        super(RecordingAdapter, self).__init__()
+        self.inner = inner
+        self.recorder = recorder
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        resp = self.inner.send(request, **kwargs)
+        content = resp.content
+        self.recorder.write(request, resp, content, time.perf_counter() - start)
+        return resp
+
+    def close(self):
+        self.inner.close()
+
+
+class Recorder(object):
+    """Writes request and response pairs to a gzipped file of JSON lines.
+    Authorization headers are left out and secrets are scrubbed from the
+    bodies. Use record() to create one."""
+
+    def __init__(self, path):
+        # The file is left open for write() until close(), or the end of a
+        # with block, closes it.
+        self.file = gzip.open(path, "wt", encoding="utf-8")  # noqa: SIM115
+        self.lock = threading.Lock()
+
+    def write(self, request, resp, content, elapsed):
+        body, body_b64 = scrub_body(request_body(request))
+        resp_body, resp_b64 = scrub_body(content)
+        record = {
+            "method": request.method,
+            "url": request.url,
+            "body": body,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": {
+                k: v
+                for k, v in resp.headers.items()
+                if k.lower() not in SKIPPED_HEADERS
+            },
+            "content": resp_body,
+            "elapsed": round(elapsed, 6),
+        }
+        if body_b64:
+            record["body_b64"] = True
+        if resp_b64:
+            record["content_b64"] = True
+        line = json.dumps(record, separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def record(session, path):
+    """Starts recording the requests made on a requests session, such as
+    the one shared by an Opsramp object tree, to the file "path". Returns
+    the Recorder, which must be closed to finish the file."""
+    recorder = Recorder(path)
+    for prefix, adapter in list(session.adapters.items()):
+        session.mount(prefix, RecordingAdapter(adapter, recorder))
+    return recorder
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """Answers requests with the responses in a file written by a Recorder.
+
+    Responses are matched on method and URL. If the same request was
+    recorded more than once then the responses are given back in the order
+    they were recorded, and the last one is repeated once they run out.
+    Each response is delayed by the time that the original took multiplied
+    by "latency_scale", so 0 replays as fast as possible."""
+
+    def __init__(self, path, latency_scale=1.0, sleep=time.sleep):
+        super(ReplayAdapter, self).__init__()
+        self.latency_scale = latency_scale
+        self.sleep = sleep
+        self.responses = collections.defaultdict(collections.deque)
+        self.lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self.responses[(entry["method"], entry["url"])].append(entry)
+
+    def next_entry(self, request):
+        with self.lock:
+            queue = self.responses.get((request.method, request.url))
+            if not queue:
+                return None
+            if len(queue) > 1:
+                return queue.popleft()
+            return queue[0]
+
+    def send(self, request, **kwargs):
+        entry = self.next_entry(request)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                "no recorded response for %s %s" % (request.method, request.url),
+                request=request,
+            )
+        delay = entry["elapsed"] * self.latency_scale
+        if delay > 0:
+            self.sleep(delay)
+        content = entry["content"] or ""
+        if entry.get("content_b64"):
+            content = base64.b64decode(content)
+        else:
+            content = content.encode("utf-8")
+        resp = requests.models.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry.get("reason")
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp._content = content
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp.elapsed = datetime.timedelta(seconds=delay)
+        return resp
+
+    def close(self):
+        pass
+
+
+def replay_session(path, latency_scale=1.0):
+    """Returns a requests session that answers every request from the file
+    "path" written by a Recorder, for use as the session of connect() or
+    an Opsramp object."""
+    adapter = ReplayAdapter(path, latency_scale=latency_scale)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
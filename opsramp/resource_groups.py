@@ -43,16 +43,16 @@ class ResourceGroups(ORapi):
         url_suffix = uuid
         return self.api.delete(url_suffix)
 
-    def search(self, pattern=""):
+    def search(self, pattern="", page_size=None):
         """returns *verbose* details about resource groups on this tenant"""
         simple_list = super(ResourceGroups, self).search(
-            pattern=pattern, suffix="search"
+            pattern=pattern, suffix="search", page_size=page_size
         )
         return list2ormp(simple_list)
 
-    def minimal(self, pattern=""):
+    def minimal(self, pattern="", page_size=None):
         """returns * minimal * details about resource groups on this tenant"""
         simple_list = super(ResourceGroups, self).search(
-            pattern=pattern, suffix="minimal"
+            pattern=pattern, suffix="minimal", page_size=page_size
         )
         return list2ormp(simple_list)
@@ -5,7 +5,7 @@
 # resources.py
 # Resource classes.
 #
-# (c) Copyright 2020-2022 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2020-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -19,12 +19,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections.abc import Awaitable
+
 from opsramp.api import ORapi
 
 
+async def alist2ormp(awaitable):
+    return list2ormp(await awaitable)
+
+
 def list2ormp(result_obj):
     """Bizarrely, OpsRamp sometimes returns a simple list for
     Resources API calls instead of its usual results struct."""
+    # With the asyncio transport (opsramp.aio) the API call has not
+    # happened yet, so do the conversion once it has.
+    if isinstance(result_obj, Awaitable):
+        return alist2ormp(result_obj)
+
     if isinstance(result_obj, dict):
         assert "results" in result_obj
         assert "totalResults" in result_obj
@@ -68,14 +79,18 @@ class Resources(ORapi):
         url_suffix = uuid
         return self.api.delete(url_suffix)
 
-    def search(self, pattern=""):
+    def search(self, pattern="", page_size=None):
         """returns *verbose* details about resources on this tenant"""
-        simple_list = super(Resources, self).search(pattern=pattern, suffix="search")
+        simple_list = super(Resources, self).search(
+            pattern=pattern, suffix="search", page_size=page_size
+        )
         return list2ormp(simple_list)
 
-    def minimal(self, pattern=""):
+    def minimal(self, pattern="", page_size=None):
         """returns *minimal* details about resources on this tenant"""
-        simple_list = super(Resources, self).search(pattern=pattern, suffix="minimal")
+        simple_list = super(Resources, self).search(
+            pattern=pattern, suffix="minimal", page_size=page_size
+        )
         return list2ormp(simple_list)
 
     def applications(self, uuid):
@@ -90,9 +105,8 @@ class Resources(ORapi):
         return self.api.get(url_suffix)
 
     def get_templates(self, uuid, pattern=None):
-        url_suffix = "{0}/templates".format(uuid)
-        self.api.pushd(url_suffix)
-        resp = super(Resources, self).search(pattern)
-        resp = self.search(pattern)
-        self.api.popd()
-        return resp
+        # Work out the URL for this call only, rather than with pushd() and
+        # popd(), because this object may be shared between threads.
+        url_suffix = "{0}/templates/search".format(uuid)
+        simple_list = super(Resources, self).search(pattern=pattern, suffix=url_suffix)
+        return list2ormp(simple_list)
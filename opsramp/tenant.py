@@ -21,22 +21,13 @@
 
 
 from opsramp.api import ORapi
-import opsramp.devmgmt
-import opsramp.escalations
-import opsramp.first_response
-import opsramp.integrations
-import opsramp.kb
-import opsramp.mgmt_profiles
-import opsramp.monitoring
-import opsramp.msp
-import opsramp.rba
-import opsramp.resource_groups
-import opsramp.resources
-import opsramp.roles
-import opsramp.service_maps
-import opsramp.sites
+from opsramp.base import api_class, memoized
 
 
+# The API modules are imported by the accessor methods, through api_class(),
+# rather than at the top of this file so that a program only pays for
+# importing the APIs that it actually uses, which matters for short-lived
+# processes.
 class Tenant(ORapi):
     def __init__(self, parent, uuid):
         super(Tenant, self).__init__(parent.api, "tenants/%s" % uuid)
@@ -45,62 +36,80 @@ class Tenant(ORapi):
     def is_client(self):
         return self.uuid[:7] == "client_"
 
+    @memoized
     def rba(self):
-        return opsramp.rba.Rba(self)
+        return api_class("opsramp.rba", "Rba")(self)
 
+    @memoized
     def monitoring(self):
-        return opsramp.monitoring.Monitoring(self)
+        return api_class("opsramp.monitoring", "Monitoring")(self)
 
+    @memoized
     def clients(self):
         assert not self.is_client()
-        return opsramp.msp.Clients(self)
+        return api_class("opsramp.msp", "Clients")(self)
 
+    @memoized
     def policies(self):
-        return opsramp.devmgmt.Policies(self)
+        return api_class("opsramp.devmgmt", "Policies")(self)
 
+    @memoized
     def discovery(self):
-        return opsramp.devmgmt.Discovery(self)
+        return api_class("opsramp.devmgmt", "Discovery")(self)
 
+    @memoized
     def integrations(self):
-        return opsramp.integrations.Integrations(self)
+        return api_class("opsramp.integrations", "Integrations")(self)
 
     def get_agent_script(self):
         assert self.is_client()
         hdr = {"Accept": "application/octet-stream,application/xml"}
         return self.api.get("agents/deployAgentsScript", headers=hdr)
 
+    @memoized
     def credential_sets(self):
-        return opsramp.devmgmt.CredentialSets(self)
+        return api_class("opsramp.devmgmt", "CredentialSets")(self)
 
+    @memoized
     def resources(self):
-        return opsramp.resources.Resources(self)
+        return api_class("opsramp.resources", "Resources")(self)
 
+    @memoized
     def roles(self):
-        return opsramp.roles.Roles(self)
+        return api_class("opsramp.roles", "Roles")(self)
 
+    @memoized
     def permission_sets(self):
-        return opsramp.roles.PermissionSets(self)
+        return api_class("opsramp.roles", "PermissionSets")(self)
 
+    @memoized
     def escalations(self):
-        return opsramp.escalations.Escalations(self)
+        return api_class("opsramp.escalations", "Escalations")(self)
 
+    @memoized
     def mgmt_profiles(self):
-        return opsramp.mgmt_profiles.Profiles(self)
+        return api_class("opsramp.mgmt_profiles", "Profiles")(self)
 
+    @memoized
     def sites(self):
-        return opsramp.sites.Sites(self)
+        return api_class("opsramp.sites", "Sites")(self)
 
+    @memoized
     def service_maps(self):
-        return opsramp.service_maps.ServiceMaps(self)
+        return api_class("opsramp.service_maps", "ServiceMaps")(self)
 
+    @memoized
     def kb(self):
-        return opsramp.kb.KnowledgeBase(self)
+        return api_class("opsramp.kb", "KnowledgeBase")(self)
 
+    @memoized
     def first_response(self):
-        return opsramp.first_response.First_Response(self)
+        return api_class("opsramp.first_response", "First_Response")(self)
 
+    @memoized
     def model_training(self):
-        return opsramp.first_response.ModelTraining(self)
+        return api_class("opsramp.first_response", "ModelTraining")(self)
 
+    @memoized
     def resource_groups(self):
-        return opsramp.resource_groups.ResourceGroups(self)
+        return api_class("opsramp.resource_groups", "ResourceGroups")(self)
@@ -34,3 +34,6 @@ coverage run --include='opsramp/*' -m pytest -vvv
 coverage report
 coverage html
 coverage xml -o ./cover/coverage.xml
+# Fails only if a benchmark is less than half as fast as its baseline,
+# which allows for the baseline being saved on a different machine.
+python -m opsramp.benchmark --baseline tests/benchmark_baseline.json --time-threshold 0.5
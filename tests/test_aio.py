@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import collections
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Thread
+import time
+import unittest
+from unittest import mock
+from urllib import parse as urlparse
+
+import aiohttp
+import opsramp.aio
+from opsramp.base import Helpers, PartialResult
+import requests
+
+TENANT = "client_unit_test"
+TOKEN = "fake-unit-test-token"
+TOTAL_RESOURCES = 45
+PAGE_SIZE = 10
+
+
+class FakeOpsrampHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, code, body):
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        etag = '"%d"' % len(payload)
+        if code == 200 and self.headers.get("If-None-Match") == etag:
+            code, payload = 304, b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if self.command == "GET" and code == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def faulty(self):
+        """Fails requests to paths ending in /drop by closing the connection
+        without replying, and those ending in /slow likewise but only after
+        a delay."""
+        name = self.path.rsplit("/", 1)[-1]
+        if name not in ("drop", "slow"):
+            return False
+        self.server.faulty[self.command, name] += 1
+        if name == "slow":
+            # Longer than the client waits, which has gone by then.
+            time.sleep(0.5)
+        self.close_connection = True
+        return True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        body = body.decode()
+        if self.faulty():
+            return
+        if self.path == "/tenancy/auth/oauth/token":
+            self.server.token_requests.append(body)
+            # The first token is TOKEN and later ones are numbered.
+            count = len(self.server.token_requests)
+            token = TOKEN if count == 1 else "%s-%d" % (TOKEN, count)
+            self.server.token = token
+            return self.reply(200, {"access_token": token, "expires_in": 3600})
+        self.reply(200, {"path": self.path, "body": body})
+
+    def do_GET(self):
+        url = urlparse.urlsplit(self.path)
+        query = dict(urlparse.parse_qsl(url.query))
+        if self.headers.get("Authorization") != "Bearer " + self.server.token:
+            return self.reply(401, {"error": "unauthorized"})
+        if self.faulty():
+            return
+        prefix = "/api/v2/tenants/%s" % TENANT
+        if url.path == prefix + "/resources/search":
+            page_no = int(query.get("pageNo", 1))
+            faults = self.server.page_faults.get(page_no)
+            if faults:
+                return self.reply(faults.pop(0), {"error": "injected fault"})
+            first = (page_no - 1) * PAGE_SIZE
+            last = min(first + PAGE_SIZE, TOTAL_RESOURCES)
+            return self.reply(
+                200,
+                {
+                    "results": [{"id": i} for i in range(first, last)],
+                    "totalResults": TOTAL_RESOURCES,
+                    "pageNo": page_no,
+                    "pageSize": PAGE_SIZE,
+                    "nextPage": last < TOTAL_RESOURCES,
+                    "queryString": query.get("queryString"),
+                },
+            )
+        if url.path == prefix + "/resources/minimal":
+            return self.reply(200, [{"id": 1}, {"id": 2}])
+        if url.path == prefix + "/sites/minimal":
+            if self.server.throttle > 0:
+                self.server.throttle -= 1
+                return self.reply(429, {"error": "slow down"})
+            return self.reply(200, [{"name": "site"}])
+        if url.path == "/api/v2/cfg/tenants/nocs":
+            return self.reply(500, {"code": "0005"})
+        self.reply(404, {"error": "not found"})
+
+
+class AsyncBindingTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpsrampHandler)
+        self.server.token_requests = []
+        self.server.token = TOKEN
+        self.server.throttle = 0
+        self.server.page_faults = {}
+        self.server.faulty = collections.Counter()
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+        self.thread = Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def asyncSetUp(self):
+        self.ormp = await opsramp.aio.connect(self.url, "key", "secret")
+        # Retry immediately so that the tests run quickly.
+        self.ormp.api.retry = Helpers.create_retry_handler(
+            retries=3,
+            backoff_factor=0,
+            status_forcelist=(429,),
+            allowed_methods=Helpers.default_retry_verbs(),
+        )
+        self.tenant = self.ormp.tenant(TENANT)
+
+    async def asyncTearDown(self):
+        await self.ormp.close()
+
+    async def test_without_session(self):
+        async with opsramp.aio.AsyncOpsramp(self.url, TOKEN) as ormp:
+            assert isinstance(ormp.session, aiohttp.ClientSession)
+            sites = await ormp.tenant(TENANT).sites().get()
+            assert sites == [{"name": "site"}]
+
+    async def test_connect(self):
+        assert isinstance(self.ormp, opsramp.aio.AsyncOpsramp)
+        assert self.ormp.token == TOKEN
+        assert self.server.token_requests == [
+            "grant_type=client_credentials&client_id=key&client_secret=secret"
+        ]
+        # The whole tree shares the session used for authentication.
+        resources = self.tenant.resources()
+        assert isinstance(resources.api, opsramp.aio.AsyncApiObject)
+        assert resources.session is self.ormp.session
+
+    async def test_token_rejected(self):
+        # OpsRamp no longer accepts the token, so a new one is fetched.
+        self.server.token = "revoked"
+        assert await self.tenant.sites().get() == [{"name": "site"}]
+        assert len(self.server.token_requests) == 2
+        assert self.ormp.token == TOKEN + "-2"
+
+    async def test_token_expiring(self):
+        tokens = self.ormp.api.tokens
+        assert tokens.expires is not None
+        tokens.expires = tokens.clock() + 30
+        assert await self.tenant.sites().get() == [{"name": "site"}]
+        assert len(self.server.token_requests) == 2
+        assert self.ormp.token == TOKEN + "-2"
+        assert tokens.expires > tokens.clock() + 3000
+
+    async def test_paginated_search(self):
+        result = await self.tenant.resources().search("queryString=x")
+        assert [r["id"] for r in result["results"]] == list(range(TOTAL_RESOURCES))
+        assert result["totalResults"] == TOTAL_RESOURCES
+        assert result["nextPage"] is False
+
+    async def test_concurrent_pages(self):
+        self.tenant.api.page_workers = 3
+        result = await self.tenant.resources().search()
+        assert [r["id"] for r in result["results"]] == list(range(TOTAL_RESOURCES))
+
+    async def test_list_result(self):
+        result = await self.tenant.resources().minimal()
+        assert result["totalResults"] == 2
+
+    async def test_iter_pages(self):
+        resources = self.tenant.resources()
+        pages = [p async for p in resources.iter_search_pages("queryString=x")]
+        assert [p["pageNo"] for p in pages] == [1, 2, 3, 4, 5]
+        # The original query string is kept on every page.
+        assert {p["queryString"] for p in pages} == {"x"}
+        records = [r async for r in resources.iter_search_results()]
+        assert [r["id"] for r in records] == list(range(TOTAL_RESOURCES))
+
+    async def test_retry(self):
+        self.server.throttle = 2
+        result = await self.tenant.sites().get()
+        assert result == [{"name": "site"}]
+
+    async def test_retry_exhausted(self):
+        self.server.throttle = 10
+        with self.assertRaises(requests.exceptions.RetryError):
+            await self.tenant.sites().get()
+
+    async def test_disconnected(self):
+        # The server might have acted on a POST before it went away, so it is
+        # not retried, unlike a GET.
+        api = self.tenant.api
+        with self.assertRaises(aiohttp.ServerDisconnectedError):
+            await api.post("drop", json={"name": "x"})
+        assert self.server.faulty["POST", "drop"] == 1
+        with self.assertRaises(aiohttp.ServerDisconnectedError):
+            await api.get("drop")
+        # aiohttp itself also retries a GET once on a reused connection.
+        assert self.server.faulty["GET", "drop"] >= 4
+
+    async def test_read_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.tenant.api.get("slow", timeout=0.1)
+        assert self.server.faulty["GET", "slow"] == 4
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.tenant.api.post("slow", timeout=0.1)
+        assert self.server.faulty["POST", "slow"] == 1
+
+    async def test_error(self):
+        with self.assertRaises(RuntimeError):
+            await self.tenant.api.get("nonexistent")
+        # The same special case as the synchronous version.
+        assert await self.ormp.config().get_nocs() == []
+
+    async def test_page_retry(self):
+        self.server.page_faults = {3: [503, 503]}
+        with mock.patch.object(opsramp.aio.AsyncApiObject, "PAGE_BACKOFF", 0):
+            result = await self.tenant.resources().search()
+        assert [r["id"] for r in result["results"]] == list(range(TOTAL_RESOURCES))
+
+    async def test_partial_result(self):
+        self.server.page_faults = {3: [400]}
+        resources = self.tenant.resources()
+        with self.assertRaises(PartialResult) as cm:
+            await resources.api.get("search")
+        checkpoint = cm.exception.checkpoint
+        assert checkpoint.page_no == 2
+        assert [r["id"] for r in cm.exception.results] == list(range(20))
+        result = await resources.api.get("search", checkpoint=checkpoint)
+        assert [r["id"] for r in result["results"]] == list(range(TOTAL_RESOURCES))
+
+    async def test_post(self):
+        result = await self.tenant.rba().categories().create("unit test")
+        assert result["path"] == "/api/v2/tenants/%s/rba/categories" % TENANT
+        assert json.loads(result["body"]) == {"name": "unit test"}
+
+    async def test_many_concurrent_calls(self):
+        sites = self.tenant.sites()
+        results = await asyncio.gather(*[sites.get() for _ in range(50)])
+        assert results == [[{"name": "site"}]] * 50
+
+    async def test_coalesce(self):
+        ormp = await opsramp.aio.connect(self.url, "key", "secret", coalesce=True)
+        async with ormp:
+            sites = ormp.tenant(TENANT).sites()
+            results = await asyncio.gather(*[sites.get() for _ in range(50)])
+            assert results == [[{"name": "site"}]] * 50
+            assert ormp.flights.shared == 49
+            assert ormp.flights.flights == {}
+            # Cancelling one caller leaves the request running for the rest.
+            first = asyncio.ensure_future(sites.get())
+            second = asyncio.ensure_future(sites.get())
+            await asyncio.sleep(0)
+            first.cancel()
+            assert await second == [{"name": "site"}]
+
+    async def test_validator_cache(self):
+        ormp = await opsramp.aio.connect(
+            self.url, "key", "secret", validator_cache=True
+        )
+        async with ormp:
+            events = []
+            ormp.hooks.add("after_response", events.append)
+            resources = ormp.tenant(TENANT).resources()
+            found = await resources.search()
+            assert len(found["results"]) == TOTAL_RESOURCES
+            assert await resources.search() == found
+            assert ormp.validators.not_modified == 5
+            assert [(e.status, e.unchanged) for e in events[5:]] == [(304, True)] * 5
+
+    async def test_compress_requests(self):
+        ormp = await opsramp.aio.connect(
+            self.url, "key", "secret", compress_requests=100
+        )
+        async with ormp:
+            events = []
+            ormp.hooks.add("after_response", events.append)
+            api = ormp.tenant(TENANT).sites().api
+            body = {"name": "x" * 1000}
+            resp = await api.post("big", json=body)
+            assert json.loads(resp["body"]) == body
+            assert events[-1].request_wire_bytes < 100 < events[-1].request_bytes
+            resp = await api.post("small", json={"name": "x"})
+            assert json.loads(resp["body"]) == {"name": "x"}
+            assert events[-1].request_bytes == events[-1].request_wire_bytes
+
+    async def test_hooks(self):
+        events = []
+        for name in ("before_request", "after_response", "on_retry", "on_page"):
+            self.ormp.hooks.add(name, lambda e, name=name: events.append((name, e)))
+        self.server.throttle = 1
+        await self.tenant.sites().get()
+        assert [name for name, e in events] == [
+            "before_request",
+            "on_retry",
+            "after_response",
+        ]
+        event = events[-1][1]
+        assert event.status == 200
+        assert event.retries == 1
+        assert event.template == "/api/v2/tenants/{tenant}/sites/minimal"
+        assert event.response_bytes == len(b'[{"name":"site"}]')
+        assert event.elapsed >= event.retrying + event.ttfb + event.download
+        assert event.queued is None
+        del events[:]
+        await self.tenant.resources().search()
+        pages = [e.page for name, e in events if name == "on_page"]
+        assert pages == [1, 2, 3, 4, 5]
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 #
-# (c) Copyright 2019-2022 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2019-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 import unittest
 
 import mock
@@ -287,8 +288,8 @@ class ApiObjectTest(unittest.TestCase):
         actual = self.ao.collate_pages(fake_get_request, expected)
         assert actual == expected
 
-        # Test that if the next page is not retrieved successfully, an empty
-        # result is returned.
+        # Test that if the next page is not retrieved successfully, the
+        # results so far are raised in a PartialResult.
         with requests_mock.mock() as m:
             m.get(
                 self.fake_url,
@@ -301,15 +302,242 @@ class ApiObjectTest(unittest.TestCase):
             fake_get_request.url = self.fake_url
 
             page_1_data = {
-                "results": ["should not be seen"],
+                "results": ["page one"],
                 "nextPage": True,
                 "pageNo": 1,
             }
 
-            actual = self.ao.collate_pages(fake_get_request, page_1_data)
-            assert actual["results"] == []
-            assert actual["totalResults"] == 0
-            assert actual["pageSize"] == 0
+            with self.assertRaises(opsramp.base.PartialResult) as cm:
+                self.ao.collate_pages(fake_get_request, page_1_data)
+            assert cm.exception.results == ["page one"]
+            assert cm.exception.checkpoint.page_no == 1
+            assert m.call_count == 1
+
+    def paged_callback(self, total, page_size, delays=None):
+        """Returns a requests_mock callback that serves the page named in the
+        pageNo query parameter, optionally sleeping for delays[pageNo]."""
+
+        def callback(request, context):
+            page_no = int(request.qs.get("pageNo", ["1"])[-1])
+            if delays:
+                time.sleep(delays.get(page_no, 0))
+            first = (page_no - 1) * page_size
+            last = min(first + page_size, total)
+            return {
+                "results": list(range(first, last)),
+                "totalResults": total,
+                "pageNo": page_no,
+                "pageSize": page_size,
+                "nextPage": last < total,
+                "previousPageNo": page_no - 1,
+                "descendingOrder": False,
+            }
+
+        return callback
+
+    def test_remaining_pages(self):
+        data = {"pageNo": 1, "pageSize": 10, "totalResults": 35}
+        assert self.ao.remaining_pages(data) == [2, 3, 4]
+        data = {"pageNo": 1, "pageSize": 10, "totalResults": 10}
+        assert self.ao.remaining_pages(data) == []
+        # Not enough information to plan the crawl in advance.
+        assert self.ao.remaining_pages({"pageNo": 1}) is None
+        data = {"pageNo": 1, "pageSize": 0, "totalResults": 10}
+        assert self.ao.remaining_pages(data) is None
+
+    def test_page_workers_cloned(self):
+        ao = opsramp.base.ApiObject(self.fake_url, self.fake_auth, page_workers=4)
+        assert ao.clone().page_workers == 4
+
+    def test_concurrent_pages(self):
+        # requests only appends query parameters to http(s) URLs.
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth, page_workers=4)
+        total = 95
+        # Make the early pages the slowest so that they complete out of order.
+        delays = {2: 0.2, 3: 0.1}
+        with requests_mock.Mocker() as m:
+            m.get(url, json=self.paged_callback(total, 10, delays))
+            actual = self.ao.get()
+            assert actual["results"] == list(range(total))
+            assert actual["totalResults"] == total
+            assert actual["nextPage"] is False
+            assert m.call_count == 10
+
+    def test_concurrent_pages_failure(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth, page_workers=4)
+        callback = self.paged_callback(50, 10)
+
+        def failing(request, context):
+            if request.qs.get("pageNo") == ["3"]:
+                context.status_code = http_status.NOT_FOUND
+                return {}
+            return callback(request, context)
+
+        with requests_mock.Mocker() as m:
+            m.get(url, json=failing)
+            with self.assertRaises(opsramp.base.PartialResult) as cm:
+                self.ao.get()
+            assert cm.exception.results == list(range(20))
+            assert cm.exception.checkpoint.page_no == 2
+
+            # Resume the crawl from the failed page.
+            m.get(url, json=callback)
+            m.reset_mock()
+            actual = self.ao.get(checkpoint=cm.exception.checkpoint)
+            assert actual["results"] == list(range(50))
+            assert actual["totalResults"] == 50
+            assert m.call_count == 3
+
+    def test_page_retry(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth)
+        callback = self.paged_callback(30, 10)
+        faults = {2: [503, 503], 3: [503, 503, 503]}
+
+        def flaky(request, context):
+            page_no = int(request.qs.get("pageNo", ["1"])[-1])
+            if faults.get(page_no):
+                context.status_code = faults[page_no].pop()
+                return {}
+            return callback(request, context)
+
+        with mock.patch.object(opsramp.base.ApiObject, "PAGE_BACKOFF", 0):
+            with requests_mock.Mocker() as m:
+                m.get(url, json=flaky)
+                # Page 2 succeeds on its last retry and page 3 never does.
+                with self.assertRaises(opsramp.base.PartialResult) as cm:
+                    self.ao.get()
+                assert cm.exception.results == list(range(20))
+                assert m.call_count == 7
+                assert "503" in str(cm.exception.__cause__)
+
+    def test_checkpoint_saved(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth)
+        callback = self.paged_callback(30, 10)
+        checkpoint = opsramp.base.Checkpoint()
+
+        def failing(request, context):
+            if request.qs.get("pageNo") == ["3"]:
+                context.status_code = http_status.NOT_FOUND
+                return {}
+            return callback(request, context)
+
+        with requests_mock.Mocker() as m:
+            m.get(url, json=failing)
+            with self.assertRaises(opsramp.base.PartialResult) as cm:
+                self.ao.get(checkpoint=checkpoint)
+            assert cm.exception.checkpoint is checkpoint
+
+            # Another process could carry on from the saved checkpoint.
+            saved = simplejson.loads(simplejson.dumps(checkpoint.to_dict()))
+            restored = opsramp.base.Checkpoint.from_dict(saved)
+            assert restored.page_no == 2
+            with self.assertRaises(ValueError):
+                self.ao.get("elsewhere", checkpoint=restored)
+            m.get(url, json=callback)
+            actual = self.ao.get(checkpoint=restored)
+            assert actual["results"] == list(range(30))
+            assert restored.page_no == 3
+
+    def test_set_query(self):
+        set_query = opsramp.base.Helpers.set_query
+        url = "http://x/search?queryString=a%3Ab&pageNo=1&sortName=name"
+        assert (
+            set_query(url, pageNo=3)
+            == "http://x/search?queryString=a%3Ab&sortName=name&pageNo=3"
+        )
+        assert (
+            set_query("http://x/search", pageSize=50) == "http://x/search?pageSize=50"
+        )
+
+    def test_page_size(self):
+        url = "http://api.example.com/api/v2/tenants/client_1/resources"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth, page_workers=2)
+        queries = []
+
+        def callback(request, context):
+            queries.append(request.qs)
+            page_size = int(request.qs["pageSize"][0])
+            return self.paged_callback(95, page_size)(request, context)
+
+        with requests_mock.Mocker() as m:
+            m.get(url + "/search", json=callback)
+            actual = self.ao.get("search?sortName=name&pageSize=10", page_size=40)
+            assert actual["results"] == list(range(95))
+            # The sort order and page size are the same on every page and
+            # each page is only asked for once.
+            pages = sorted(q.get("pageNo", ["first"])[0] for q in queries)
+            assert pages == ["2", "3", "first"]
+            for query in queries:
+                assert query["sortName"] == ["name"]
+                assert query["pageSize"] == ["40"]
+
+            del queries[:]
+            self.ao.get("search", page_size="max")
+            assert queries[0]["pageSize"] == ["500"]
+
+    def test_iter_pages(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth)
+        with requests_mock.Mocker() as m:
+            m.get(url, json=self.paged_callback(25, 10))
+            pages = self.ao.iter_pages()
+            # Nothing is fetched until the caller asks for the first page,
+            # and then only one page is fetched at a time.
+            assert m.call_count == 0
+            first = next(pages)
+            assert first["results"] == list(range(10))
+            assert m.call_count == 1
+            rest = list(pages)
+            assert [p["pageNo"] for p in rest] == [2, 3]
+            assert rest[-1]["results"] == list(range(20, 25))
+            assert m.call_count == 3
+
+    def test_iter_pages_concurrent(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth, page_workers=3)
+        with requests_mock.Mocker() as m:
+            m.get(url, json=self.paged_callback(95, 10, {2: 0.1}))
+            pages = list(self.ao.iter_pages())
+            assert [p["pageNo"] for p in pages] == list(range(1, 11))
+
+    def test_iter_pages_failure(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth)
+        callback = self.paged_callback(30, 10)
+
+        def failing(request, context):
+            if request.qs.get("pageNo") == ["2"]:
+                context.status_code = http_status.NOT_FOUND
+                return {}
+            return callback(request, context)
+
+        with requests_mock.Mocker() as m:
+            m.get(url, json=failing)
+            pages = self.ao.iter_pages()
+            assert next(pages)["pageNo"] == 1
+            # Unlike get(), a failed page is reported rather than hidden.
+            with self.assertRaises(RuntimeError):
+                next(pages)
+
+    def test_iter_results(self):
+        url = "http://api.example.com"
+        self.ao = opsramp.base.ApiObject(url, self.fake_auth)
+        with requests_mock.Mocker() as m:
+            m.get(url, json=self.paged_callback(25, 10))
+            assert list(self.ao.iter_results()) == list(range(25))
+        with requests_mock.Mocker() as m:
+            m.get(url, json=["a", "b"])
+            assert list(self.ao.iter_results()) == ["a", "b"]
+        with requests_mock.Mocker() as m:
+            m.get(url, json={"id": "one"})
+            assert list(self.ao.iter_results()) == [{"id": "one"}]
+        with requests_mock.Mocker() as m:
+            m.get(url, text="")
+            assert list(self.ao.iter_results()) == []
 
     def test_get(self):
         with requests_mock.Mocker() as m:
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import unittest
+
+import opsramp.benchmark
+
+BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+
+class BenchmarkTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The timings are meaningless when each benchmark runs just once,
+        # but the allocations are the same however long it runs for.
+        cls.results = opsramp.benchmark.run(min_time=0, repeat=1)
+        with open(BASELINE) as f:
+            cls.baseline = json.load(f)
+
+    def test_benchmarks_run(self):
+        assert list(self.results) == list(opsramp.benchmark.BENCHMARKS)
+        for result in self.results.values():
+            assert result["ops_per_sec"] > 0
+            assert result["peak_kb"] >= 0
+
+    def test_baseline_is_complete(self):
+        baseline = self.baseline["results"]
+        assert sorted(baseline) == sorted(opsramp.benchmark.BENCHMARKS)
+
+    def test_allocations(self):
+        if not opsramp.benchmark.same_python(self.baseline):
+            self.skipTest("baseline is from Python %s" % self.baseline["python"])
+        # A time threshold of 1 only compares the allocations.
+        regressions = opsramp.benchmark.compare(
+            self.results, self.baseline["results"], time_threshold=1
+        )
+        assert regressions == []
+
+    def test_compare(self):
+        baseline = {
+            "fast": {"ops_per_sec": 100.0, "peak_kb": 50.0},
+            "small": {"ops_per_sec": 100.0, "peak_kb": 0.5},
+        }
+        results = {
+            "fast": {"ops_per_sec": 80.0, "peak_kb": 54.0},
+            "small": {"ops_per_sec": 100.0, "peak_kb": 1.2},
+            "new": {"ops_per_sec": 1.0, "peak_kb": 1000.0},
+        }
+        assert opsramp.benchmark.compare(results, baseline) == []
+        results["fast"] = {"ops_per_sec": 70.0, "peak_kb": 60.0}
+        assert opsramp.benchmark.compare(results, baseline) == [
+            "fast: 70.0 ops/s, baseline 100.0",
+            "fast: peak 60.0KB allocated, baseline 50.0KB",
+        ]
+        assert opsramp.benchmark.compare(results, baseline, 0.5, 0.5) == []
+
+    def test_main(self):
+        # A single run is too noisy to compare the throughput. runtests.sh
+        # compares it properly, with a loose threshold.
+        argv = ["-k", "list2ormp", "--min-time", "0", "--time-threshold", "1"]
+        assert opsramp.benchmark.main(argv + ["--baseline", BASELINE]) == 0
+
+
+class ImportTimeTest(unittest.TestCase):
+    # The modules that "import opsramp.binding" may load. The API modules
+    # are only imported when they are used, so that short-lived processes
+    # do not pay for all of them.
+    ALLOWED = frozenset(
+        [
+            "opsramp",
+            "opsramp.api",
+            "opsramp.base",
+            "opsramp.binding",
+            "opsramp.codec",
+            "opsramp.hooks",
+            "opsramp.ratelimit",
+            "opsramp.tenant",
+        ]
+    )
+
+    def test_import_binding(self):
+        times = opsramp.benchmark.import_times("opsramp.binding")
+        assert "opsramp.binding" in times
+        loaded = set(name for name in times if name.split(".")[0] == "opsramp")
+        assert loaded <= self.ALLOWED, "also imported %s" % (loaded - self.ALLOWED)
+        assert "concurrent.futures" not in times
+
+    def test_lazy_submodules(self):
+        import opsramp
+
+        assert opsramp.rba.Rba.__module__ == "opsramp.rba"
+        assert not hasattr(opsramp, "nonexistent")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 #
-# (c) Copyright 2019-2025 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2019-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -14,8 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import stat
+import tempfile
 import unittest
 
+import mock
 import opsramp.binding
 import requests_mock
 
@@ -43,6 +47,52 @@ class BindingTest(unittest.TestCase):
             assert type(self.ormp) is opsramp.binding.Opsramp
             assert self.ormp.auth == expected_auth
             assert self.ormp.token == token
+            assert type(self.ormp.session.auth) is opsramp.binding.TokenManager
+
+    def test_shared_session(self):
+        # The token request and the whole object tree share one session.
+        real_session = opsramp.binding.Opsramp.new_session
+        with mock.patch.object(
+            opsramp.binding.Opsramp, "new_session", side_effect=real_session
+        ) as new_session:
+            with requests_mock.Mocker() as m:
+                url = "mock://api.example.com/tenancy/auth/oauth/token"
+                m.post(url, json={"access_token": "abc"})
+                ormp = opsramp.binding.connect(
+                    "mock://api.example.com", "k", "s", pool_maxsize=32
+                )
+            new_session.assert_called_once()
+        resources = ormp.tenant("client_1").resources()
+        assert resources.session is ormp.session
+        adapter = ormp.session.get_adapter("https://api.example.com")
+        assert adapter._pool_maxsize == 32
+
+    def test_pool_defaults(self):
+        ormp = opsramp.binding.Opsramp("mock://api.example.com", "abc")
+        adapter = ormp.session.get_adapter("https://api.example.com")
+        assert adapter._pool_maxsize == 10
+        assert adapter._pool_block is False
+        # The pool grows to fit the concurrent page fetches.
+        ormp = opsramp.binding.Opsramp("mock://x", "abc", page_workers=16)
+        adapter = ormp.session.get_adapter("https://api.example.com")
+        assert adapter._pool_maxsize == 16
+        ormp = opsramp.binding.Opsramp("mock://x", "abc", pool_block=True)
+        adapter = ormp.session.get_adapter("https://api.example.com")
+        assert adapter._pool_block is True
+
+    def test_pool_stats(self):
+        assert self.ormp.pool_stats() == []
+        adapter = self.ormp.session.get_adapter("https://api.example.com")
+        adapter.poolmanager.connection_from_url("https://api.example.com")
+        stats = self.ormp.pool_stats()
+        assert len(stats) == 1
+        assert stats[0]["host"] == "api.example.com"
+        assert stats[0]["scheme"] == "https"
+        assert stats[0]["port"] == 443
+        assert stats[0]["maxsize"] == 10
+        assert stats[0]["in_use"] == 0
+        assert stats[0]["idle"] == 0
+        assert stats[0]["opened"] == 0
 
     def test_str(self):
         assert "Opsramp" in str(self.ormp)
@@ -64,3 +114,152 @@ class BindingTest(unittest.TestCase):
         self.ormp.token = newtok
         assert self.ormp.token == newtok
         assert self.ormp.auth["Authorization"] == "Bearer " + newtok
+
+
+class TokenManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.endpoint = "mock://api.example.com"
+        self.auth_url = self.endpoint + "/tenancy/auth/oauth/token"
+        self.now = 1000.0
+        self.issued = 0
+
+    def clock(self):
+        return self.now
+
+    def new_token(self, request, context):
+        self.issued += 1
+        return {"access_token": "token%d" % self.issued, "expires_in": 3600}
+
+    def connect(self, m):
+        m.post(self.auth_url, json=self.new_token)
+        # The same steps as connect(), with a fake clock.
+        session = opsramp.binding.Opsramp.new_session()
+        tokens = opsramp.binding.TokenManager(
+            self.endpoint, "k", "s", session, clock=self.clock
+        )
+        ormp = opsramp.binding.Opsramp(self.endpoint, tokens.fetch(), session=session)
+        tokens.attach(ormp)
+        assert ormp.token == "token1"
+        return ormp
+
+    def test_proactive_refresh(self):
+        with requests_mock.Mocker() as m:
+            ormp = self.connect(m)
+            url = ormp.api.compute_url("/cfg/timezones")
+            adapter = m.get(url, json=[])
+            tz = ormp.config()
+            tz.get_timezones()
+            assert adapter.last_request.headers["Authorization"] == "Bearer token1"
+            self.now += 3600 - 61
+            tz.get_timezones()
+            assert self.issued == 1
+            # Within the margin of expiry.
+            self.now += 2
+            tz.get_timezones()
+            assert self.issued == 2
+            assert adapter.last_request.headers["Authorization"] == "Bearer token2"
+            # Every object in the tree sees the new token.
+            assert ormp.token == "token2"
+            assert ormp.tenant("client_1").api.auth is ormp.auth
+
+    def test_refresh_on_401(self):
+        with requests_mock.Mocker() as m:
+            ormp = self.connect(m)
+            url = ormp.api.compute_url("/cfg/timezones")
+            adapter = m.get(
+                url,
+                [
+                    {"status_code": 401, "json": {}},
+                    {"status_code": 200, "json": ["UTC"]},
+                ],
+            )
+            assert ormp.config().get_timezones() == ["UTC"]
+            assert self.issued == 2
+            assert adapter.call_count == 2
+            assert adapter.last_request.headers["Authorization"] == "Bearer token2"
+
+            # Only one retry.
+            m.get(url, status_code=401, json={})
+            with self.assertRaises(RuntimeError):
+                ormp.config().get_timezones()
+            assert self.issued == 3
+
+    def test_single_flight(self):
+        with requests_mock.Mocker() as m:
+            ormp = self.connect(m)
+            tokens = ormp.session.auth
+            # Two threads had requests rejected with the same token but
+            # only the first to get here fetches a new one.
+            assert tokens.refresh(rejected="Bearer token1") == "Bearer token2"
+            assert tokens.refresh(rejected="Bearer token1") == "Bearer token2"
+            assert self.issued == 2
+
+
+class TokenCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.endpoint = "mock://api.example.com"
+        self.auth_url = self.endpoint + "/tenancy/auth/oauth/token"
+        tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(tmpdir, "tokens")
+        self.issued = 0
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def new_token(self, request, context):
+        self.issued += 1
+        return {"access_token": "token%d" % self.issued, "expires_in": 3600}
+
+    def test_reuse(self):
+        with requests_mock.Mocker() as m:
+            m.post(self.auth_url, json=self.new_token)
+            for _ in range(3):
+                ormp = opsramp.binding.connect(
+                    self.endpoint, "k", "s", token_cache=self.path
+                )
+                assert ormp.token == "token1"
+            # A different key gets its own token.
+            ormp = opsramp.binding.connect(
+                self.endpoint, "k2", "s", token_cache=self.path
+            )
+            assert ormp.token == "token2"
+            # Without the cache there is always a new one.
+            ormp = opsramp.binding.connect(self.endpoint, "k", "s")
+            assert ormp.token == "token3"
+        assert self.issued == 3
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        assert mode == stat.S_IRUSR | stat.S_IWUSR
+
+    def test_permissions(self):
+        with open(self.path, "w") as f:
+            f.write("{}")
+        os.chmod(self.path, 0o644)
+        with requests_mock.Mocker() as m:
+            m.post(self.auth_url, json=self.new_token)
+            opsramp.binding.connect(self.endpoint, "k", "s", token_cache=self.path)
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        assert mode == stat.S_IRUSR | stat.S_IWUSR
+
+    def test_expiry_and_rejection(self):
+        now = [1000.0]
+        cache = opsramp.binding.TokenCache(self.path)
+        with requests_mock.Mocker() as m:
+            m.post(self.auth_url, json=self.new_token)
+
+            def manager():
+                return opsramp.binding.TokenManager(
+                    self.endpoint, "k", "s", None, cache=cache, clock=lambda: now[0]
+                )
+
+            assert manager().fetch() == "token1"
+            now[0] += 3500
+            assert manager().fetch() == "token1"
+            # Too close to expiry.
+            now[0] += 50
+            assert manager().fetch() == "token2"
+            # Rejected by OpsRamp, but another process already replaced it.
+            assert manager().fetch(rejected="Bearer token1") == "token2"
+            assert manager().fetch(rejected="Bearer token2") == "token3"
+        assert self.issued == 3
@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+
+from fakeclock import FakeClock
+from opsramp.base import Deadline, DeadlineExceeded
+import opsramp.binding
+from opsramp.cache import ResponseCache, SingleFlight, ValidatorCache
+from opsramp.fakeserver import FakeOpsramp
+import requests_mock
+
+TENANT = "client_1"
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(ttl=60, maxsize=3, clock=self.clock)
+        self.ormp = opsramp.binding.Opsramp(
+            "mock://api.example.com", "fake-token", response_cache=self.cache
+        )
+        assert self.ormp.cache is self.cache
+        self.gconfig = self.ormp.config()
+        self.sites = self.ormp.tenant(TENANT).sites()
+
+    def test_ttl(self):
+        self.cache.configure("cfg/timezones", 600)
+        self.cache.configure("cfg/*", None)
+        with requests_mock.Mocker() as m:
+            tz = m.get(self.ormp.api.compute_url("/cfg/timezones"), json=["UTC"])
+            cc = m.get(self.ormp.api.compute_url("/cfg/countries"), json=["IE"])
+            for _ in range(5):
+                assert self.gconfig.get_timezones() == ["UTC"]
+                assert self.gconfig.get_countries() == ["IE"]
+            assert tz.call_count == 1
+            # Not cached at all.
+            assert cc.call_count == 5
+            self.clock.now += 599
+            self.gconfig.get_timezones()
+            assert tz.call_count == 1
+            self.clock.now += 2
+            self.gconfig.get_timezones()
+            assert tz.call_count == 2
+
+    def test_lru(self):
+        with requests_mock.Mocker() as m:
+            adapter = m.get(requests_mock.ANY, json={"a": 1})
+            for suffix in ("/alertTypes", "/cfg/countries", "/cfg/timezones"):
+                self.ormp.api.get(suffix)
+            # Make alertTypes the most recently used, then push out
+            # countries by adding a fourth entry.
+            self.ormp.api.get("/alertTypes")
+            self.ormp.api.get("/cfg/devices/types")
+            assert len(self.cache) == 3
+            assert adapter.call_count == 4
+            self.ormp.api.get("/alertTypes")
+            assert adapter.call_count == 4
+            self.ormp.api.get("/cfg/countries")
+            assert adapter.call_count == 5
+
+    def test_copies(self):
+        with requests_mock.Mocker() as m:
+            m.get(self.ormp.api.compute_url("/cfg/timezones"), json=["UTC"])
+            first = self.gconfig.get_timezones()
+            first.append("modified")
+            assert self.gconfig.get_timezones() == ["UTC"]
+
+    def test_invalidation(self):
+        url = self.sites.api.compute_url("/minimal")
+        with requests_mock.Mocker() as m:
+            adapter = m.get(url, json=[{"id": 1}])
+            other = m.get(self.ormp.api.compute_url("/cfg/timezones"), json=[])
+            m.post(self.sites.api.compute_url("1234"), json={"id": 1234})
+            m.delete(self.sites.api.compute_url("1234"), status_code=500)
+            self.sites.get()
+            self.gconfig.get_timezones()
+            self.sites.get()
+            assert adapter.call_count == 1
+
+            # Changing a site forgets the cached lists of sites, but not
+            # data from elsewhere.
+            self.sites.update("1234", {"name": "x"})
+            self.sites.get()
+            self.gconfig.get_timezones()
+            assert adapter.call_count == 2
+            assert other.call_count == 1
+
+            # Even if the change failed.
+            with self.assertRaises(RuntimeError):
+                self.sites.delete("1234")
+            self.sites.get()
+            assert adapter.call_count == 3
+
+            # Explicit invalidation.
+            self.sites.invalidate_cache()
+            self.sites.get()
+            assert adapter.call_count == 4
+            self.cache.invalidate()
+            self.gconfig.get_timezones()
+            assert other.call_count == 2
+
+    def test_invalidate_below(self):
+        urls = [
+            "http://x/sites",
+            "http://x/sites?pageNo=2",
+            "http://x/sites/1",
+            "http://x/sites2",
+            "http://x/sitesSummary",
+        ]
+        for url in urls:
+            self.cache.maxsize = len(urls)
+            self.cache.store(url, {}, [url], self.cache.lookup(url, {})[2])
+        self.cache.invalidate("http://x/sites")
+        assert sorted(k[0] for k in self.cache.entries) == urls[3:]
+
+    def test_stale_store(self):
+        url = self.ormp.api.compute_url("/cfg/timezones")
+        found, value, generation = self.cache.lookup(url, {})
+        assert not found
+        # A change made while the GET was in flight.
+        self.cache.invalidate_collection(url)
+        self.cache.store(url, {}, ["UTC"], generation)
+        assert len(self.cache) == 0
+
+    def test_not_enabled(self):
+        ormp = opsramp.binding.Opsramp("mock://api.example.com", "fake-token")
+        assert ormp.cache is None
+        with requests_mock.Mocker() as m:
+            adapter = m.get(ormp.api.compute_url("/cfg/timezones"), json=[])
+            ormp.config().get_timezones()
+            ormp.config().get_timezones()
+            ormp.config().invalidate_cache()
+            assert adapter.call_count == 2
+
+
+class ValidatorCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.validators = ValidatorCache(maxsize=2)
+
+    def test_etag(self):
+        key = self.validators.key("http://x/sites", {"Accept": "json"})
+        assert self.validators.conditions(key, {"Accept": "json"}) == {"Accept": "json"}
+        headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jun 2026 00:00:00 GMT"}
+        assert self.validators.update(key, 200, headers, b"[1]") == (
+            200,
+            b"[1]",
+            False,
+        )
+        conditions = self.validators.conditions(key, {"Accept": "json"})
+        assert conditions == {
+            "Accept": "json",
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jun 2026 00:00:00 GMT",
+        }
+        # The conditions are not part of the key.
+        assert self.validators.key("http://x/sites", conditions) == key
+        assert self.validators.update(key, 304, {}, b"") == (200, b"[1]", True)
+        assert self.validators.not_modified == 1
+        assert self.validators.update(key, 200, {"ETag": '"v2"'}, b"[2]") == (
+            200,
+            b"[2]",
+            False,
+        )
+        assert self.validators.conditions(key, {}) == {"If-None-Match": '"v2"'}
+
+    def test_hash_fallback(self):
+        key = self.validators.key("http://x/sites", {})
+        assert self.validators.update(key, 200, {}, b"[1]")[2] is False
+        assert self.validators.conditions(key, {}) == {}
+        assert self.validators.update(key, 200, {}, b"[1]")[2] is True
+        assert self.validators.update(key, 200, {}, b"[2]")[2] is False
+        assert self.validators.unchanged == 1
+
+    def test_errors_forget(self):
+        key = self.validators.key("http://x/sites", {})
+        self.validators.update(key, 200, {"ETag": '"v1"'}, b"[1]")
+        assert self.validators.update(key, 404, {}, b"{}") == (404, b"{}", False)
+        assert self.validators.conditions(key, {}) == {}
+        # A 304 for something that is not remembered is left alone.
+        assert self.validators.update(key, 304, {}, b"") == (304, b"", False)
+
+    def test_lru_and_invalidate(self):
+        keys = [self.validators.key("http://x/%d" % i, {}) for i in range(3)]
+        for key in keys:
+            self.validators.update(key, 200, {"ETag": '"v"'}, b"[]")
+        assert len(self.validators) == 2
+        assert self.validators.conditions(keys[0], {}) == {}
+        self.validators.invalidate("http://x/1")
+        assert len(self.validators) == 1
+        # Only the URL itself and those below it are forgotten.
+        for url in ("http://x/sites?pageNo=2", "http://x/sites2"):
+            self.validators.update(
+                self.validators.key(url, {}), 200, {"ETag": "v"}, b""
+            )
+        self.validators.invalidate("http://x/sites")
+        assert [k[0] for k in self.validators.entries] == ["http://x/sites2"]
+        self.validators.invalidate()
+        assert len(self.validators) == 0
+
+    def test_tree(self):
+        with FakeOpsramp(clients=1, resources=25, page_size=10) as fake:
+            ormp = opsramp.binding.connect(
+                fake.url, "key", "secret", validator_cache=True
+            )
+            assert isinstance(ormp.validators, ValidatorCache)
+            events = []
+            ormp.hooks.add("after_response", events.append)
+            resources = ormp.tenant(TENANT).resources()
+            found = resources.search()
+            assert [e.unchanged for e in events] == [False] * 3
+            del events[:]
+            # Every page is revalidated separately.
+            assert resources.search() == found
+            assert fake.stats[("GET", "resources", 304)] == 3
+            assert [(e.status, e.unchanged) for e in events] == [(304, True)] * 3
+            assert ormp.validators.not_modified == 3
+
+    def test_tree_without_etags(self):
+        ormp = opsramp.binding.Opsramp(
+            "mock://api.example.com", "fake-token", validator_cache=True
+        )
+        sites = ormp.tenant(TENANT).sites()
+        with requests_mock.Mocker() as m:
+            m.get(sites.api.compute_url("minimal"), json=[{"name": "site"}])
+            assert sites.get() == sites.get() == [{"name": "site"}]
+            assert "If-None-Match" not in m.last_request.headers
+        assert ormp.validators.unchanged == 1
+
+
+class SingleFlightTest(unittest.TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def fetch(self):
+        self.calls += 1
+        assert self.release.wait(5)
+        return {"results": [1, 2, 3]}
+
+    def wait_for_waiters(self, count):
+        deadline = time.monotonic() + 5
+        while self.flights.shared < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.release.set()
+
+    def test_threads(self):
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = [
+                pool.submit(self.flights.do, "http://x/sites", {}, self.fetch)
+                for _ in range(10)
+            ]
+            self.wait_for_waiters(9)
+            results = [f.result() for f in futures]
+        assert self.calls == 1
+        assert results == [{"results": [1, 2, 3]}] * 10
+        # Every caller gets its own copy.
+        assert len(set(id(r) for r in results)) == 10
+        assert self.flights.flights == {}
+
+        # Once it has landed the next call makes a new request.
+        self.flights.do("http://x/sites", {}, self.fetch)
+        assert self.calls == 2
+
+    def test_different_keys(self):
+        self.release.set()
+        self.flights.do("http://x/sites", {"Authorization": "a"}, self.fetch)
+        self.flights.do("http://x/sites", {"Authorization": "b"}, self.fetch)
+        assert self.calls == 2
+        assert self.flights.shared == 0
+
+    def test_error(self):
+        def failing():
+            self.fetch()
+            raise RuntimeError("<Response [500]>")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(self.flights.do, "http://x/sites", {}, failing)
+                for _ in range(3)
+            ]
+            self.wait_for_waiters(2)
+            errors = []
+            for future in futures:
+                with self.assertRaises(RuntimeError) as ctx:
+                    future.result()
+                errors.append(ctx.exception)
+        assert self.calls == 1
+        assert self.flights.flights == {}
+        # The callers that waited each raise their own copy.
+        assert len(set(id(e) for e in errors)) == 3
+        assert all(str(e) == "<Response [500]>" for e in errors)
+        leader = [e for e in errors if e.__cause__ is None]
+        assert len(leader) == 1
+        assert all(e.__cause__ is leader[0] for e in errors if e is not leader[0])
+
+    def test_deadline(self):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            first = pool.submit(self.flights.do, "http://x/sites", {}, self.fetch)
+            while not self.flights.flights:
+                time.sleep(0.001)
+            started = time.monotonic()
+            with self.assertRaises(DeadlineExceeded):
+                with Deadline(0.05):
+                    self.flights.do("http://x/sites", {}, self.fetch)
+            assert time.monotonic() - started < 1
+            self.release.set()
+            assert first.result() == {"results": [1, 2, 3]}
+        assert self.calls == 1
+
+    def test_async_deadline(self):
+        async def main():
+            async def fetch():
+                await asyncio.sleep(5)
+
+            first = asyncio.ensure_future(self.flights.ado("http://x/sites", {}, fetch))
+            await asyncio.sleep(0)
+            with self.assertRaises(DeadlineExceeded):
+                with Deadline(0.05):
+                    await self.flights.ado("http://x/sites", {}, fetch)
+            first.cancel()
+
+        started = time.monotonic()
+        asyncio.run(main())
+        assert time.monotonic() - started < 1
+
+    def test_tree(self):
+        ormp = opsramp.binding.Opsramp(
+            "mock://api.example.com", "fake-token", coalesce=True
+        )
+        assert isinstance(ormp.flights, SingleFlight)
+        sites = ormp.tenant(TENANT).sites()
+
+        def callback(request, context):
+            self.flights = ormp.flights
+            self.fetch()
+            return [{"name": "site"}]
+
+        with requests_mock.Mocker() as m:
+            adapter = m.get(sites.api.compute_url("minimal"), json=callback)
+            with ThreadPoolExecutor(max_workers=5) as pool:
+                futures = [pool.submit(sites.get) for _ in range(5)]
+                self.flights = ormp.flights
+                self.wait_for_waiters(4)
+                results = [f.result() for f in futures]
+        assert results == [[{"name": "site"}]] * 5
+        assert adapter.call_count == 1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import opsramp.binding
+from opsramp.client_metrics import ClientMetrics
+from opsramp.hooks import RequestEvent
+import requests_mock
+
+
+class ClientMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.ormp = opsramp.binding.Opsramp("http://api.example.com", "fake-token")
+        self.metrics = ClientMetrics(buckets=(0.1, 1.0)).attach(self.ormp)
+        self.tenant = self.ormp.tenant("client_1")
+
+    def test_requests(self):
+        search = self.tenant.resources().api.compute_url("search")
+
+        def callback(request, context):
+            page_no = int(request.qs.get("pageNo", ["1"])[-1])
+            return {
+                "results": [1],
+                "totalResults": 2,
+                "pageNo": page_no,
+                "pageSize": 1,
+                "nextPage": page_no < 2,
+            }
+
+        with requests_mock.Mocker() as m:
+            m.get(search, json=callback)
+            m.delete(self.tenant.sites().api.compute_url("x"), status_code=429)
+            self.tenant.resources().search()
+            with self.assertRaises(RuntimeError):
+                self.tenant.sites().delete("x")
+
+        data = self.metrics.as_dict()
+        assert data["opsramp_client_requests_total"] == [
+            {"family": "resources", "method": "GET", "status": "200", "value": 2},
+            {"family": "sites", "method": "DELETE", "status": "429", "value": 1},
+        ]
+        assert data["opsramp_client_pages_total"] == [
+            {"family": "resources", "value": 2}
+        ]
+        assert data["opsramp_client_throttled_total"] == [
+            {"family": "sites", "value": 1}
+        ]
+        latency = data["opsramp_client_request_duration_seconds"]
+        assert latency[0]["family"] == "resources"
+        assert latency[0]["count"] == 2
+        assert latency[0]["buckets"]["+Inf"] == 2
+        assert data["opsramp_client_response_bytes_total"][0]["value"] > 0
+        assert data["opsramp_client_response_wire_bytes_total"] == (
+            data["opsramp_client_response_bytes_total"]
+        )
+
+    def test_render(self):
+        event = RequestEvent("GET", "http://x/api/v2/tenants/c/rba/categories")
+        event.status = 200
+        event.elapsed = 0.5
+        event.response_bytes = 10
+        self.metrics.after_response(event)
+        retry = RequestEvent("GET", event.url)
+        self.metrics.on_retry(retry)
+        text = self.metrics.render()
+        lines = text.splitlines()
+        assert "# TYPE opsramp_client_requests_total counter" in lines
+        assert (
+            'opsramp_client_requests_total{family="rba",method="GET",status="200"} 1'
+            in lines
+        )
+        assert "# TYPE opsramp_client_request_duration_seconds histogram" in lines
+        bucket = 'opsramp_client_request_duration_seconds_bucket{family="rba",'
+        assert bucket + 'method="GET",le="0.1"} 0' in lines
+        assert bucket + 'method="GET",le="1.0"} 1' in lines
+        assert bucket + 'method="GET",le="+Inf"} 1' in lines
+        assert (
+            'opsramp_client_request_duration_seconds_sum{family="rba",method="GET"} 0.5'
+            in lines
+        )
+        assert 'opsramp_client_retries_total{family="rba",status="error"} 1' in lines
+        assert text.endswith("\n")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import json
+import timeit
+import unittest
+
+import opsramp.base
+import opsramp.binding
+import opsramp.codec
+import requests_mock
+from simplejson.errors import JSONDecodeError
+
+HAVE_ORJSON = importlib.util.find_spec("orjson") is not None
+HAVE_MSGSPEC = importlib.util.find_spec("msgspec") is not None
+
+
+def resource_page(page_no, page_size=100, total=1000):
+    """A page of results shaped like a real OpsRamp resource search."""
+    first = (page_no - 1) * page_size
+    results = []
+    for i in range(first, min(first + page_size, total)):
+        results.append(
+            {
+                "id": "a4b2c3d4-0000-4000-8000-%012d" % i,
+                "hostName": "host-%d.example.com" % i,
+                "ipAddress": "10.0.%d.%d" % (i // 256, i % 256),
+                "resourceType": "DEVICE",
+                "createdDate": "2026-01-01T00:00:00+0000",
+                "updatedDate": "2026-02-01T12:34:56+0000",
+                "state": "active",
+                "tags": [{"name": "env", "value": "prod"}, {"name": "n", "value": i}],
+                "generalInfo": {
+                    "os": "Linux",
+                    "make": "HPE",
+                    "model": "ProLiant DL380 Gen10",
+                    "serialNumber": "SN%08d" % i,
+                    "monitorable": True,
+                    "cpuCount": 64,
+                    "memoryGb": 512.0,
+                    "description": "Unicode éü中 test",
+                },
+            }
+        )
+    return {
+        "results": results,
+        "totalResults": total,
+        "pageNo": page_no,
+        "pageSize": page_size,
+        "nextPage": first + page_size < total,
+        "descendingOrder": False,
+    }
+
+
+class CodecTest(unittest.TestCase):
+    def setUp(self):
+        self.url = "http://api.example.com"
+        self.fake_auth = {"Authorization": "Bearer ffff", "Accept": "application/json"}
+
+    def test_get_codec(self):
+        default = opsramp.codec.get_codec()
+        assert isinstance(default, opsramp.codec.JsonCodec)
+        assert opsramp.codec.get_codec("simplejson").name == "simplejson"
+        assert opsramp.codec.get_codec(default) is default
+        assert opsramp.codec.get_codec("auto").name in (
+            "orjson",
+            "msgspec",
+            "simplejson",
+        )
+        with self.assertRaises(ValueError):
+            opsramp.codec.get_codec("nonexistent")
+
+    @unittest.skipIf(HAVE_MSGSPEC, "msgspec is installed")
+    def test_missing_library(self):
+        with self.assertRaises(ImportError):
+            opsramp.codec.get_codec("msgspec")
+
+    def test_codec_inherited(self):
+        ormp = opsramp.binding.Opsramp(
+            "mock://api.example.com", "abc", json_codec="auto"
+        )
+        codec = ormp.api.codec
+        assert ormp.tenant("client_1").resources().api.codec is codec
+
+    def check_codec(self, name):
+        ao = opsramp.base.ApiObject(self.url, self.fake_auth, codec=name)
+        assert ao.codec.name == name
+        pages = [resource_page(n, total=250) for n in range(1, 4)]
+
+        def callback(request, context):
+            return pages[int(request.qs.get("pageNo", ["1"])[0]) - 1]
+
+        with requests_mock.Mocker() as m:
+            m.get(self.url, json=callback)
+            result = ao.get()
+        assert len(result["results"]) == 250
+        assert result["results"][249]["generalInfo"]["serialNumber"] == "SN00000249"
+
+        # Non-JSON responses are returned as text.
+        with requests_mock.Mocker() as m:
+            m.get(self.url, text="not json")
+            assert ao.get() == "not json"
+        with self.assertRaises(JSONDecodeError):
+            ao.codec.loads(b"not json")
+
+        # json= bodies are encoded by the codec.
+        with requests_mock.Mocker() as m:
+            adapter = m.post(self.url, json={"id": 1})
+            assert ao.post(json={"name": "é"}) == {"id": 1}
+            assert adapter.last_request.json() == {"name": "é"}
+            assert adapter.last_request.headers["Content-Type"] == "application/json"
+            # Multipart uploads are left alone.
+            ao.post(data={"a": "b"}, files={"f": ("f.txt", b"xyz")})
+            assert b"xyz" in adapter.last_request.body
+
+    def test_simplejson(self):
+        self.check_codec("simplejson")
+
+    @unittest.skipUnless(HAVE_ORJSON, "orjson is not installed")
+    def test_orjson(self):
+        self.check_codec("orjson")
+
+    @unittest.skipUnless(HAVE_MSGSPEC, "msgspec is not installed")
+    def test_msgspec(self):
+        self.check_codec("msgspec")
+
+
+class CodecBenchmark(unittest.TestCase):
+    """Micro-benchmark of the available codecs decoding an OpsRamp-shaped
+    page of 500 resources (about 250KB). Run with "pytest -s" to see the
+    timings."""
+
+    def test_decode_speed(self):
+        payload = json.dumps(resource_page(1, page_size=500)).encode("utf-8")
+        names = ["simplejson"]
+        if HAVE_ORJSON:
+            names.append("orjson")
+        if HAVE_MSGSPEC:
+            names.append("msgspec")
+        expected = json.loads(payload)
+        timings = {}
+        for name in names:
+            codec = opsramp.codec.get_codec(name)
+            assert codec.loads(payload) == expected
+            timings[name] = min(
+                timeit.repeat(lambda: codec.loads(payload), number=5, repeat=3)
+            )
+        for name, secs in sorted(timings.items(), key=lambda x: x[1]):
+            print(
+                "%-10s %7.2fms per %dKB page"
+                % (name, secs * 1000 / 5, len(payload) // 1024)
+            )
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+import tracemalloc
+from types import SimpleNamespace
+import unittest
+from urllib import parse as urlparse
+
+import opsramp.base
+
+PAGE_SIZE = 1000
+SIZEOF_POINTER = struct.calcsize("P")
+
+
+class FakePagedSession(object):
+    """Stands in for a requests session talking to a paginated endpoint.
+    Every page shares the same list of records so that the fixture itself
+    costs next to nothing and the measurements are dominated by the
+    collated list."""
+
+    def __init__(self, total_pages):
+        self.total_pages = total_pages
+        self.records = list(range(PAGE_SIZE))
+
+    def page(self, page_no):
+        return {
+            "results": self.records,
+            "totalResults": self.total_pages * PAGE_SIZE,
+            "pageNo": page_no,
+            "pageSize": PAGE_SIZE,
+            "nextPage": page_no < self.total_pages,
+        }
+
+    def get(self, url, headers=None):
+        query = dict(urlparse.parse_qsl(urlparse.urlsplit(url).query))
+        data = self.page(int(query["pageNo"]))
+        return SimpleNamespace(status_code=200, json=lambda: data)
+
+
+class CollateScalingTest(unittest.TestCase):
+    def peak_per_record(self, total_pages):
+        """Returns the peak memory that collating "total_pages" pages
+        allocates, in pointers per record collated."""
+        session = FakePagedSession(total_pages)
+        ao = opsramp.base.ApiObject("mock://api.example.com", {}, session=session)
+        request = SimpleNamespace(method="GET", url=ao.baseurl, headers={})
+        first = session.page(1)
+        tracemalloc.start()
+        try:
+            result = ao.collate_pages(request, first)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert result["totalResults"] == total_pages * PAGE_SIZE
+        return peak / (total_pages * PAGE_SIZE * SIZEOF_POINTER)
+
+    def test_linear_scaling(self):
+        # Extending one list in place needs little more than the list of
+        # results itself, allowing for the list's spare capacity. The old
+        # list concatenation held the previous copy alongside the new one
+        # for every page, which peaked at about 2 and was quadratic in time.
+        # The time is measured by the collate_pages_* benchmarks.
+        for pages in (50, 200):
+            peak = self.peak_per_record(pages)
+            assert peak < 1.5, "collating %d pages peaked at %.2f" % (pages, peak)
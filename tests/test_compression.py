@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from opsramp.base import Helpers
+import opsramp.binding
+from opsramp.compression import get_compressor, RequestCompressor
+from opsramp.fakeserver import FakeOpsramp
+import requests_mock
+
+TENANT = "client_1"
+
+
+class RequestCompressorTest(unittest.TestCase):
+    def setUp(self):
+        self.compressor = RequestCompressor(min_size=10)
+
+    def test_compress(self):
+        body = b'{"name": "' + b"x" * 100 + b'"}'
+        assert self.compressor.wanted({}, body)
+        hdr, data = self.compressor.compress({"Accept": "json"}, body)
+        assert hdr == {"Accept": "json", "Content-Encoding": "gzip"}
+        assert len(data) < len(body)
+        assert gzip.decompress(data) == body
+        # The output is repeatable.
+        assert self.compressor.compress({}, body)[1] == data
+        hdr, data = self.compressor.compress({}, body.decode())
+        assert gzip.decompress(data) == body
+
+    def test_not_wanted(self):
+        assert not self.compressor.wanted({}, b"small")
+        # Sizes are in bytes, not characters.
+        assert not self.compressor.wanted({}, "x" * 6)
+        assert self.compressor.wanted({}, "\u00e9" * 6)
+        assert not self.compressor.wanted({}, None)
+        assert not self.compressor.wanted({}, {"form": "x" * 100})
+        assert not self.compressor.wanted({"content-encoding": "br"}, b"x" * 100)
+
+    def test_accept_encoding(self):
+        # requests asks for gzip and deflate already, so the header is only
+        # set when urllib3 can decode more than that.
+        session = Helpers.session_add_retry_handler()
+        assert session.headers["Accept-Encoding"] == "gzip, deflate"
+        with mock.patch("urllib3.util.request.ACCEPT_ENCODING", "gzip,deflate,br"):
+            assert Helpers.accept_encoding() == "gzip, deflate, br"
+            session = Helpers.session_add_retry_handler()
+        assert session.headers["Accept-Encoding"] == "gzip, deflate, br"
+
+    def test_get_compressor(self):
+        assert get_compressor() is None
+        assert get_compressor(False) is None
+        assert get_compressor(True).min_size == 16384
+        assert get_compressor(100).min_size == 100
+        assert get_compressor(self.compressor) is self.compressor
+
+
+class CompressedRequestsTest(unittest.TestCase):
+    def setUp(self):
+        self.ormp = opsramp.binding.Opsramp(
+            "mock://api.example.com", "fake-token", compress_requests=100
+        )
+        self.events = []
+        self.ormp.hooks.add("after_response", self.events.append)
+        self.categories = self.ormp.tenant(TENANT).rba().categories()
+        self.url = self.categories.api.compute_url()
+
+    def test_json_body(self):
+        assert isinstance(self.ormp.compressor, RequestCompressor)
+        body = {"name": "x" * 1000}
+        with requests_mock.Mocker() as m:
+            m.post(self.url, json={"id": 1})
+            assert self.categories.api.post(json=body) == {"id": 1}
+            request = m.last_request
+        assert request.headers["Content-Encoding"] == "gzip"
+        assert request.headers["Content-Type"] == "application/json"
+        assert request.headers["Accept-Encoding"] == Helpers.accept_encoding()
+        assert json.loads(gzip.decompress(request.body)) == body
+        event = self.events[-1]
+        assert event.request_bytes > 1000
+        assert event.request_wire_bytes == len(request.body)
+        assert event.request_wire_bytes < 100
+
+    def test_small_body(self):
+        codec = self.categories.api.codec
+        with requests_mock.Mocker() as m:
+            m.post(self.url, json={"id": 1})
+            session = self.ormp.session
+            with mock.patch.object(codec, "dumps", wraps=codec.dumps) as dumps:
+                with mock.patch.object(session, "post", wraps=session.post) as post:
+                    self.categories.api.post(json={"name": "x"})
+            request = m.last_request
+        assert "Content-Encoding" not in request.headers
+        # The body that was encoded to measure it is the one that is sent.
+        assert dumps.call_count == 1
+        assert post.call_args.kwargs["json"] is None
+        assert request.body == codec.dumps({"name": "x"})
+        assert request.headers["Content-Type"] == "application/json"
+        assert request.json() == {"name": "x"}
+        event = self.events[-1]
+        assert event.request_bytes == event.request_wire_bytes == len(request.body)
+
+    def test_files(self):
+        with requests_mock.Mocker() as m:
+            m.post(self.url, json={"id": 1})
+            self.categories.api.post(
+                data={"name": "x" * 1000}, files={"file": ("a.txt", b"x" * 1000)}
+            )
+            assert "Content-Encoding" not in m.last_request.headers
+
+
+class FakeServerCompressionTest(unittest.TestCase):
+    def test_round_trip(self):
+        with FakeOpsramp(clients=1, resources=25, gzip_min_size=100) as fake:
+            ormp = opsramp.binding.connect(
+                fake.url, "key", "secret", compress_requests=10
+            )
+            events = []
+            ormp.hooks.add("after_response", events.append)
+            categories = ormp.tenant(TENANT).rba().categories()
+            created = categories.create("A category with a long name " * 10)
+            assert created["name"].startswith("A category")
+            assert events[-1].request_wire_bytes < events[-1].request_bytes
+            found = ormp.tenant(TENANT).resources().search()
+            assert found["totalResults"] == 25
+            event = events[-1]
+            assert 0 < event.response_wire_bytes < event.response_bytes
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+import opsramp.binding
+from opsramp.fakeserver import FakeOpsramp, TokenBucket
+import requests
+
+
+class FakeServerTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOpsramp(clients=2, resources=25, categories=3, page_size=10)
+        self.url = self.fake.start()
+        self.ormp = opsramp.binding.connect(self.url, "key", "secret", page_workers=4)
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_token_required(self):
+        resp = requests.get(self.url + "/api/v2/tenants/client_1")
+        assert resp.status_code == 401
+
+    def test_clients(self):
+        clients = self.ormp.tenant("msp_1").clients()
+        minimal = clients.get("minimal")
+        assert [c["uniqueId"] for c in minimal] == ["client_1", "client_2"]
+        found = clients.search()
+        assert found["totalResults"] == 2
+        assert self.ormp.tenant("client_2").get()["name"] == "Client 2"
+
+    def test_resources(self):
+        resources = self.ormp.tenant("client_1").resources()
+        found = resources.search()
+        assert found["totalResults"] == 25
+        assert len(found["results"]) == 25
+        assert len(set(r["id"] for r in found["results"])) == 25
+        assert self.fake.stats[("GET", "resources", 200)] == 3
+        first = found["results"][0]
+        assert resources.get(first["id"]) == first
+        minimal = resources.minimal()
+        assert minimal["results"][0] == {
+            "id": first["id"],
+            "name": first["name"],
+            "ipAddress": first["ipAddress"],
+        }
+
+    def test_page_size(self):
+        resources = self.ormp.tenant("client_1").resources()
+        found = resources.search("queryString=x", page_size="max")
+        assert len(found["results"]) == 25
+        assert self.fake.stats[("GET", "resources", 200)] == 1
+
+    def test_repeatable(self):
+        other = FakeOpsramp(clients=2, resources=25)
+        assert other.data.resources == self.fake.data.resources
+        other.stop()
+
+    def test_categories(self):
+        categories = self.ormp.tenant("client_1").rba().categories()
+        assert len(categories.get()) == 3
+        created = categories.create("New one")
+        assert created["id"] == 4
+        assert categories.get()[-1]["name"] == "New one"
+        categories.delete(4)
+        assert len(categories.get()) == 3
+
+    def test_faults_are_retried(self):
+        self.fake.fail_next(2, status=503, family="resources")
+        found = self.ormp.tenant("client_1").resources().search()
+        assert found["totalResults"] == 25
+        assert self.fake.stats[("GET", "resources", 503)] == 2
+
+        self.fake.fail_next(1, status="reset")
+        assert self.ormp.tenant("client_1").get()["uniqueId"] == "client_1"
+        assert self.fake.stats[("GET", "", "reset")] == 1
+
+        self.fake.fail_next(1, status=400)
+        with self.assertRaises(RuntimeError):
+            self.ormp.tenant("client_1").get()
+
+    def test_error_rate(self):
+        self.fake.error_rate = 0.2
+        for _ in range(10):
+            self.ormp.tenant("client_1").resources().search()
+        assert self.fake.stats[("GET", "resources", 503)] > 0
+
+    def test_rate_limit(self):
+        self.fake.rate = 1
+        self.fake.burst = 2
+        session = requests.Session()
+        session.headers.update(self.ormp.auth)
+        url = self.url + "/api/v2/tenants/client_1/rba/categories"
+        statuses = [session.get(url).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        resp = session.get(url)
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == "1"
+        # Other families have their own bucket.
+        resources = url.replace("rba/categories", "resources/minimal")
+        assert session.get(resources).status_code == 200
+
+    def test_latency(self):
+        self.fake.latency = {"rba": 0.1}
+        start = time.monotonic()
+        self.ormp.tenant("client_1").resources().minimal()
+        assert time.monotonic() - start < 0.1
+        start = time.monotonic()
+        self.ormp.tenant("client_1").rba().categories().get()
+        assert time.monotonic() - start >= 0.1
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_take(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        assert bucket.take() == 0
+        wait = bucket.take()
+        assert 0 < wait <= 0.1
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
+import unittest
+
+from opsramp.base import ApiObject, Helpers
+import opsramp.binding
+from opsramp.hooks import Hooks, url_template
+from opsramp.ratelimit import RateLimiter
+import requests
+import requests_mock
+
+UUID = "0a1b2c3d-1111-4222-8333-444455556666"
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.throttle > 0:
+            self.server.throttle -= 1
+            self.send_response(429)
+            self.end_headers()
+            return
+        payload = b'["ok"]'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class HooksTest(unittest.TestCase):
+    def setUp(self):
+        self.ormp = opsramp.binding.Opsramp("mock://api.example.com", "fake-token")
+        self.events = []
+        for name in Hooks.EVENTS:
+            self.ormp.hooks.add(name, self.recorder(name))
+
+    def recorder(self, name):
+        def record(event):
+            self.events.append((name, event))
+
+        return record
+
+    def names(self):
+        return [name for name, event in self.events]
+
+    def test_url_template(self):
+        base = "https://api.example.com/api/v2/tenants/client_1"
+        assert url_template(base + "/resources/" + UUID) == (
+            "/api/v2/tenants/{tenant}/resources/{uuid}"
+        )
+        assert url_template(base + "/rba/categories/123?x=1") == (
+            "/api/v2/tenants/{tenant}/rba/categories/{id}"
+        )
+        with self.assertRaises(ValueError):
+            Hooks().add("nonexistent", print)
+
+    def test_events(self):
+        sites = self.ormp.tenant("client_1").sites()
+        url = sites.api.compute_url(UUID)
+        with requests_mock.Mocker() as m:
+            m.post(url, json={"id": UUID})
+            sites.update(UUID, {"name": "x"})
+        assert self.names() == ["before_request", "after_response"]
+        event = self.events[1][1]
+        assert event is self.events[0][1]
+        assert event.method == "POST"
+        assert event.url == url
+        assert event.template == "/api/v2/tenants/{tenant}/sites/{uuid}"
+        assert event.status == 200
+        assert event.request_bytes == len(b'{"name": "x"}')
+        assert event.response_bytes == len('{"id": "%s"}' % UUID)
+        assert event.elapsed >= event.ttfb >= 0
+        assert event.download >= 0
+        assert event.retrying >= 0
+        assert event.queued is None
+        assert event.page is None
+        assert event.as_dict()["status"] == 200
+
+    def test_pages(self):
+        # requests only adds the pageNo parameter to http(s) URLs.
+        self.ormp.api.baseurl = "http://api.example.com/api/v2"
+        url = self.ormp.api.compute_url("things")
+
+        def callback(request, context):
+            page_no = int(request.qs.get("pageNo", ["1"])[-1])
+            return {
+                "results": [page_no] * (2 if page_no < 3 else 1),
+                "totalResults": 5,
+                "pageNo": page_no,
+                "pageSize": 2,
+                "nextPage": page_no < 3,
+            }
+
+        with requests_mock.Mocker() as m:
+            m.get(url, json=callback)
+            self.ormp.api.get("things")
+        pages = [e for name, e in self.events if name == "on_page"]
+        assert [(e.page, e.results) for e in pages] == [(1, 2), (2, 2), (3, 1)]
+        responses = [e for name, e in self.events if name == "after_response"]
+        assert [e.page for e in responses] == [None, 2, 3]
+
+    def test_errors(self):
+        def broken(event):
+            raise ValueError("broken hook")
+
+        self.ormp.hooks.add("before_request", broken)
+        url = self.ormp.api.compute_url("things")
+        with requests_mock.Mocker() as m:
+            m.get(url, exc=requests.exceptions.ConnectTimeout)
+            with self.assertRaises(requests.exceptions.ConnectTimeout):
+                self.ormp.api.get("things")
+        event = self.events[-1][1]
+        assert self.events[-1][0] == "after_response"
+        assert isinstance(event.error, requests.exceptions.ConnectTimeout)
+        assert event.status is None
+
+    def test_no_hooks(self):
+        ao = ApiObject("mock://api.example.com", {})
+        assert not ao.hooks
+        assert ao.clone().hooks is ao.hooks
+
+    def test_retries(self):
+        server = HTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+        server.throttle = 2
+        thread = Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01})
+        thread.daemon = True
+        thread.start()
+        try:
+            session = requests.Session()
+            retry = Helpers.create_retry_handler(
+                retries=3,
+                backoff_factor=0,
+                status_forcelist=(429,),
+                allowed_methods=Helpers.default_retry_verbs(),
+            )
+            session.mount("http://", requests.adapters.HTTPAdapter(max_retries=retry))
+            url = "http://127.0.0.1:%d" % server.server_address[1]
+            ao = ApiObject(url, {}, session=session, hooks=self.ormp.hooks)
+            assert ao.get() == ["ok"]
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert self.names() == [
+            "before_request",
+            "on_retry",
+            "on_retry",
+            "after_response",
+        ]
+        assert [e.status for name, e in self.events] == [200, 429, 429, 200]
+        assert self.events[-1][1].retries == 2
+
+    def test_timings(self):
+        server = HTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+        server.throttle = 2
+        thread = Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01})
+        thread.daemon = True
+        thread.start()
+        try:
+            retry = Helpers.create_retry_handler(
+                retries=3,
+                backoff_factor=0,
+                status_forcelist=(429,),
+                allowed_methods=Helpers.default_retry_verbs(),
+            )
+            limiter = RateLimiter(rate=5, burst=1, adaptive=False)
+            session = requests.Session()
+            session.mount("http://", limiter.adapter(max_retries=retry))
+            url = "http://127.0.0.1:%d" % server.server_address[1]
+            ao = ApiObject(url, {}, session=session, hooks=self.ormp.hooks)
+            assert ao.get() == ["ok"]
+        finally:
+            server.shutdown()
+            server.server_close()
+        event = self.events[-1][1]
+        assert event.retries == 2
+        # Each retry waited 0.2s for a token. That is not the server's
+        # fault, so it is not part of the time to the first byte.
+        assert event.queued >= 0.35
+        assert event.ttfb < 0.2
+        assert 0 <= event.retrying < 0.2
+        total = event.queued + event.retrying + event.ttfb + event.download
+        assert abs(event.elapsed - total) < 0.05
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 #
-# (c) Copyright 2020-2022 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2020-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -83,17 +83,52 @@ class ClassTest(unittest.TestCase):
 
         # default suffix should be "search"
         actual = self.testobj.search(pattern=qstring)
-        self.mock_ao.get.assert_called_with("search" + qstring, headers=None)
+        self.mock_ao.get.assert_called_with(
+            "search" + qstring, headers=None, page_size=None
+        )
         assert actual == expected
         actual = self.testobj.search(pattern=qs2, headers=hdrs)
-        self.mock_ao.get.assert_called_with("search" + qstring, headers=hdrs)
+        self.mock_ao.get.assert_called_with(
+            "search" + qstring, headers=hdrs, page_size=None
+        )
         assert actual == expected
 
         # try a different suffix
         suffix = "toraiocht"
         actual = self.testobj.search(pattern=qstring, suffix=suffix)
-        self.mock_ao.get.assert_called_with(suffix + qstring, headers=None)
+        self.mock_ao.get.assert_called_with(
+            suffix + qstring, headers=None, page_size=None
+        )
         assert actual == expected
         actual = self.testobj.search(pattern=qs2, headers=hdrs, suffix=suffix)
-        self.mock_ao.get.assert_called_with(suffix + qstring, headers=hdrs)
+        self.mock_ao.get.assert_called_with(
+            suffix + qstring, headers=hdrs, page_size=None
+        )
         assert actual == expected
+
+    def test_search_page_size(self):
+        self.testobj.search(pattern="sortName=name", page_size=250)
+        self.mock_ao.get.assert_called_with(
+            "search?sortName=name", headers=None, page_size=250
+        )
+        self.testobj.iter_search_pages(suffix="minimal", page_size="max")
+        self.mock_ao.iter_pages.assert_called_with(
+            "minimal", headers=None, page_size="max"
+        )
+
+    def test_iter_search(self):
+        hdrs = {"fake-header": "fake-value"}
+        pages = [{"results": [1, 2]}, {"results": [3]}]
+        self.mock_ao.iter_pages.return_value = iter(pages)
+        actual = self.testobj.iter_search_pages(pattern="name=x", headers=hdrs)
+        assert list(actual) == pages
+        self.mock_ao.iter_pages.assert_called_with(
+            "search?name=x", headers=hdrs, page_size=None
+        )
+
+        self.mock_ao.iter_results.return_value = iter([1, 2, 3])
+        actual = self.testobj.iter_search_results(suffix="minimal")
+        assert list(actual) == [1, 2, 3]
+        self.mock_ao.iter_results.assert_called_with(
+            "minimal", headers=None, page_size=None
+        )
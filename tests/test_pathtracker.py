@@ -96,3 +96,17 @@ class TrackerTest(unittest.TestCase):
         other = self.trkr.fullpath(suffix)
         assert other == suffix
         assert self.trkr.fullpath() == original
+
+    def test_clone_stack(self):
+        self.trkr.cd("/home")
+        self.trkr.pushd("/work")
+        other = self.trkr.clone()
+        # pushd and popd in a clone do not affect the original either.
+        other.pushd("/play")
+        other.popd()
+        other.popd()
+        assert other.fullpath() == "/home"
+        assert self.trkr.fullpath() == "/work"
+        assert self.trkr.popd() == "home"
+        with self.assertRaises(IndexError):
+            self.trkr.popd()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fakeclock import FakeClock
+from opsramp.base import Helpers, RetryPolicy
+import opsramp.binding
+from opsramp.fakeserver import FakeOpsramp
+import opsramp.ratelimit
+import requests
+
+BASE = "https://api.example.com/api/v2"
+SEARCH1 = BASE + "/tenants/client_1/resources/search"
+SEARCH2 = BASE + "/tenants/client_2/resources/search"
+ALERTS1 = BASE + "/tenants/client_1/alerts/search"
+
+
+def reserve_in_child(path, url, queue):
+    limiter = opsramp.ratelimit.RateLimiter(
+        rate=1, burst=1, backend=opsramp.ratelimit.FileBackend(path)
+    )
+    queue.put(limiter.reserve(url))
+
+
+class EndpointFamilyTest(unittest.TestCase):
+    def test_family(self):
+        assert Helpers.endpoint_family(SEARCH1) == ("client_1", "resources")
+        assert Helpers.endpoint_family(BASE + "/cfg/timezones") == (None, "cfg")
+        assert Helpers.endpoint_family(BASE + "/tenants/client_1") == ("client_1", "")
+        url = "https://api.example.com/tenancy/auth/oauth/token"
+        assert Helpers.endpoint_family(url) == (None, "tenancy")
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = opsramp.ratelimit.RateLimiter(
+            rate=2, burst=4, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_unlimited(self):
+        limiter = opsramp.ratelimit.RateLimiter()
+        for _ in range(100):
+            assert limiter.reserve(SEARCH1) == 0
+
+    def test_burst_then_rate(self):
+        for _ in range(4):
+            assert self.limiter.reserve(SEARCH1) == 0
+        # The bucket is empty so callers queue up behind each other.
+        assert self.limiter.reserve(SEARCH1) == 0.5
+        assert self.limiter.reserve(SEARCH1) == 1.0
+        # Time passing refills it.
+        self.clock.now += 1.0
+        assert self.limiter.reserve(SEARCH1) == 0.5
+
+    def test_acquire_sleeps(self):
+        for _ in range(4):
+            self.limiter.acquire(SEARCH1)
+        start = self.clock.now
+        for _ in range(4):
+            self.limiter.acquire(SEARCH1)
+        # Four more requests at two per second.
+        assert self.clock.now - start == 2.0
+
+    def test_separate_buckets(self):
+        for _ in range(4):
+            self.limiter.reserve(SEARCH1)
+        assert self.limiter.reserve(SEARCH1) > 0
+        # Other tenants and other endpoint families are unaffected.
+        assert self.limiter.reserve(SEARCH2) == 0
+        assert self.limiter.reserve(ALERTS1) == 0
+
+    def test_rules(self):
+        self.limiter.configure(None, family="alerts")
+        self.limiter.configure(1, burst=1, tenant="client_2")
+        self.limiter.configure(10, burst=10, tenant="client_2", family="alerts")
+        assert self.limiter.rule("client_1", "resources") == (2, 4)
+        assert self.limiter.rule("client_1", "alerts") == (None, None)
+        assert self.limiter.rule("client_2", "resources") == (1, 1)
+        assert self.limiter.rule("client_2", "alerts") == (10, 10)
+        for _ in range(100):
+            assert self.limiter.reserve(ALERTS1) == 0
+        assert self.limiter.reserve(SEARCH2) == 0
+        assert self.limiter.reserve(SEARCH2) == 1.0
+
+    def test_retry_after(self):
+        self.limiter.observe(SEARCH1, 429, {"Retry-After": "30"})
+        assert self.limiter.reserve(SEARCH1) == 30
+        # An HTTP date works too.
+        self.limiter.observe(
+            SEARCH2, 429, {"Retry-After": "Thu, 01 Jan 1970 00:17:00 GMT"}
+        )
+        assert self.limiter.reserve(SEARCH2) == 20
+
+    def test_ratelimit_headers(self):
+        headers = {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "60"}
+        self.limiter.observe(SEARCH1, 200, headers)
+        assert self.limiter.reserve(SEARCH1) == 0
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "60"}
+        self.limiter.observe(SEARCH1, 200, headers)
+        assert self.limiter.reserve(SEARCH1) == 60
+
+    def test_parse_delay(self):
+        now = 1700000000.0
+        parse = opsramp.ratelimit.RateLimiter.parse_delay
+        assert parse(None, now) is None
+        assert parse("garbage", now) is None
+        assert parse("12", now) == 12
+        # Epoch timestamps in seconds or milliseconds.
+        assert parse("1700000030", now) == 30
+        assert parse("1700000030000", now) == 30
+        # Times in the past mean no delay.
+        assert parse("1600000000", now) == 0
+
+    def test_adaptive(self):
+        self.limiter.observe(SEARCH1, 429, {})
+        self.limiter.observe(SEARCH1, 429, {})
+        bucket = self.limiter.backend.buckets["client_1/resources"]
+        assert bucket["rate"] == 0.5
+        # Successful requests recover the rate, but never beyond the limit.
+        for _ in range(100):
+            self.limiter.observe(SEARCH1, 200, {})
+        assert bucket["rate"] == 2
+
+    def test_not_adaptive(self):
+        self.limiter.adaptive = False
+        self.limiter.observe(SEARCH1, 429, {})
+        assert self.limiter.backend.buckets["client_1/resources"]["rate"] == 2
+
+
+class FileBackendTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_shared_between_limiters(self):
+        clock = FakeClock()
+        limiters = [
+            opsramp.ratelimit.RateLimiter(
+                rate=1,
+                burst=2,
+                backend=opsramp.ratelimit.FileBackend(self.path),
+                clock=clock,
+            )
+            for _ in range(2)
+        ]
+        assert limiters[0].reserve(SEARCH1) == 0
+        assert limiters[1].reserve(SEARCH1) == 0
+        assert limiters[0].reserve(SEARCH1) == 1
+        assert limiters[1].reserve(SEARCH1) == 2
+
+    def test_shared_between_processes(self):
+        queue = multiprocessing.Queue()
+        children = [
+            multiprocessing.Process(
+                target=reserve_in_child, args=(self.path, SEARCH1, queue)
+            )
+            for _ in range(3)
+        ]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join()
+        delays = sorted(round(queue.get()) for _ in children)
+        # Only one of them got the single token in the bucket.
+        assert delays == [0, 1, 2]
+
+
+class AdapterTest(unittest.TestCase):
+    def test_session(self):
+        clock = FakeClock()
+        limiter = opsramp.ratelimit.RateLimiter(
+            rate=1, burst=1, clock=clock, sleep=clock.sleep
+        )
+        ormp = opsramp.binding.Opsramp(
+            "https://api.example.com", "token", rate_limiter=limiter
+        )
+        adapter = ormp.session.get_adapter(SEARCH1)
+        assert isinstance(adapter, opsramp.ratelimit.RateLimitedAdapter)
+        assert adapter._pool_maxsize == 10
+
+        def fake_send(request, **kwargs):
+            resp = requests.Response()
+            resp.request = request
+            resp.status_code = 429
+            resp.headers["Retry-After"] = "5"
+            return resp
+
+        with mock.patch(
+            "requests.adapters.HTTPAdapter.send", side_effect=fake_send
+        ) as send:
+            with self.assertRaises(RuntimeError):
+                ormp.tenant("client_1").resources().search()
+            assert send.call_count == 1
+            assert clock.now == 1000.0
+            # The next request has to wait for the Retry-After time.
+            with self.assertRaises(RuntimeError):
+                ormp.tenant("client_1").resources().search()
+            assert clock.now == 1005.0
+
+    def test_retries_take_tokens(self):
+        clock = FakeClock()
+        limiter = opsramp.ratelimit.RateLimiter(
+            rate=2, burst=1, clock=clock, sleep=clock.sleep
+        )
+        with FakeOpsramp(clients=1, resources=5) as fake:
+            ormp = opsramp.binding.connect(
+                fake.url, "key", "secret", rate_limiter=limiter
+            )
+            fake.fail_next(2, status=503, family="resources")
+            with mock.patch.object(RetryPolicy, "get_backoff_time", return_value=0):
+                found = ormp.tenant("client_1").resources().search()
+            assert found["totalResults"] == 5
+            assert fake.stats[("GET", "resources", 503)] == 2
+        # urllib3 retried both 503s itself, and each of the three attempts
+        # had to wait for its own token.
+        assert clock.now == 1001.0
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+from threading import Thread
+import unittest
+from urllib import parse as urlparse
+
+import opsramp.binding
+import opsramp.replay
+import requests
+
+TENANT = "client_1"
+SECRET = "thereisnospoon"
+TOKEN = "fake-unit-test-token"
+
+
+class FakeOpsrampHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, code, body):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/tenancy/auth/oauth/token":
+            return self.reply(200, {"access_token": TOKEN, "expires_in": 3600})
+        self.server.created += 1
+        self.reply(200, {"id": self.server.created})
+
+    def do_GET(self):
+        url = urlparse.urlsplit(self.path)
+        page_no = int(dict(urlparse.parse_qsl(url.query)).get("pageNo", 1))
+        if url.path.endswith("/integrations/installed/search"):
+            return self.reply(
+                200,
+                {
+                    "results": [
+                        {
+                            "id": page_no,
+                            "inboundConfig": {
+                                "authentication": {
+                                    "token": "inbound-secret",
+                                    "apiKeyPairs": [{"key": "k", "secret": "s"}],
+                                }
+                            },
+                        }
+                    ],
+                    "totalResults": 2,
+                    "pageNo": page_no,
+                    "pageSize": 1,
+                    "nextPage": page_no < 2,
+                },
+            )
+        self.reply(404, {"error": "not found"})
+
+
+class RecordReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpsrampHandler)
+        self.server.created = 0
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+        self.thread = Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        self.thread.daemon = True
+        self.thread.start()
+        fd, self.path = tempfile.mkstemp(suffix=".jsonl.gz")
+        os.close(fd)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        os.unlink(self.path)
+
+    def workload(self, session):
+        ormp = opsramp.binding.connect(self.url, "key", SECRET, session=session)
+        group = ormp.tenant(TENANT).integrations().instances()
+        found = group.search()
+        first = group.create("CUSTOM", {"name": "one"})
+        second = group.create("CUSTOM", {"name": "two"})
+        return found, first, second
+
+    def test_record_replay(self):
+        session = opsramp.binding.Opsramp.new_session()
+        with opsramp.replay.record(session, self.path):
+            recorded = self.workload(session)
+        assert recorded[1] == {"id": 1}
+        assert recorded[2] == {"id": 2}
+
+        with gzip.open(self.path, "rt") as f:
+            text = f.read()
+        for secret in (SECRET, TOKEN, "inbound-secret"):
+            assert secret not in text
+        entries = [json.loads(line) for line in text.splitlines()]
+        assert len(entries) == 5
+        assert "client_secret=REDACTED" in entries[0]["body"]
+
+        # The server is not needed any more.
+        self.server.shutdown()
+        replayed = self.workload(opsramp.replay.replay_session(self.path, 0))
+        found = replayed[0]
+        assert [r["id"] for r in found["results"]] == [1, 2]
+        auth = found["results"][0]["inboundConfig"]["authentication"]
+        assert auth["token"] == "REDACTED"
+        assert auth["apiKeyPairs"] == "REDACTED"
+        # Repeated requests get their responses back in order.
+        assert replayed[1:] == recorded[1:]
+
+    def test_compressed_requests(self):
+        session = opsramp.binding.Opsramp.new_session()
+        with opsramp.replay.record(session, self.path):
+            ormp = opsramp.binding.connect(
+                self.url, "key", SECRET, session=session, compress_requests=100
+            )
+            events = []
+            ormp.hooks.add("after_response", events.append)
+            body = {"name": "x" * 200, "password": SECRET}
+            assert ormp.tenant(TENANT).api.post("instances", json=body) == {"id": 1}
+        assert events[-1].request_wire_bytes < events[-1].request_bytes
+        with gzip.open(self.path, "rt") as f:
+            entries = [json.loads(line) for line in f]
+        assert SECRET not in json.dumps(entries)
+        assert json.loads(entries[-1]["body"]) == dict(body, password="REDACTED")
+        assert "body_b64" not in entries[-1]
+
+    def test_latency_and_misses(self):
+        session = opsramp.binding.Opsramp.new_session()
+        with opsramp.replay.record(session, self.path):
+            self.workload(session)
+        delays = []
+        adapter = opsramp.replay.ReplayAdapter(
+            self.path, latency_scale=2.0, sleep=delays.append
+        )
+        with gzip.open(self.path, "rt") as f:
+            elapsed = [json.loads(line)["elapsed"] for line in f]
+        session = requests.Session()
+        session.mount("http://", adapter)
+        self.workload(session)
+        assert delays == [2.0 * e for e in elapsed if e > 0]
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.get(self.url + "/api/v2/nonexistent")
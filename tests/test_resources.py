@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
 import unittest
 
 import opsramp.binding
@@ -228,3 +229,20 @@ class ApiTest(unittest.TestCase):
             m.get(url, json=fake_result, complete_qs=True)
             actual = group.get_templates(uuid=fake_resource_id, pattern="fake_pattern")
             assert actual["results"] == fake_result
+            assert m.call_count == 1
+
+    def test_shared_between_threads(self):
+        # One Resources object can be used by many threads at once.
+        group = self.client.resources()
+        url = group.api.compute_url()
+        uuids = ["uuid%d" % i for i in range(200)]
+
+        def callback(request, context):
+            return [request.path.split("/")[-3]]
+
+        with requests_mock.Mocker() as m:
+            m.get(requests_mock.ANY, json=callback)
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(group.get_templates, uuids))
+        assert [r["results"] for r in results] == [[u] for u in uuids]
+        assert group.api.compute_url() == url
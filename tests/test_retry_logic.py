@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 #
-# (c) Copyright 2020-2023 Hewlett Packard Enterprise Development LP
+# (c) Copyright 2020-2026 Hewlett Packard Enterprise Development LP
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
 # you may not use this file except in compliance with the License.
@@ -24,8 +24,11 @@ import sys
 from threading import Thread
 import unittest
 
-from opsramp.base import ApiObject, ApiWrapper
+import mock
+from opsramp.base import ApiObject, ApiWrapper, Helpers, RetryBudget, RetryPolicy
 import requests
+from urllib3.exceptions import MaxRetryError, ProtocolError
+from urllib3.response import HTTPResponse
 
 # Define a list of "canned" responses here. These are used to test the retry
 # capability of the API client, so that when faced with a response containing a
@@ -194,3 +197,94 @@ class TestMockServer(unittest.TestCase):
         # logic is doing its thing
         for index in range(len(lines)):
             self.assertIn(expected_requests[index], lines[index])
+
+    def test__no_retry_on_bad_request(self):
+        self.mock_server.canned_responses[:] = [
+            {"code": 400, "message": b"Bad request"},
+            {"code": 200, "message": b"Should not get this far"},
+        ]
+        api_object = ApiObject("http://localhost:%d" % self.server_port, {})
+        with self.assertRaises(RuntimeError):
+            api_object.get("/foo")
+        assert len(self.mock_server.canned_responses) == 1
+
+    def test__retry_budget(self):
+        # A budget that allows only one retry, ever.
+        retry = Helpers.create_retry_handler(
+            retries=7,
+            backoff_factor=0,
+            status_forcelist=(429,),
+            allowed_methods=Helpers.default_retry_verbs(),
+            budget=RetryBudget(ratio=0, maximum=1),
+        )
+        session = requests.Session()
+        session.mount("http://", requests.adapters.HTTPAdapter(max_retries=retry))
+        url = "http://localhost:%d" % self.server_port
+        api_object = ApiObject(url, {}, session=session)
+        with self.assertRaises(RuntimeError):
+            api_object.get("/foo")
+        # The first attempt and one retry.
+        assert len(self.mock_server.canned_responses) == 2
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.retry = Helpers.default_retry_handler()
+
+    def test_classification(self):
+        assert isinstance(self.retry, RetryPolicy)
+        for method in ("GET", "PUT", "DELETE", "POST"):
+            assert self.retry.is_retry(method, 429)
+            assert not self.retry.is_retry(method, 400)
+            assert not self.retry.is_retry(method, 404)
+            assert not self.retry.is_retry(method, 500)
+        for status in (502, 503, 504):
+            assert self.retry.is_retry("GET", status)
+            assert self.retry.is_retry("PUT", status)
+            # The POST might have happened.
+            assert not self.retry.is_retry("POST", status)
+            assert not self.retry.is_retry("PATCH", status)
+        assert not self.retry.is_retry("PATCH", 429)
+
+    def test_read_errors(self):
+        error = ProtocolError("Connection aborted")
+        retry = self.retry.increment("GET", "http://x/y", error=error)
+        assert len(retry.history) == 1
+        with self.assertRaises(ProtocolError):
+            self.retry.increment("POST", "http://x/y", error=error)
+
+    def test_full_jitter(self):
+        retry = self.retry
+        response = HTTPResponse(status=429)
+        for _ in range(4):
+            retry = retry.increment("GET", "http://x/y", response=response)
+        # The un-jittered delay would be 0.5 * 2 ** 3
+        with mock.patch("random.uniform", return_value=1.25) as uniform:
+            assert retry.get_backoff_time() == 1.25
+        uniform.assert_called_once_with(0, 4.0)
+        retry.jitter = False
+        assert retry.get_backoff_time() == 4.0
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, maximum=2)
+        retry = Helpers.create_retry_handler(
+            retries=7,
+            backoff_factor=0,
+            status_forcelist=(429,),
+            allowed_methods=Helpers.default_retry_verbs(),
+            budget=budget,
+        )
+        assert retry.is_retry("GET", 429)
+        assert retry.is_retry("GET", 429)
+        # Spent, apart from what those two responses earned.
+        assert retry.is_retry("GET", 429)
+        assert not retry.is_retry("GET", 429)
+        # Successful responses top it up again.
+        assert not retry.is_retry("GET", 200)
+        assert retry.is_retry("GET", 429)
+        # The budget is shared by the retry objects for later attempts.
+        assert retry.new().budget is budget
+        budget.balance = 0
+        error = ProtocolError("Connection aborted")
+        with self.assertRaises(MaxRetryError):
+            retry.increment("GET", "http://x/y", error=error)
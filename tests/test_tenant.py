@@ -61,3 +61,25 @@ class TenantTest(unittest.TestCase):
         assert self.client.integrations()
         assert self.client.credential_sets()
         assert self.client.roles()
+
+    def test_memoized(self):
+        # The wrapper objects are built once and then reused.
+        assert self.ormp.tenant("client_for_unit_test") is self.client
+        assert self.ormp.tenant(name="client_for_unit_test") is not self.msp
+        assert self.client.resources() is self.client.resources()
+        assert self.client.rba().categories() is self.client.rba().categories()
+        assert self.client.resources() is not self.msp.resources()
+        assert self.ormp.config() is self.ormp.config()
+        # Changing the session starts again with new wrappers.
+        session = self.ormp.session
+        self.ormp.session = opsramp.binding.Opsramp.new_session()
+        tenant = self.ormp.tenant("client_for_unit_test")
+        assert tenant is not self.client
+        assert tenant.session is not session
+
+    def test_compact(self):
+        api = self.client.resources().api
+        assert not hasattr(api, "__dict__")
+        assert not hasattr(api.tracker, "__dict__")
+        with self.assertRaises(AttributeError):
+            api.misspelt = True
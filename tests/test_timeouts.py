@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#
+# (c) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+from fakeclock import FakeClock
+import opsramp.aio
+from opsramp.base import Deadline, DeadlineExceeded, DEFAULT_TIMEOUT
+import opsramp.binding
+from opsramp.fakeserver import FakeOpsramp
+import requests
+
+TENANT = "client_1"
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_cap(self):
+        clock = FakeClock()
+        deadline = Deadline(5, clock=clock)
+        assert deadline.cap(None, "GET", "x") == 5
+        assert deadline.cap(10, "GET", "x") == 5
+        assert deadline.cap(2, "GET", "x") == 2
+        assert deadline.cap((1, 30), "GET", "x") == (1, 5)
+        assert deadline.cap((None, 3), "GET", "x") == (5, 3)
+        clock.now += 5
+        with self.assertRaises(DeadlineExceeded):
+            deadline.cap(10, "GET", "x")
+
+    def test_nested(self):
+        clock = FakeClock()
+        assert Deadline.current() is None
+        with Deadline(5, clock=clock) as outer:
+            with Deadline(10, clock=clock) as inner:
+                assert Deadline.current() is inner
+                assert inner.remaining() == 5
+            assert Deadline.current() is outer
+        assert Deadline.current() is None
+
+
+class TimeoutTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOpsramp(clients=1, resources=30, categories=3, page_size=10)
+        self.url = self.fake.start()
+        self.ormp = opsramp.binding.connect(self.url, "key", "secret")
+        self.tenant = self.ormp.tenant(TENANT)
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_default(self):
+        assert self.ormp.api.timeout == DEFAULT_TIMEOUT
+        assert self.tenant.rba().categories().api.timeout == DEFAULT_TIMEOUT
+        ormp = opsramp.binding.Opsramp(self.url, "token")
+        assert ormp.api.timeout == DEFAULT_TIMEOUT
+        ormp = opsramp.binding.Opsramp(self.url, "token", timeout=None)
+        assert ormp.api.timeout is None
+
+    def test_call_timeout(self):
+        self.fake.latency = {"rba": 0.5}
+        categories = self.tenant.rba().categories()
+        start = time.monotonic()
+        with self.assertRaises(requests.exceptions.RequestException):
+            categories.get(timeout=0.05, deadline=0.3)
+        assert time.monotonic() - start < 0.5
+        # The timeout was only for that call.
+        self.fake.latency = 0
+        assert len(categories.get()) == 3
+
+    def test_deadline_across_retries(self):
+        # Without a deadline these would be retried for several seconds.
+        self.fake.fail_next(100, status=503, family="rba")
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            self.tenant.rba().categories().get(deadline=0.3)
+        assert time.monotonic() - start < 0.5
+        assert Deadline.current() is None
+
+    def test_deadline_across_pages(self):
+        self.fake.latency = {"resources": 0.15}
+        for workers in (1, 3):
+            # A new tree each time, because the objects under the tenant are
+            # created once and keep their settings.
+            ormp = opsramp.binding.connect(
+                self.url, "key", "secret", page_workers=workers
+            )
+            resources = ormp.tenant(TENANT).resources()
+            assert resources.api.page_workers == workers
+            with self.assertRaises(DeadlineExceeded):
+                with Deadline(0.25):
+                    resources.search()
+            with Deadline(2):
+                assert len(resources.search()["results"]) == 30
+
+
+class AsyncTimeoutTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.fake = FakeOpsramp(clients=1, resources=30, categories=3, page_size=10)
+        self.url = self.fake.start()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    async def asyncSetUp(self):
+        self.ormp = await opsramp.aio.connect(self.url, "key", "secret")
+        self.tenant = self.ormp.tenant(TENANT)
+
+    async def asyncTearDown(self):
+        await self.ormp.close()
+
+    async def test_deadline(self):
+        assert self.ormp.api.timeout == DEFAULT_TIMEOUT
+        self.fake.latency = {"rba": 0.5}
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            await self.tenant.rba().categories().get(deadline=0.2)
+        assert time.monotonic() - start < 0.4
+
+    async def test_deadline_across_retries(self):
+        self.fake.fail_next(100, status=503, family="rba")
+        with self.assertRaises(DeadlineExceeded):
+            await self.tenant.rba().categories().get(deadline=0.3)